@@ -0,0 +1,39 @@
+"""Measures compile throughput of AsyncCompiler under load with thread and process executors.
+
+Run from the repository root with ``python benchmarks/bench_async.py``.
+"""
+import os
+import sys
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from MathLang.Core import AsyncCompiler  # noqa: E402
+
+PROGRAMS = 400
+
+
+async def load(compiler, sources):
+    await asyncio.gather(*(compiler.compile(s) for s in sources))
+
+
+def bench(executor):
+    sources = [f"f{i}={'+'.join(f'{k}*x^{k}' for k in range(60))};PRINT f{i}({i});" for i in range(PROGRAMS)]
+    with executor:
+        # Warm up the workers first
+        asyncio.run(load(AsyncCompiler(executor), sources[:executor._max_workers]))
+        start = perf_counter()
+        asyncio.run(load(AsyncCompiler(executor), sources))
+        return PROGRAMS / (perf_counter() - start)
+
+
+if __name__ == "__main__":
+    print(f"{'executor':>10} {'workers':>8} {'programs/s':>11}")
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        for name, cls in (("threads", ThreadPoolExecutor), ("processes", ProcessPoolExecutor)):
+            print(f"{name:>10} {workers:>8} {bench(cls(workers)):>11.0f}")
+        workers *= 2
@@ -0,0 +1,32 @@
+"""Compares dump and load throughput of the marshal-based bytecode container with the legacy dill format.
+
+Run from the repository root with ``python benchmarks/bench_bytecode.py``.
+"""
+import sys
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import dill  # noqa: E402
+
+from MathLang.Core import generate_ast, generate_python_code  # noqa: E402
+from MathLang.Core.bytecode import dump_code, load_code  # noqa: E402
+
+ROUNDS = 2000
+
+
+def throughput(func, arg):
+    start = perf_counter()
+    for _ in range(ROUNDS):
+        func(arg)
+    return ROUNDS / (perf_counter() - start)
+
+
+if __name__ == "__main__":
+    with open(Path(__file__).parent.parent / "src/MathLang/Tests/test_data/simple_demo.gp") as fp:
+        code = compile(generate_python_code(generate_ast(fp.read())), "<MathLang>", "exec", optimize=2)
+    print(f"{'format':>10} {'size (B)':>9} {'dumps/s':>10} {'loads/s':>10}")
+    for name, dumps, loads in (("dill", dill.dumps, dill.loads), ("container", dump_code, load_code)):
+        data = dumps(code)
+        print(f"{name:>10} {len(data):>9} {throughput(dumps, code):>10.0f} {throughput(loads, data):>10.0f}")
@@ -0,0 +1,25 @@
+"""Measures how code generation time grows with the length of an expression.
+
+Run from the repository root with ``python benchmarks/bench_codegen.py``.
+"""
+import sys
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from MathLang.Core import generate_ast, generate_python_code  # noqa: E402
+
+
+def bench(terms):
+    ast = generate_ast(f"f={'+'.join(f'{i}*x' for i in range(terms))};")
+    start = perf_counter()
+    generate_python_code(ast)
+    return perf_counter() - start
+
+
+if __name__ == "__main__":
+    print(f"{'terms':>8} {'codegen (s)':>12} {'us/term':>8}")
+    for n in (100, 1000, 10000, 100000):
+        t = bench(n)
+        print(f"{n:>8} {t:>12.4f} {t / n * 1e6:>8.2f}")
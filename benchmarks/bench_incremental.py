@@ -0,0 +1,33 @@
+"""Measures the latency of recompiling a large program after a one-statement edit, incrementally and in full.
+
+Run from the repository root with ``python benchmarks/bench_incremental.py``.
+"""
+import sys
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from MathLang.Core import IncrementalCompiler, generate_ast, generate_python_code  # noqa: E402
+
+
+def make_source(n, edited):
+    statements = [f"a{i} = a{i - 1}*x + {i};" if i else "a0 = x;" for i in range(n)]
+    statements[n // 2] = f"a{n // 2} = {edited}*x;"
+    return "\n".join(statements)
+
+
+def timed(func, *args):
+    start = perf_counter()
+    func(*args)
+    return perf_counter() - start
+
+
+if __name__ == "__main__":
+    print(f"{'statements':>10} {'full ms':>10} {'incremental ms':>15} {'speed-up':>9}")
+    for n in (500, 5000, 20000):
+        compiler = IncrementalCompiler()
+        compiler.generate_python_code(make_source(n, 0))
+        incremental = min(timed(compiler.generate_python_code, make_source(n, edit)) for edit in range(1, 6))
+        full = min(timed(lambda s: generate_python_code(generate_ast(s)), make_source(n, edit)) for edit in range(1, 4))
+        print(f"{n:>10} {full * 1000:>10.1f} {incremental * 1000:>15.1f} {full / incremental:>8.1f}x")
@@ -0,0 +1,47 @@
+"""Measures the cost of compiler instrumentation, off and on, and shows where compilation time goes.
+
+Run from the repository root with ``python benchmarks/bench_instrumentation.py``.
+"""
+import sys
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from MathLang.Core import Compiler, CompilerStatistics, Instrumentation, set_instrumentation  # noqa: E402
+
+scripts = {
+    "small": "f = x^2 - 2*x + 1; r = SOLVE f IN REAL; PRINT r, f(3);",
+    "quadratics": "".join(
+        f"f{i} = {i}*x^2 - {i + 1}*x - 2*3*{i}; r{i} = SOLVE f{i} IN REAL; PRINT r{i}, f{i}({i});" for i in range(200)
+    ),
+}
+
+
+def best_times(source, instrumentation, repeat=7, number=10):
+    # Off and on are measured in turn, so that both see the same background noise
+    off = on = float("inf")
+    for _ in range(repeat):
+        for enabled in (False, True):
+            set_instrumentation(instrumentation if enabled else None)
+            start = perf_counter()
+            for _ in range(number):
+                Compiler.py_compile(source)
+            elapsed = (perf_counter() - start) / number
+            if enabled:
+                on = min(on, elapsed)
+            else:
+                off = min(off, elapsed)
+    set_instrumentation(None)
+    return off, on
+
+
+if __name__ == "__main__":
+    print(f"{'script':>11} {'off ms':>8} {'on ms':>8} {'overhead':>9}")
+    statistics = {}
+    for name, source in scripts.items():
+        statistics[name] = CompilerStatistics()
+        off, on = best_times(source, Instrumentation(statistics=statistics[name]))
+        print(f"{name:>11} {off * 1000:>8.3f} {on * 1000:>8.3f} {(on / off - 1) * 100:>8.1f}%")
+    for name, stats in statistics.items():
+        print(f"\n{name}:\n{stats.format()}")
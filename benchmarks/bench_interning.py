@@ -0,0 +1,55 @@
+"""Measures the memory and code generation time saved by hash-consing the AST of scripts with repeated sub-expressions.
+
+Run from the repository root with ``python benchmarks/bench_interning.py``.
+"""
+import gc
+import sys
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from MathLang.Core import CompilationContext, generate_ast, generate_python_code  # noqa: E402
+
+scripts = {
+    "no_repeats": "".join(f"f{i} = {i}*x^2 - {i + 1}*x + {i + 2}; PRINT f{i};" for i in range(500)),
+    "repeated_terms": "".join(
+        f"f{i} = (x+1)^2*{i} + (x+1)^2 - (x-1)^3/(x+1)^2; PRINT f{i}, (x+1)^2;" for i in range(500)
+    ),
+    "repeated_sums": "".join(
+        f"f{i} = ({'+'.join(f'x^{j}' for j in range(20))})*{i}; PRINT f{i}((x+1)^2);" for i in range(500)
+    ),
+}
+
+
+def measure(source, intern, repeat=3):
+    # Everything allocated while parsing and still alive is the AST, and the table of nodes when interning
+    gc.collect()
+    tracemalloc.start()
+    ast = generate_ast(source, CompilationContext(), intern)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del ast
+    parse = codegen = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        context = CompilationContext()
+        start = perf_counter()
+        ast = generate_ast(source, context, intern)
+        parse = min(parse, perf_counter() - start)
+        start = perf_counter()
+        code = generate_python_code(ast, context)
+        codegen = min(codegen, perf_counter() - start)
+    return memory, parse, codegen, code
+
+
+if __name__ == "__main__":
+    print(f"{'script':>15} {'interned':>8} {'AST KiB':>8} {'parse ms':>9} {'codegen ms':>11}")
+    for name, source in scripts.items():
+        codes = []
+        for intern in (False, True):
+            memory, parse, codegen, code = measure(source, intern)
+            codes.append(code)
+            print(f"{name:>15} {str(intern):>8} {memory / 1024:>8.0f} {parse * 1000:>9.1f} {codegen * 1000:>11.1f}")
+        assert codes[0] == codes[1]
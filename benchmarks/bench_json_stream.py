@@ -0,0 +1,73 @@
+"""Compares the peak memory and speed of streaming JSON AST serialisation with 'serialise_ast()'/'deserialise_ast()'.
+
+Run from the repository root with ``python benchmarks/bench_json_stream.py``.
+"""
+import os
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from MathLang.Core import deserialise_ast, generate_ast, read_ast, serialise_ast, write_ast  # noqa: E402
+
+scripts = {
+    "quadratics": "".join(
+        f"f{i} = {i}*x^2 - {i + 1}*x - 2*3*{i}; r{i} = SOLVE f{i} IN REAL; PRINT r{i}, f{i}({i});" for i in range(2000)
+    ),
+    # Far deeper than the json module can go
+    "deep_sum": "f=" + "+".join(f"{i}*x" for i in range(50000)) + ";",
+}
+
+
+def write_whole(ast, path):
+    with open(path, "w") as fp:
+        fp.write(serialise_ast(ast))
+
+
+def read_whole(path):
+    with open(path) as fp:
+        return deserialise_ast(fp.read())
+
+
+def write_stream(ast, path):
+    with open(path, "w") as fp:
+        write_ast(ast, fp)
+
+
+def read_stream(path):
+    with open(path) as fp:
+        return read_ast(fp)
+
+
+def measure(func, *args):
+    # Peak memory on top of what is already allocated, e.g. the AST being written
+    tracemalloc.start()
+    try:
+        func(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+    except RecursionError:
+        return None, None
+    finally:
+        tracemalloc.stop()
+    start = perf_counter()
+    func(*args)
+    return peak, perf_counter() - start
+
+
+if __name__ == "__main__":
+    path = os.path.join(tempfile.mkdtemp(), "ast.json")
+    print(f"{'script':>11} {'method':>7} {'write MiB':>10} {'write ms':>9} {'read MiB':>9} {'read ms':>8}")
+    for name, source in scripts.items():
+        ast = generate_ast(source)
+        for method, write, read in (("whole", write_whole, read_whole), ("stream", write_stream, read_stream)):
+            write_peak, write_time = measure(write, ast, path)
+            read_peak, read_time = measure(read, path) if write_peak is not None else (None, None)
+            if write_peak is None:
+                print(f"{name:>11} {method:>7} {'RecursionError':>39}")
+                continue
+            print(f"{name:>11} {method:>7} {write_peak / 2 ** 20:>10.1f} {write_time * 1000:>9.0f} "
+                  f"{read_peak / 2 ** 20:>9.1f} {read_time * 1000:>8.0f}")
+    os.remove(path)
@@ -0,0 +1,43 @@
+"""Compares the tokens per second of the master-regex lexer with the previous rply lexer on a multi-megabyte source.
+
+Run from the repository root with ``python benchmarks/bench_lexer.py``.
+"""
+import re
+import sys
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from rply import LexerGenerator  # noqa: E402
+
+from MathLang.Core.lexer import get_lexer, keywords, token_pair  # noqa: E402
+
+
+def rply_lexer():
+    # The previous lexer: every pattern is tried in order at every position, keywords before identifiers
+    lg = LexerGenerator()
+    for name, pattern in token_pair:
+        lg.add(name, pattern, re.IGNORECASE)
+    lg.add("WHITESPACE", " ")
+    for pattern in (r"\r\n|\r|\n", r"\t", r"#.*"):
+        lg.ignore(pattern)
+    lexer = lg.build()
+    return lambda s: (t for t in lexer.lex(s) if t.name != "WHITESPACE")
+
+
+def bench(lex, source):
+    start = perf_counter()
+    count = sum(1 for _ in lex(source))
+    return count, count / (perf_counter() - start)
+
+
+if __name__ == "__main__":
+    with open(Path(__file__).parent.parent / "src/MathLang/Tests/test_data/simple_demo.gp") as fp:
+        demo = fp.read()
+    source = demo * (4 * 1024 ** 2 // len(demo))
+    print(f"source: {len(source) / 1024 ** 2:.1f} MiB, {len(keywords)} keywords")
+    print(f"{'lexer':>8} {'tokens':>9} {'tokens/s':>11}")
+    for name, lex in (("rply", rply_lexer()), ("master", get_lexer().lex)):
+        count, rate = bench(lex, source)
+        print(f"{name:>8} {count:>9} {rate:>11.0f}")
@@ -0,0 +1,42 @@
+"""Compares startup plus execution time of programs compiled for the symbolic and the numeric target.
+
+Each program runs in a fresh interpreter, as it would from the command line. Run from the repository root with
+``python benchmarks/bench_numeric.py``.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+from time import perf_counter
+
+src = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src))
+
+from MathLang.Core import Compiler  # noqa: E402
+
+programs = {
+    "evaluation": "a = 3; b = -2; f = a*x^2 + b*x + 1; PRINT f(0), f(1), f(2.5);",
+    "roots": "f = x^3 - 6*x^2 + 11*x - 6; PRINT SOLVE f IN REAL;",
+    "batch": "f = (x^2 + 1)/(x + 20); PRINT f(1..100000 STEP 0.5);",
+}
+
+# Loads the compiled program and runs it, as an execution worker would
+runner = "import sys;from MathLang.Core import Compiler;exec(Compiler.py_decompile(sys.stdin.buffer.read(), True))"
+
+
+def run(bytecode, repeat=3):
+    env = dict(os.environ, PYTHONPATH=str(src))
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        subprocess.run([sys.executable, "-c", runner], input=bytecode, env=env, check=True, stdout=subprocess.DEVNULL)
+        best = min(best, perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    print(f"{'program':>12} {'symbolic ms':>12} {'numeric ms':>11} {'speed-up':>9}")
+    for name, source in programs.items():
+        symbolic = run(Compiler.py_compile(source))
+        numeric = run(Compiler.py_compile(source, target="numeric"))
+        print(f"{name:>12} {symbolic * 1000:>12.0f} {numeric * 1000:>11.0f} {symbolic / numeric:>8.1f}x")
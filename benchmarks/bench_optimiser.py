@@ -0,0 +1,54 @@
+"""Measures how much runtime each optimisation level saves on typical scripts.
+
+Run from the repository root with ``python benchmarks/bench_optimiser.py``.
+"""
+import io
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from sympy.core.cache import clear_cache  # noqa: E402
+
+from MathLang.Core import generate_ast, generate_python_code, optimise  # noqa: E402
+
+demo = (Path(__file__).parent.parent / "src" / "MathLang" / "Tests" / "test_data" / "simple_demo.gp").read_text()
+
+scripts = {
+    # Plotting is left out, it would only measure the plotting backend
+    "simple_demo": demo.replace("PLOT f;", ""),
+    "quadratics": "".join(
+        f"f{i} = {i}*x^2 - {i + 1}*x - 2*3*{i}; r{i} = SOLVE f{i} IN REAL; PRINT r{i}, SOLVE f{i} IN REAL;"
+        for i in range(1, 21)
+    ),
+    "scratch_work": "".join(
+        f"g{i} = (x+{i})^3 - (x-{i})^3; s{i} = SOLVE g{i} IN REAL; t{i} = SOLVE g{i} IN INTEGER; PRINT g{i}(2^{i});"
+        for i in range(1, 21)
+    ),
+    "shared_terms": "".join(
+        f"h{i} = (x^2 + 2*x + 1)^{i} + (x^2 + 2*x + 1)*(x - {i}); PRINT h{i}, h{i}((2+3)*4);" for i in range(1, 21)
+    ),
+}
+
+
+def run(code, repeat=5):
+    compiled = compile(code, "<MathLang>", "exec", optimize=2)
+    best = float("inf")
+    for _ in range(repeat):
+        # SymPy caches results, which would make every run after the first one cheaper
+        clear_cache()
+        start = perf_counter()
+        with redirect_stdout(io.StringIO()):
+            exec(compiled, {})
+        best = min(best, perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    levels = (0, 1, 2)
+    print(f"{'script':>14}" + "".join(f" {f'O{level} ms':>10}" for level in levels) + f" {'saved':>7}")
+    for name, source in scripts.items():
+        times = [run(generate_python_code(optimise(generate_ast(source), level))) for level in levels]
+        print(f"{name:>14}" + "".join(f" {t * 1000:>10.1f}" for t in times) + f" {1 - times[-1] / times[0]:>7.0%}")
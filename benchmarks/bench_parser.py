@@ -0,0 +1,32 @@
+"""Measures how AST construction and code generation scale with the number of statements and PRINT arguments.
+
+Run from the repository root with ``python benchmarks/bench_parser.py``.
+"""
+import sys
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from MathLang.Core import CompilationContext, generate_ast, generate_python_code  # noqa: E402
+
+
+def bench(source):
+    context = CompilationContext()
+    start = perf_counter()
+    ast = generate_ast(source, context)
+    parsed = perf_counter()
+    generate_python_code(ast, context)
+    return parsed - start, perf_counter() - parsed
+
+
+if __name__ == "__main__":
+    print(f"{'shape':>10} {'items':>8} {'parse us/item':>14} {'codegen us/item':>16}")
+    for n in (1000, 10000, 100000):
+        for shape, source in (
+            ("stmts", "a=x;" + "PRINT a;" * n),
+            ("print", "a=x;PRINT " + ",".join(["a"] * n) + ";"),
+            ("plot", "PLOT " + ",".join(["x"] * n) + ";"),
+        ):
+            parse, codegen = bench(source)
+            print(f"{shape:>10} {n:>8} {parse / n * 1e6:>14.2f} {codegen / n * 1e6:>16.2f}")
@@ -0,0 +1,54 @@
+"""Compares sampling with SymPy's plotting module and with the NumPy plot engine, and measures batch rendering.
+
+Run from the repository root with ``python benchmarks/bench_plotting.py``.
+"""
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import sympy  # noqa: E402
+
+from MathLang.Core import render_many  # noqa: E402
+from MathLang.Core.plotting import render, sample  # noqa: E402
+from MathLang.Core.vectorised import get_function  # noqa: E402
+
+
+def timed(func, *args, **kwargs):
+    start = perf_counter()
+    func(*args, **kwargs)
+    return perf_counter() - start
+
+
+if __name__ == "__main__":
+    x = sympy.Symbol("x")
+    functions = {
+        "polynomial": 3 * x ** 3 - 2 * x ** 2 + x - 7,
+        "pole": 1 / (x - sympy.Rational(1, 3)),
+        "oscillating": sympy.sin(5 * x) * x,
+    }
+    print(f"{'function':>12} {'sympy ms':>9} {'points':>7} {'engine ms':>10} {'points':>7} {'render ms':>10}")
+    for name, f in functions.items():
+        series = sympy.plotting.plot(f, show=False)[0]
+        series.adaptive = True
+        sympy_time = timed(series.get_points)
+        sympy_points = len(series.get_points()[0])
+        func = get_function(f)
+        engine_time = timed(sample, func)
+        engine_points = len(sample(func)[0])
+        render_time = timed(render, [func])
+        print(f"{name:>12} {sympy_time * 1000:>9.1f} {sympy_points:>7} {engine_time * 1000:>10.1f} "
+              f"{engine_points:>7} {render_time * 1000:>10.1f}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for i in range(32):
+            path = Path(directory) / f"program{i}.gp"
+            path.write_text(f"f = x^3 - {i}*x; PLOT f; g = 1/(x - {i % 5}); PLOT g, f;")
+            paths.append(path)
+        print(f"\n{'jobs':>5} {'programs/s':>11}")
+        for jobs in (1, 2, 4):
+            elapsed = timed(render_many, paths, [Path(directory) / "out" / p.stem for p in paths], jobs=jobs)
+            print(f"{jobs:>5} {len(paths) / elapsed:>11.1f}")
@@ -0,0 +1,47 @@
+"""Compares the size and speed of the binary AST format with the JSON one.
+
+Run from the repository root with ``python benchmarks/bench_serialiser.py``.
+"""
+import sys
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from MathLang.Core import deserialise_ast, dump_ast, generate_ast, load_ast, serialise_ast  # noqa: E402
+
+demo = (Path(__file__).parent.parent / "src" / "MathLang" / "Tests" / "test_data" / "simple_demo.gp").read_text()
+
+scripts = {
+    "simple_demo": demo,
+    "quadratics": "".join(
+        f"f{i} = {i}*x^2 - {i + 1}*x - 2*3*{i}; r{i} = SOLVE f{i} IN REAL; PRINT r{i}, f{i}({i});" for i in range(2000)
+    ),
+    "long_sums": "".join(f"g{i} = {'+'.join(f'{j}*x^{j}' for j in range(100))}; PRINT g{i};" for i in range(100)),
+}
+
+formats = {
+    "json": (serialise_ast, deserialise_ast),
+    "binary": (dump_ast, load_ast),
+}
+
+
+def best_of(func, arg, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        func(arg)
+        best = min(best, perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    print(f"{'script':>12} {'format':>7} {'KiB':>8} {'encode ms':>10} {'decode ms':>10}")
+    for name, source in scripts.items():
+        ast = generate_ast(source)
+        for fmt, (encode, decode) in formats.items():
+            data = encode(ast)
+            assert decode(data) == ast
+            encoding = best_of(encode, ast)
+            decoding = best_of(decode, data)
+            print(f"{name:>12} {fmt:>7} {len(data) / 1024:>8.1f} {encoding * 1000:>10.2f} {decoding * 1000:>10.2f}")
@@ -0,0 +1,26 @@
+"""Measures how code generation time grows with the number of distinct names in a program.
+
+Run from the repository root with ``python benchmarks/bench_symbols.py``.
+"""
+import sys
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from MathLang.Core import CompilationContext, generate_ast, generate_python_code  # noqa: E402
+
+
+def bench(names):
+    context = CompilationContext()
+    ast = generate_ast("".join(f"v{i}=x+v{i - 1};" if i else "v0=x;" for i in range(names)), context)
+    start = perf_counter()
+    generate_python_code(ast, context)
+    return perf_counter() - start
+
+
+if __name__ == "__main__":
+    print(f"{'names':>8} {'codegen (s)':>12} {'us/name':>8}")
+    for n in (10, 100, 1000, 10000, 100000):
+        t = bench(n)
+        print(f"{n:>8} {t:>12.4f} {t / n * 1e6:>8.2f}")
@@ -0,0 +1,37 @@
+"""Compares evaluating a function at many points with SymPy substitution and with the vectorised NumPy backend.
+
+Run from the repository root with ``python benchmarks/bench_vectorised.py``.
+"""
+import sys
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import sympy  # noqa: E402
+
+from MathLang.Core.vectorised import evaluate, points  # noqa: E402
+
+
+def timed(func):
+    start = perf_counter()
+    func()
+    return perf_counter() - start
+
+
+if __name__ == "__main__":
+    x = sympy.Symbol("x")
+    functions = {
+        "polynomial": 3 * x ** 3 - 2 * x ** 2 + x - 7,
+        "rational": (x ** 2 + 1) / (x - sympy.Rational(1, 2)),
+        "trigonometric": sympy.sin(x) * sympy.exp(-x / 10),
+    }
+    print(f"{'function':>14} {'points':>8} {'subs us/point':>14} {'numpy us/point':>15} {'speed-up':>9}")
+    for name, f in functions.items():
+        for n in (100, 1000):
+            values = points(1, n)
+            subs = timed(lambda: [f.subs({"x": v}) for v in values])
+            # The first call compiles the function, later ones reuse it
+            evaluate(f, values)
+            vectorised = timed(lambda: evaluate(f, values))
+            print(f"{name:>14} {n:>8} {subs / n * 1e6:>14.2f} {vectorised / n * 1e6:>15.3f} {subs / vectorised:>8.0f}x")
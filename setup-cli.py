@@ -19,7 +19,6 @@ setup(
         "License :: OSI Approved :: MIT License",
         "Natural Language :: English",
         "Operating System :: OS Independent",
-        "Programming Language :: Python :: 3.6",
         "Programming Language :: Python :: 3.7",
         "Programming Language :: Python :: 3.8",
         "Programming Language :: Python :: 3.9",
@@ -32,9 +31,14 @@ setup(
     },
     packages=['MathLang.Interface.CLI'],
     package_dir={'': 'src'},
+    entry_points={
+        "console_scripts": [
+            "mathlang=MathLang.Interface.CLI:cli",
+        ],
+    },
     install_requires=[
         "MathLang~=2021.0",
         "click~=8.0.1",
     ],
-    python_requires=">=3.6",
+    python_requires=">=3.7",
 )
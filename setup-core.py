@@ -19,7 +19,6 @@ setup(
         "License :: OSI Approved :: MIT License",
         "Natural Language :: English",
         "Operating System :: OS Independent",
-        "Programming Language :: Python :: 3.6",
         "Programming Language :: Python :: 3.7",
         "Programming Language :: Python :: 3.8",
         "Programming Language :: Python :: 3.9",
@@ -36,6 +35,11 @@ setup(
         "rply~=0.7.7",
         "sympy~=1.8",
         "dill~=0.3.3",
+        "numpy~=1.20",
     ],
-    python_requires=">=3.6",
+    extras_require={
+        # Needed to render PLOT statements
+        "plot": ["matplotlib~=3.4"],
+    },
+    python_requires=">=3.7",
 )
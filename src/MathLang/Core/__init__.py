@@ -1,17 +1,71 @@
-from .lexer import get_source_signature, Lexer
-from .parser import generate_ast, Parser
-from .nodes import generate_python_code
-from .serialiser import deserialise_ast, serialise_ast
-from .compiler import Compiler, execute
+from importlib import import_module
 
-__all__ = [
-    "Lexer",
-    "get_source_signature",
-    "Parser",
-    "generate_ast",
-    "generate_python_code",
-    "serialise_ast",
-    "deserialise_ast",
-    "Compiler",
-    "execute",
-]
+# Public names and the submodules defining them. Submodules are only imported when one of their names is first used,
+# so that e.g. lexing does not pay for the parser tables or the compiler.
+_lazy_attributes = {
+    "Lexer": "lexer",
+    "get_lexer": "lexer",
+    "get_source_signature": "lexer",
+    "Parser": "parser",
+    "get_parser": "parser",
+    "generate_ast": "parser",
+    "CompilationContext": "nodes",
+    "generate_python_code": "nodes",
+    "NodeTable": "nodes",
+    "get_node_table": "nodes",
+    "optimise": "optimiser",
+    "serialise_ast": "serialiser",
+    "deserialise_ast": "serialiser",
+    "write_ast": "serialiser",
+    "read_ast": "serialiser",
+    "ASTFormatError": "binary_ast",
+    "dump_ast": "binary_ast",
+    "load_ast": "binary_ast",
+    "BytecodeFormatError": "bytecode",
+    "CacheStatistics": "cache",
+    "CompileCache": "cache",
+    "Compiler": "compiler",
+    "execute": "compiler",
+    "Instrumentation": "instrumentation",
+    "CompilerStatistics": "instrumentation",
+    "PhaseRecord": "instrumentation",
+    "get_instrumentation": "instrumentation",
+    "set_instrumentation": "instrumentation",
+    "SolveCache": "solver",
+    "get_solve_cache": "solver",
+    "set_solve_cache": "solver",
+    "PlotOutput": "plotting",
+    "RenderResult": "plotting",
+    "get_plot_output": "plotting",
+    "set_plot_output": "plotting",
+    "render_many": "plotting",
+    "Bundle": "bundle",
+    "BundleWriter": "bundle",
+    "ExecutionPool": "execution",
+    "ExecutionResult": "execution",
+    "BatchResult": "batch",
+    "compile_many": "batch",
+    "generate_python_stream": "streaming",
+    "execute_stream": "streaming",
+    "IncrementalCompiler": "incremental",
+    "AsyncCompiler": "asynchronous",
+    "compile_async": "asynchronous",
+    "decompile_async": "asynchronous",
+    "execute_async": "asynchronous",
+}
+
+__all__ = list(_lazy_attributes)
+
+
+def __getattr__(name):
+    try:
+        module = _lazy_attributes[name]
+    except KeyError:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'") from None
+    value = getattr(import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
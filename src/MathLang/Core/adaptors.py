@@ -1,29 +1,53 @@
-from os import PathLike
-from typing import Any
+from os import fspath, PathLike
+from typing import Any, Iterable, Mapping
 
-from MathLang.Core import Compiler
+from MathLang.Core.asynchronous import AsyncCompiler, get_async_compiler
+from MathLang.Core.bundle import Bundle, BundleWriter
+from MathLang.Core.cache import CompileCache
+from MathLang.Core.compiler import Compiler
 
 
-def compile_file_to_file(in_file: PathLike, out_file: PathLike) -> None:
+def compile_file_to_file(in_file: PathLike, out_file: PathLike, cache: CompileCache = None) -> None:
     with open(in_file) as fp1:
         with open(out_file, "wb") as fp2:
-            fp2.write(Compiler.py_compile(fp1.read()))
+            fp2.write(Compiler.py_compile(fp1.read(), cache))
     return None
 
 
-def compile_source_to_file(source: str, out_file: PathLike) -> None:
+def compile_source_to_file(source: str, out_file: PathLike, cache: CompileCache = None) -> None:
     with open(out_file, "wb") as fp:
-        fp.write(Compiler.py_compile(source))
+        fp.write(Compiler.py_compile(source, cache))
     return None
 
 
-def compile_file_to_bytecode(in_file: PathLike) -> bytes:
+def compile_file_to_bytecode(in_file: PathLike, cache: CompileCache = None) -> bytes:
     with open(in_file) as fp:
-        return Compiler.py_compile(fp.read())
+        return Compiler.py_compile(fp.read(), cache)
 
 
-def compile_source_to_bytecode(source: str) -> bytes:
-    return Compiler.py_compile(source)
+def compile_source_to_bytecode(source: str, cache: CompileCache = None) -> bytes:
+    return Compiler.py_compile(source, cache)
+
+
+def compile_files_to_bundle(in_files: Iterable[PathLike], out_file: PathLike, cache: CompileCache = None) -> None:
+    bundle = BundleWriter()
+    for in_file in in_files:
+        with open(in_file) as fp:
+            bundle.add(fspath(in_file), Compiler.py_compile(fp.read(), cache))
+    bundle.write(out_file)
+    return None
+
+
+def compile_sources_to_bundle(sources: Mapping[str, str], out_file: PathLike, cache: CompileCache = None) -> None:
+    bundle = BundleWriter()
+    for name, source in sources.items():
+        bundle.add(name, Compiler.py_compile(source, cache))
+    bundle.write(out_file)
+    return None
+
+
+def open_bundle(in_file: PathLike, unsafe: bool = False) -> Bundle:
+    return Bundle(in_file, unsafe)
 
 
 def decompile_file_to_file(in_file: PathLike, out_file: PathLike, unsafe: bool = False) -> None:
@@ -46,3 +70,37 @@ def decompile_file_to_code(in_file: PathLike, unsafe: bool = False) -> Any:
 
 def decompile_bytecode_to_code(bytecode: bytes, unsafe: bool = False) -> Any:
     return Compiler.py_decompile(bytecode, unsafe)
+
+
+async def compile_file_to_file_async(in_file: PathLike, out_file: PathLike, cache: CompileCache = None,
+                                     compiler: AsyncCompiler = None) -> None:
+    return await (compiler or get_async_compiler()).run(compile_file_to_file, in_file, out_file, cache)
+
+
+async def compile_source_to_file_async(source: str, out_file: PathLike, cache: CompileCache = None,
+                                       compiler: AsyncCompiler = None) -> None:
+    return await (compiler or get_async_compiler()).run(compile_source_to_file, source, out_file, cache)
+
+
+async def compile_file_to_bytecode_async(in_file: PathLike, cache: CompileCache = None,
+                                         compiler: AsyncCompiler = None) -> bytes:
+    return await (compiler or get_async_compiler()).run(compile_file_to_bytecode, in_file, cache)
+
+
+async def compile_files_to_bundle_async(in_files: Iterable[PathLike], out_file: PathLike, cache: CompileCache = None,
+                                        compiler: AsyncCompiler = None) -> None:
+    return await (compiler or get_async_compiler()).run(compile_files_to_bundle, list(in_files), out_file, cache)
+
+
+async def decompile_file_to_file_async(in_file: PathLike, out_file: PathLike, unsafe: bool = False,
+                                       compiler: AsyncCompiler = None) -> None:
+    return await (compiler or get_async_compiler()).run(decompile_file_to_file, in_file, out_file, unsafe)
+
+
+async def decompile_bytecode_to_file_async(bytecode: bytes, out_file: PathLike, unsafe: bool = False,
+                                           compiler: AsyncCompiler = None) -> None:
+    return await (compiler or get_async_compiler()).run(decompile_bytecode_to_file, bytecode, out_file, unsafe)
+
+
+async def decompile_file_to_code_async(in_file: PathLike, unsafe: bool = False, compiler: AsyncCompiler = None) -> Any:
+    return await (compiler or get_async_compiler()).run(decompile_file_to_code, in_file, unsafe)
@@ -0,0 +1,146 @@
+import asyncio
+import functools
+import weakref
+from concurrent.futures import Executor
+from types import CodeType
+
+from MathLang.Core.cache import CompileCache
+from MathLang.Core.compiler import Compiler
+from MathLang.Core.execution import ExecutionPool, ExecutionResult
+
+
+class _NoLimit:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return None
+
+
+class AsyncCompiler:
+    """Runs compilation and execution for asyncio code, without blocking the event loop.
+
+    Compilation is offloaded to an executor, the event loop's default thread pool unless another one is given. Since
+    compilation is CPU bound, a ProcessPoolExecutor is needed for throughput to scale with the number of cores, in
+    which case caches cannot be used. Programs are executed in an ExecutionPool, which is started on first use unless
+    one is given.
+
+    Cancelling a call which is still waiting for a free executor or worker cancels it outright. A program which has
+    already started runs until it finishes or times out.
+
+    :param executor: The executor to compile in.
+    :type executor: Executor
+    :param max_concurrency: Maximum number of calls running at once, or None for no limit.
+    :type max_concurrency: int
+    :param pool: The pool to execute programs in.
+    :type pool: ExecutionPool
+    """
+
+    def __init__(self, executor: Executor = None, max_concurrency: int = None, pool: ExecutionPool = None):
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self.pool = pool
+        self.__owns_pool = False
+        self.__semaphores = weakref.WeakKeyDictionary()
+
+    def __limit(self):
+        if self.max_concurrency is None:
+            return _NoLimit()
+        # Semaphores belong to an event loop, so each loop gets its own
+        loop = asyncio.get_running_loop()
+        semaphore = self.__semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self.__semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def run(self, func, *args):
+        """Runs a blocking function in the executor, within the concurrency limit."""
+        async with self.__limit():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, functools.partial(func, *args))
+
+    async def compile(self, source: str, cache: CompileCache = None) -> bytes:
+        """Asynchronous version of 'Compiler.py_compile()'."""
+        return await self.run(Compiler.py_compile, source, cache)
+
+    async def decompile(self, bytecode: bytes, unsafe: bool = False) -> CodeType:
+        """Asynchronous version of 'Compiler.py_decompile()'."""
+        return await self.run(Compiler.py_decompile, bytecode, unsafe)
+
+    async def execute(self, bytecode: bytes, timeout: float = None) -> ExecutionResult:
+        """Runs MathLang bytecode in the execution pool.
+
+        :param bytecode: MathLang bytecode.
+        :type bytecode: bytes
+        :param timeout: Time limit in seconds, the pool's default if not given.
+        :type timeout: float
+        :return: The captured output and error of the program.
+        :rtype: ExecutionResult
+        """
+        if self.pool is None:
+            self.pool = ExecutionPool()
+            self.__owns_pool = True
+        async with self.__limit():
+            future = self.pool.submit(bytecode, timeout)
+            try:
+                return await asyncio.wrap_future(future)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+
+    def close(self) -> None:
+        """Stops the execution pool, if it was started by this compiler."""
+        if self.__owns_pool:
+            self.pool.close()
+            self.pool = None
+            self.__owns_pool = False
+
+
+_default_compiler = None
+
+
+def get_async_compiler() -> AsyncCompiler:
+    """Gets the AsyncCompiler used by the module-level functions, creating it on first use."""
+    global _default_compiler
+    if _default_compiler is None:
+        _default_compiler = AsyncCompiler()
+    return _default_compiler
+
+
+async def compile_async(source: str, cache: CompileCache = None) -> bytes:
+    """Compiles MathLang source code to MathLang bytecode without blocking the event loop.
+
+    :param source: MathLang source code.
+    :type source: str
+    :param cache: The cache to look the program up in, and to add it to if it is not there.
+    :type cache: CompileCache
+    :return: MathLang bytecode.
+    :rtype: bytes
+    """
+    return await get_async_compiler().compile(source, cache)
+
+
+async def decompile_async(bytecode: bytes, unsafe: bool = False) -> CodeType:
+    """Decompiles MathLang bytecode to Python bytecode without blocking the event loop.
+
+    :param bytecode: MathLang bytecode.
+    :type bytecode: bytes
+    :param unsafe: Whether to enable unsafe decompilation.
+    :type unsafe: bool
+    :return: Python bytecode.
+    :rtype: CodeType
+    """
+    return await get_async_compiler().decompile(bytecode, unsafe)
+
+
+async def execute_async(bytecode: bytes, timeout: float = None) -> ExecutionResult:
+    """Runs MathLang bytecode in a warm worker process without blocking the event loop.
+
+    :param bytecode: MathLang bytecode.
+    :type bytecode: bytes
+    :param timeout: Time limit in seconds, or None for no limit.
+    :type timeout: float
+    :return: The captured output and error of the program.
+    :rtype: ExecutionResult
+    """
+    return await get_async_compiler().execute(bytecode, timeout)
@@ -0,0 +1,91 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from os import PathLike
+from time import perf_counter
+from typing import List, Mapping, Sequence
+
+from MathLang.Core.cache import CompileCache
+from MathLang.Core.compiler import COMPILER_VERSION, Compiler
+
+
+class BatchResult:
+    """The outcome of compiling one file in a batch.
+
+    'key' is the cache key of the source, which only changes when the source code (not its comments) or the compiler
+    does. 'bytecode' is only set when the result was not written to an output file.
+    """
+
+    def __init__(self, path, key=None, bytecode=None, error=None, elapsed=0.0, skipped=False):
+        self.path = path
+        self.key = key
+        self.bytecode = bytecode
+        self.error = error
+        self.elapsed = elapsed
+        self.skipped = skipped
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self):
+        state = "skipped" if self.skipped else "failed" if self.error else "compiled"
+        return f"BatchResult({self.path!r}, {state}, elapsed={self.elapsed:.3f})"
+
+
+def _warm_up():
+    # Load the parser tables once per worker, rather than on the first file
+    import MathLang.Core.parser  # noqa: F401
+
+
+def _compile_one(job):
+    path, out_path, known_key = job
+    start = perf_counter()
+    key = None
+    try:
+        with open(path) as fp:
+            source = fp.read()
+        key = CompileCache.get_key(source, COMPILER_VERSION)
+        if key == known_key and (out_path is None or os.path.exists(out_path)):
+            return BatchResult(path, key, elapsed=perf_counter() - start, skipped=True)
+        bytecode = Compiler.py_compile(source)
+        if out_path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+            with open(out_path, "wb") as fp:
+                fp.write(bytecode)
+            bytecode = None
+        return BatchResult(path, key, bytecode, elapsed=perf_counter() - start)
+    except (KeyboardInterrupt, SystemExit):
+        raise
+    except BaseException as e:
+        return BatchResult(path, key, error=f"{type(e).__name__}: {e}", elapsed=perf_counter() - start)
+
+
+def compile_many(paths: Sequence[PathLike], jobs: int = None, out_paths: Sequence[PathLike] = None,
+                 known_keys: Mapping[PathLike, str] = None) -> List[BatchResult]:
+    """Compiles many MathLang files in parallel.
+
+    Files are compiled in a pool of worker processes, each of which loads the parser once. Files whose cache key is
+    found in 'known_keys' are skipped, as long as their output file exists.
+
+    :param paths: MathLang source files.
+    :type paths: Sequence[PathLike]
+    :param jobs: Number of worker processes, the number of CPUs by default. With 1, files are compiled in this process.
+    :type jobs: int
+    :param out_paths: Files to write the bytecode of each source to, if not returning it.
+    :type out_paths: Sequence[PathLike]
+    :param known_keys: Cache keys of sources which were compiled before, by path.
+    :type known_keys: Mapping[PathLike, str]
+    :return: A result for every file, in order.
+    :rtype: List[BatchResult]
+    """
+    paths = list(paths)
+    out_paths = list(out_paths) if out_paths is not None else [None] * len(paths)
+    known_keys = known_keys or {}
+    batch = [(path, out_path, known_keys.get(path)) for path, out_path in zip(paths, out_paths)]
+    jobs = min(jobs or os.cpu_count() or 1, max(len(batch), 1))
+    if jobs == 1:
+        return list(map(_compile_one, batch))
+    # Hand out files in chunks to keep inter-process traffic low, while leaving enough chunks to balance the load
+    chunksize = max(1, len(batch) // (jobs * 8))
+    with ProcessPoolExecutor(jobs, initializer=_warm_up) as pool:
+        return list(pool.map(_compile_one, batch, chunksize=chunksize))
@@ -0,0 +1,214 @@
+import struct
+
+from MathLang.Core.nodes import (
+    AST, Assignment, BatchEvaluation, BinaryOps, Comparison, Evaluation, Input, Plot, Print, Program, Range, Solve
+)
+
+# MathLang binary AST, version 1:
+#
+#   magic            4 bytes   b"MLAS"
+#   format version   uint16
+#   string count     varint
+#   strings          for each: varint length, UTF-8 bytes
+#   values           the rest of the data
+#
+# Values are written children first, like the instructions of a stack machine, the root being the last one. Each is an
+# opcode followed by its operands:
+#
+#   NONE             nothing
+#   STRING           varint index into the strings
+#   INTEGER          zigzag varint
+#   SEQUENCE         varint length, made of that many values before it
+#   node opcodes     nothing, the fields of the node being the values before it, in order
+#
+# Varints are unsigned LEB128, other integers are little-endian. Every distinct string, e.g. a name, a number or an
+# operator, is stored only once.
+MAGIC = b"MLAS"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sH")
+
+NONE = 0
+STRING = 1
+INTEGER = 2
+SEQUENCE = 3
+
+# Opcodes of the node types. They are part of the format, so existing ones must never change.
+node_opcodes = {
+    Program: 16,
+    Assignment: 17,
+    Evaluation: 18,
+    BatchEvaluation: 19,
+    Range: 20,
+    Print: 21,
+    Plot: 22,
+    Solve: 23,
+    Input: 24,
+    BinaryOps: 25,
+    Comparison: 26,
+}
+
+# The decoder's dispatch table, from opcode to node type and number of fields
+_node_types = [None] * (max(node_opcodes.values()) + 1)
+for _type, _opcode in node_opcodes.items():
+    _node_types[_opcode] = (_type, len(_type.__slots__))
+
+
+# What is written for nodes and for None, which have no operands
+_node_chunks = {node_type: bytes((opcode,)) for node_type, opcode in node_opcodes.items()}
+_none_chunk = bytes((NONE,))
+
+
+class ASTFormatError(ValueError):
+    def __init__(self, *args):
+        super(ASTFormatError, self).__init__(*args)
+
+
+def _write_varint(out: bytearray, n: int):
+    while n >= 0x80:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(data: bytes, pos: int):
+    n = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
+
+
+def dump_ast(ast: AST) -> bytes:
+    """Serialises MathLang AST to the binary AST format.
+
+    The tree is walked without recursion, so deep chains of operations are fine. Nodes shared by a hash-consed AST are
+    written once for every place they appear.
+
+    :param ast: MathLang AST.
+    :type ast: AST
+    :return: The binary AST.
+    :rtype: bytes
+    """
+    strings = {}
+    # Visiting parents first and children last to first gives the values in reverse order
+    chunks = []
+    stack = [ast]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, str):
+            index = strings.setdefault(value, len(strings))
+            if index < 0x80:
+                chunks.append(bytes((STRING, index)))
+            else:
+                chunk = bytearray((STRING,))
+                _write_varint(chunk, index)
+                chunks.append(chunk)
+        elif isinstance(value, AST):
+            try:
+                chunks.append(_node_chunks[type(value)])
+            except KeyError:
+                raise TypeError(f"Object of type '{type(value)}' is not serialisable") from None
+            stack.extend(value.fields())
+        elif isinstance(value, (tuple, list)):
+            chunk = bytearray((SEQUENCE,))
+            _write_varint(chunk, len(value))
+            chunks.append(chunk)
+            stack.extend(value)
+        elif value is None:
+            chunks.append(_none_chunk)
+        elif isinstance(value, int):
+            chunk = bytearray((INTEGER,))
+            _write_varint(chunk, value << 1 if value >= 0 else (-value << 1) - 1)
+            chunks.append(chunk)
+        else:
+            raise TypeError(f"Object of type '{type(value)}' is not serialisable")
+    chunks.reverse()
+
+    out = bytearray(HEADER.pack(MAGIC, FORMAT_VERSION))
+    _write_varint(out, len(strings))
+    for string in strings:
+        encoded = string.encode()
+        _write_varint(out, len(encoded))
+        out += encoded
+    return bytes(out + b"".join(chunks))
+
+
+def load_ast(data: bytes) -> AST:
+    """Deserialises MathLang AST from the binary AST format.
+
+    :param data: The binary AST.
+    :type data: bytes
+    :return: MathLang AST.
+    :rtype: AST
+    """
+    if len(data) < HEADER.size:
+        raise ASTFormatError("MathLang binary AST is truncated.")
+    magic, version = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ASTFormatError("Not a MathLang binary AST.")
+    if version != FORMAT_VERSION:
+        raise ASTFormatError(f"Unsupported MathLang binary AST format version {version}.")
+    try:
+        strings, pos = _load_strings(data, HEADER.size)
+        stack = _load_values(data, pos, strings)
+    except IndexError:
+        raise ASTFormatError("MathLang binary AST is truncated or corrupt.") from None
+    # Values are only complete once the root has been read, which must then be the only one left
+    if len(stack) != 1 or not isinstance(stack[0], AST):
+        raise ASTFormatError("MathLang binary AST is truncated or has trailing data.")
+    return stack[0]
+
+
+def _load_strings(data, pos):
+    count, pos = _read_varint(data, pos)
+    strings = []
+    for _ in range(count):
+        length, pos = _read_varint(data, pos)
+        if pos + length > len(data):
+            raise IndexError
+        try:
+            strings.append(data[pos:pos + length].decode())
+        except UnicodeDecodeError:
+            raise ASTFormatError("MathLang binary AST has a string which is not UTF-8.") from None
+        pos += length
+    return strings, pos
+
+
+def _load_values(data, pos, strings):
+    node_types = _node_types
+    end = len(data)
+    stack = []
+    while pos < end:
+        opcode = data[pos]
+        pos += 1
+        if opcode == STRING:
+            index = data[pos]
+            pos += 1
+            if index >= 0x80:
+                index, pos = _read_varint(data, pos - 1)
+            stack.append(strings[index])
+        elif opcode < len(node_types) and node_types[opcode] is not None:
+            node_type, size = node_types[opcode]
+            if size > len(stack):
+                raise ASTFormatError(f"Missing fields of a node in MathLang binary AST at offset {pos - 1}.")
+            values = stack[-size:]
+            del stack[-size:]
+            stack.append(node_type(*values))
+        elif opcode == SEQUENCE:
+            size, pos = _read_varint(data, pos)
+            if size > len(stack):
+                raise ASTFormatError(f"Missing items of a sequence in MathLang binary AST at offset {pos - 1}.")
+            values = tuple(stack[len(stack) - size:])
+            del stack[len(stack) - size:]
+            stack.append(values)
+        elif opcode == NONE:
+            stack.append(None)
+        elif opcode == INTEGER:
+            value, pos = _read_varint(data, pos)
+            stack.append(value >> 1 if not value & 1 else -((value + 1) >> 1))
+        else:
+            raise ASTFormatError(f"Unknown opcode {opcode} in MathLang binary AST at offset {pos - 1}.")
+    return stack
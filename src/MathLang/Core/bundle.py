@@ -0,0 +1,159 @@
+import mmap
+import struct
+from os import PathLike
+from types import CodeType
+from typing import Iterator, List
+
+from MathLang.Core.bytecode import BytecodeFormatError, load_code
+from MathLang.Core.compiler import Compiler, UnsafeDecompilationError
+
+# MathLang bundle, version 1:
+#
+#   header           magic b"MLBA", format version (uint16), entry count (uint32), index size (uint64)
+#   index            for each entry: name size (uint16), UTF-8 name, offset (uint64), size (uint64), signature
+#   index signature  signature of the header and index
+#   entries          MathLang bytecode containers, without their signature trailers
+#
+# All integers are little-endian and offsets are from the start of the bundle. The signature of each entry lives in
+# the index, so that the entries can be verified in a single pass without reading the index again.
+MAGIC = b"MLBA"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHIQ")
+INDEX_NAME = struct.Struct("<H")
+INDEX_ENTRY = struct.Struct("<QQ64s")
+SIGNATURE_SIZE = 64
+
+
+class BundleWriter:
+    """Collects compiled MathLang programs and writes them to a bundle.
+
+    Entries are kept in memory until the bundle is written, since the index comes first.
+    """
+
+    def __init__(self):
+        self.entries = {}
+
+    def add(self, name: str, bytecode: bytes) -> None:
+        """Adds a program to the bundle.
+
+        :param name: The name to look the program up with.
+        :type name: str
+        :param bytecode: MathLang bytecode, as returned by 'Compiler.py_compile()'.
+        :type bytecode: bytes
+        """
+        if name in self.entries:
+            raise ValueError(f"Duplicate bundle entry '{name}'")
+        self.entries[name] = bytecode
+
+    def write(self, out_file: PathLike) -> None:
+        names = [name.encode() for name in self.entries]
+        index_size = sum(INDEX_NAME.size + len(name) + INDEX_ENTRY.size for name in names)
+        offset = HEADER.size + index_size + SIGNATURE_SIZE
+        index = [HEADER.pack(MAGIC, FORMAT_VERSION, len(names), index_size)]
+        for name, bytecode in zip(names, self.entries.values()):
+            size = len(bytecode) - SIGNATURE_SIZE
+            index.append(INDEX_NAME.pack(len(name)) + name + INDEX_ENTRY.pack(offset, size, bytecode[-SIGNATURE_SIZE:]))
+            offset += size
+        index = b"".join(index)
+        with open(out_file, "wb") as fp:
+            fp.write(index)
+            fp.write(Compiler.sign(index))
+            for bytecode in self.entries.values():
+                fp.write(memoryview(bytecode)[:-SIGNATURE_SIZE])
+
+
+class Bundle:
+    """Random access to the programs in a MathLang bundle.
+
+    The bundle is memory-mapped, and only the index is read when it is opened. Programs are verified and decompiled
+    one at a time when they are asked for, straight from the mapped file.
+    """
+
+    def __init__(self, in_file: PathLike, unsafe: bool = False):
+        self.unsafe = unsafe
+        self.index = {}
+        with open(in_file, "rb") as fp:
+            self.__map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        self.__view = memoryview(self.__map)
+        try:
+            self.__read_index()
+        except BaseException:
+            self.close()
+            raise
+
+    def __read_index(self):
+        view = self.__view
+        if len(view) < HEADER.size:
+            raise BytecodeFormatError("MathLang bundle is truncated.")
+        magic, version, count, index_size = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise BytecodeFormatError("Not a MathLang bundle.")
+        if version != FORMAT_VERSION:
+            raise BytecodeFormatError(f"Unsupported MathLang bundle format version {version}.")
+        end = HEADER.size + index_size
+        if len(view) < end + SIGNATURE_SIZE:
+            raise BytecodeFormatError("MathLang bundle is truncated.")
+        with view[:end] as index, view[end:end + SIGNATURE_SIZE] as signature:
+            Compiler.verify(index, signature, self.unsafe)
+        position = HEADER.size
+        for _ in range(count):
+            (name_size,) = INDEX_NAME.unpack_from(view, position)
+            position += INDEX_NAME.size
+            name = bytes(view[position:position + name_size]).decode()
+            position += name_size
+            offset, size, signature = INDEX_ENTRY.unpack_from(view, position)
+            position += INDEX_ENTRY.size
+            if offset + size > len(view):
+                raise BytecodeFormatError(f"MathLang bundle entry '{name}' is truncated.")
+            self.index[name] = (offset, size, signature)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.index)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def get_bytecode(self, name: str) -> memoryview:
+        """Gets the unsigned bytecode of a program, without copying it out of the bundle."""
+        offset, size, _ = self.index[name]
+        return self.__view[offset:offset + size]
+
+    def get_code(self, name: str) -> CodeType:
+        """Verifies and decompiles a single program.
+
+        :param name: Name of the program.
+        :type name: str
+        :return: Python bytecode.
+        :rtype: CodeType
+        """
+        with self.get_bytecode(name) as bytecode:
+            Compiler.verify(bytecode, self.index[name][2], self.unsafe)
+            return load_code(bytecode)
+
+    def verify(self) -> List[str]:
+        """Checks the signature of every program in one pass over the bundle.
+
+        :return: Names of the programs whose signatures are invalid.
+        :rtype: List[str]
+        """
+        failed = []
+        for name, (offset, size, signature) in sorted(self.index.items(), key=lambda item: item[1][0]):
+            with self.__view[offset:offset + size] as bytecode:
+                try:
+                    Compiler.verify(bytecode, signature)
+                except UnsafeDecompilationError:
+                    failed.append(name)
+        return failed
+
+    def close(self) -> None:
+        self.__view.release()
+        self.__map.close()
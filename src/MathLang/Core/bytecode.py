@@ -0,0 +1,81 @@
+import marshal
+import struct
+from importlib.util import MAGIC_NUMBER
+from types import CodeType
+
+# MathLang bytecode container, version 1:
+#
+#   magic            4 bytes   b"MLBC"
+#   format version   uint16
+#   python tag       4 bytes   importlib.util.MAGIC_NUMBER of the compiling interpreter
+#   flags            uint16    reserved, must be 0
+#   payload length   uint64
+#   payload          marshal-serialised code object
+#
+# All integers are little-endian. The compiler appends the signature trailer, which covers the header and payload.
+# Symbolic programs import sympy when they run, and MathLang.Core.solver or MathLang.Core.vectorised if they solve,
+# evaluate functions at many points or plot, so they need a MathLang of the version which compiled them.
+MAGIC = b"MLBC"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sH4sHQ")
+
+
+class BytecodeFormatError(ValueError):
+    def __init__(self, *args):
+        super(BytecodeFormatError, self).__init__(*args)
+
+
+def is_container(bytecode: bytes) -> bool:
+    """Checks whether bytecode uses the container format, rather than the legacy dill format."""
+    return bytecode[:len(MAGIC)] == MAGIC
+
+
+def dump_code(code: CodeType) -> bytes:
+    """Wraps a Python code object in a MathLang bytecode container.
+
+    :param code: Python code object.
+    :type code: CodeType
+    :return: The container, without signature.
+    :rtype: bytes
+    """
+    payload = marshal.dumps(code)
+    return HEADER.pack(MAGIC, FORMAT_VERSION, MAGIC_NUMBER, 0, len(payload)) + payload
+
+
+def check_header(bytecode: bytes) -> int:
+    """Validates the header of a MathLang bytecode container without touching the payload.
+
+    :param bytecode: The container, without signature.
+    :type bytecode: bytes
+    :return: The payload length.
+    :rtype: int
+    """
+    if len(bytecode) < HEADER.size:
+        raise BytecodeFormatError("MathLang bytecode is truncated.")
+    magic, version, python_tag, flags, length = HEADER.unpack_from(bytecode)
+    if magic != MAGIC:
+        raise BytecodeFormatError("Not a MathLang bytecode container.")
+    if version != FORMAT_VERSION:
+        raise BytecodeFormatError(f"Unsupported MathLang bytecode format version {version}.")
+    if python_tag != MAGIC_NUMBER:
+        raise BytecodeFormatError("MathLang bytecode was compiled for a different Python version.")
+    if flags != 0:
+        raise BytecodeFormatError(f"Unsupported MathLang bytecode flags {flags:#x}.")
+    if len(bytecode) != HEADER.size + length:
+        raise BytecodeFormatError("MathLang bytecode length does not match its header.")
+    return length
+
+
+def load_code(bytecode: bytes) -> CodeType:
+    """Unwraps a Python code object from a MathLang bytecode container. The signature must be checked beforehand.
+
+    :param bytecode: The container, without signature.
+    :type bytecode: bytes
+    :return: Python code object.
+    :rtype: CodeType
+    """
+    check_header(bytecode)
+    code = marshal.loads(memoryview(bytecode)[HEADER.size:])
+    if not isinstance(code, CodeType):
+        raise BytecodeFormatError("MathLang bytecode does not contain a code object.")
+    return code
@@ -0,0 +1,225 @@
+import os
+import re
+import sys
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from os import PathLike
+from typing import Optional
+
+from MathLang.Core.lexer import get_source_signature
+
+# The names of entries on disk, as made by 'CompileCache.get_key()'
+_key_pattern = re.compile("[0-9a-f]{64}")
+
+
+class CacheStatistics:
+    """Hit and miss counters of a compile cache."""
+
+    def __init__(self):
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __repr__(self):
+        return (f"CacheStatistics(memory_hits={self.memory_hits}, disk_hits={self.disk_hits}, misses={self.misses}, "
+                f"evictions={self.evictions})")
+
+
+class CompileCache:
+    """A content-addressed cache of compiled MathLang programs.
+
+    Programs are keyed by their source signature and the compiler version, so sources which only differ in comments
+    and whitespace share an entry. Entries are kept in an in-memory LRU tier and, if a directory is given, in an
+    on-disk tier shared by every cache using the same directory. Both tiers evict their least recently used entries
+    once they grow beyond their size limits. The cache is safe to use from many threads.
+
+    The in-memory tier stores unsigned bytecode. Entries on disk are signed together with their keys, see
+    'Compiler.sign()', since anyone able to write to the directory could otherwise have any code signed as trusted. An
+    entry which fails verification, e.g. because it was tampered with or the signing key changed, is a miss and is
+    removed. The on-disk tier is only used when a signing key is set, as nothing could be verified otherwise. It only
+    holds keys made by 'get_key()', and leaves any other file of the directory alone.
+    """
+
+    def __init__(self, max_memory_size: int = 64 * 1024 ** 2, directory: PathLike = None,
+                 max_disk_size: int = 1024 ** 3):
+        self.max_memory_size = max_memory_size
+        self.max_disk_size = max_disk_size
+        self.directory = directory
+        self.stats = CacheStatistics()
+        self.__lock = threading.Lock()
+        self.__memory = OrderedDict()
+        self.__memory_size = 0
+        self.__disk = OrderedDict()
+        self.__disk_size = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            self.__load_disk_index()
+
+    @staticmethod
+    def get_key(source: str, version: str) -> str:
+        """Gets the cache key of MathLang source code.
+
+        :param source: MathLang source code.
+        :type source: str
+        :param version: Version of the compiler producing the bytecode.
+        :type version: str
+        :return: A hexadecimal cache key.
+        :rtype: str
+        """
+        digest = hashlib.sha256(f"{version}:{sys.version_info[0]}.{sys.version_info[1]}:".encode())
+        digest.update(get_source_signature(source).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Gets cached bytecode, or None if the key is not cached."""
+        with self.__lock:
+            value = self.__memory.get(key)
+            if value is not None:
+                self.__memory.move_to_end(key)
+                self.stats.memory_hits += 1
+                return value
+        value = self.__read(key)
+        with self.__lock:
+            if value is None:
+                self.stats.misses += 1
+                return None
+            self.stats.disk_hits += 1
+            self.__put_memory(key, value)
+        return value
+
+    def put(self, key: str, value: bytes) -> None:
+        """Adds bytecode to every tier of the cache."""
+        with self.__lock:
+            self.__put_memory(key, value)
+        self.__write(key, value)
+
+    def clear(self) -> None:
+        """Removes every entry from the cache. Statistics are kept."""
+        with self.__lock:
+            self.__memory.clear()
+            self.__memory_size = 0
+            keys = list(self.__disk)
+            self.__disk.clear()
+            self.__disk_size = 0
+        for key in keys:
+            self.__remove(key)
+
+    def __len__(self):
+        with self.__lock:
+            return len(self.__memory.keys() | self.__disk.keys())
+
+    def __put_memory(self, key, value):
+        if len(value) > self.max_memory_size:
+            return
+        old = self.__memory.pop(key, None)
+        if old is not None:
+            self.__memory_size -= len(old)
+        self.__memory[key] = value
+        self.__memory_size += len(value)
+        while self.__memory_size > self.max_memory_size:
+            _, evicted = self.__memory.popitem(last=False)
+            self.__memory_size -= len(evicted)
+            self.stats.evictions += 1
+
+    def __path(self, key):
+        return os.path.join(self.directory, key)
+
+    def __load_disk_index(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and _key_pattern.fullmatch(entry.name):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, key, size in sorted(entries):
+            self.__disk[key] = size
+            self.__disk_size += size
+
+    @staticmethod
+    def __uses_disk(directory):
+        # Imported here, as the compiler uses the cache
+        from MathLang.Core.compiler import Compiler
+        return directory is not None and Compiler.has_signing_key()
+
+    @staticmethod
+    def __sign(key, value):
+        from MathLang.Core.compiler import Compiler
+        return Compiler.sign(key.encode() + value)
+
+    @staticmethod
+    def __verify(key, value, signature):
+        from MathLang.Core.compiler import Compiler, UnsafeDecompilationError
+        try:
+            Compiler.verify(key.encode() + value, signature)
+        except UnsafeDecompilationError:
+            return False
+        return True
+
+    def __read(self, key):
+        if not self.__uses_disk(self.directory) or not _key_pattern.fullmatch(key):
+            return None
+        try:
+            with open(self.__path(key), "rb") as fp:
+                entry = fp.read()
+            # Mark the entry as recently used for other processes sharing the directory
+            os.utime(self.__path(key))
+        except OSError:
+            return None
+        value, signature = entry[:-64], entry[-64:]
+        if len(entry) < 64 or not self.__verify(key, value, signature):
+            with self.__lock:
+                self.__disk_size -= self.__disk.pop(key, 0)
+            self.__remove(key)
+            return None
+        with self.__lock:
+            if key not in self.__disk:
+                self.__disk_size += len(entry)
+            self.__disk[key] = len(entry)
+            self.__disk.move_to_end(key)
+        return value
+
+    def __write(self, key, value):
+        if not self.__uses_disk(self.directory) or not _key_pattern.fullmatch(key):
+            return
+        value += self.__sign(key, value)
+        if len(value) > self.max_disk_size:
+            return
+        # Write to a temporary file first, so that readers never see a partial entry
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".")
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                fp.write(value)
+            os.replace(tmp, self.__path(key))
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        evicted = []
+        with self.__lock:
+            self.__disk_size -= self.__disk.pop(key, 0)
+            self.__disk[key] = len(value)
+            self.__disk_size += len(value)
+            while self.__disk_size > self.max_disk_size:
+                old_key, size = self.__disk.popitem(last=False)
+                self.__disk_size -= size
+                self.stats.evictions += 1
+                evicted.append(old_key)
+        for old_key in evicted:
+            self.__remove(old_key)
+
+    def __remove(self, key):
+        try:
+            os.remove(self.__path(key))
+        except OSError:
+            pass
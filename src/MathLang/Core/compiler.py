@@ -2,41 +2,165 @@ import os
 import hmac
 import base64
 
-import dill
-from py import code
+from types import CodeType
 
-from MathLang.Core import generate_ast
+from MathLang.Core.bytecode import BytecodeFormatError, dump_code, is_container, load_code
+from MathLang.Core.cache import CompileCache
+from MathLang.Core.instrumentation import count_nodes, get_instrumentation, null_phase
+from MathLang.Core.lexer import get_lexer
+from MathLang.Core.nodes import CompilationContext, generate_python_code
+from MathLang.Core.optimiser import optimise
+from MathLang.Core.parser import get_parser
+
+# Changing the generated code or the bytecode format must change this version, so that cached bytecode is not reused
+COMPILER_VERSION = "2021.6"
 
 
 class Compiler:
     @staticmethod
-    def py_compile(source: str) -> bytes:
+    def py_compile(source: str, cache: CompileCache = None, optimisation_level: int = 0,
+                   target: str = "symbolic") -> bytes:
         """Compiles MathLang source code to MathLang bytecode.
 
+        Every call uses its own compilation context, so it is safe to compile many programs from different threads.
+        Each phase of the compilation is recorded by the instrumentation of the process, if it is on, see
+        'set_instrumentation()'.
+
         :param source: MathLang source code.
         :type source: str
+        :param cache: The cache to look the program up in, and to add it to if it is not there.
+        :type cache: CompileCache
+        :param optimisation_level: How much to optimise the program, see 'optimise()'. 0 does not optimise it at all.
+        :type optimisation_level: int
+        :param target: The kind of code to generate, "symbolic" or "numeric", see 'generate_python_code()'.
+        :type target: str
         :return: MathLang bytecode.
         :rtype: bytes
         """
-        ast = generate_ast(source)
-        bytecode = Compiler.__compile(ast.codify())
-        signature = Compiler.__sign(bytecode, True)
+        instrumentation = get_instrumentation()
+        # Phases only record anything when instrumentation is on, otherwise they give None rather than a record
+        phase = null_phase if instrumentation is None else instrumentation.begin_compilation()
+        bytecode = None
+        if cache is not None:
+            with phase("cache_lookup") as record:
+                key = cache.get_key(source, Compiler.__get_version(optimisation_level, target))
+                bytecode = cache.get(key)
+                if record is not None:
+                    record.counts["hits"] = int(bytecode is not None)
+        if bytecode is None:
+            context = CompilationContext()
+            with phase("lex") as record:
+                tokens = get_lexer().lex(source)
+                if record is not None:
+                    # Lexed ahead of parsing, to be timed on its own
+                    tokens = list(tokens)
+                    record.counts["characters"] = len(source)
+                    record.counts["tokens"] = len(tokens)
+            with phase("parse") as record:
+                ast = get_parser().parse(iter(tokens), context)
+                if record is not None:
+                    record.counts["nodes"] = count_nodes(ast)
+                    record.counts["symbols"] = len(context.symbols)
+            if optimisation_level:
+                with phase("optimise") as record:
+                    ast = optimise(ast, optimisation_level)
+                    if record is not None:
+                        record.counts["nodes"] = count_nodes(ast)
+            if optimisation_level or target != "symbolic":
+                # Names may have changed, and other targets have contexts of their own
+                context = None
+            with phase("codegen") as record:
+                code = generate_python_code(ast, context, target)
+                if record is not None:
+                    record.counts["characters"] = len(code)
+            with phase("compile") as record:
+                code_object = compile(code, "<MathLang>", "exec", optimize=2)
+                if record is not None:
+                    record.counts["names"] = len(code_object.co_names)
+                    record.counts["constants"] = len(code_object.co_consts)
+            with phase("marshal") as record:
+                bytecode = dump_code(code_object)
+                if record is not None:
+                    record.counts["bytes"] = len(bytecode)
+            if cache is not None:
+                with phase("cache_store") as record:
+                    cache.put(key, bytecode)
+                    if record is not None:
+                        record.counts["bytes"] = len(bytecode)
+        with phase("sign") as record:
+            signature = Compiler.__sign(bytecode, True)
+            if record is not None:
+                record.counts["bytes"] = len(bytecode)
         return bytecode + signature
 
     @staticmethod
-    def py_decompile(source: bytes, unsafe: bool = False) -> code:
+    def __get_version(optimisation_level, target):
+        version = COMPILER_VERSION
+        if optimisation_level:
+            version += f"-O{optimisation_level}"
+        if target != "symbolic":
+            version += f"-{target}"
+        return version
+
+    @staticmethod
+    def py_compile_code(code: str) -> bytes:
+        """Compiles Python code generated from MathLang source to MathLang bytecode.
+
+        :param code: Python code, as returned by 'generate_python_code()'.
+        :type code: str
+        :return: MathLang bytecode.
+        :rtype: bytes
+        """
+        bytecode = Compiler.__compile(code)
+        return bytecode + Compiler.__sign(bytecode, True)
+
+    @staticmethod
+    def py_decompile(source: bytes, unsafe: bool = False) -> CodeType:
         """Decompile MathLang bytecode to Python bytecode.
 
+        The signature is verified before anything is deserialised. Bytecode in the legacy dill format, produced by
+        earlier versions of MathLang, can still be decompiled.
+
         :param source: MathLang bytecode.
         :type source: bytes
         :param unsafe: Whether to enable unsafe decompilation.
         :type unsafe: bytes
         :return: Python bytecode.
-        :rtype: code
+        :rtype: CodeType
         """
         bytecode, signature = source[:-64], source[-64:]
+        Compiler.verify(bytecode, signature, unsafe)
         try:
-            ctrl_signature = Compiler.__sign(bytecode, False)
+            return Compiler.__decompile(bytecode)
+        except BytecodeFormatError:
+            raise
+        except (EOFError, ValueError, TypeError):
+            raise ValueError("MathLang bytecode cannot be decompiled due to data corruption.")
+
+    @staticmethod
+    def sign(data: bytes) -> bytes:
+        """Signs data with the signing key, or with a random key if none is set.
+
+        :param data: The data to sign.
+        :type data: bytes
+        :return: A 64-byte signature.
+        :rtype: bytes
+        """
+        return Compiler.__sign(data, True)
+
+    @staticmethod
+    def verify(data: bytes, signature: bytes, unsafe: bool = False) -> None:
+        """Verifies the signature of data, raising UnsafeDecompilationError if it cannot be trusted.
+
+        :param data: The signed data.
+        :type data: bytes
+        :param signature: The signature of the data.
+        :type signature: bytes
+        :param unsafe: Whether to accept data which cannot be verified.
+        :type unsafe: bool
+        """
+        try:
+            ctrl_signature = Compiler.__sign(data, False)
             assert hmac.compare_digest(signature, ctrl_signature)
         except UnverifiedSignatureWarning:
             if not unsafe:
@@ -44,10 +168,11 @@ class Compiler:
         except AssertionError:
             if not unsafe:
                 raise UnsafeDecompilationError("Signature verification failed.")
-        try:
-            return Compiler.__decompile(bytecode)
-        except (EOFError, ValueError, TypeError):
-            raise ValueError("MathLang bytecode cannot be decompiled due to data corruption.")
+
+    @staticmethod
+    def has_signing_key() -> bool:
+        """Whether a signing key is set, so that signatures can be verified, in this or any other process."""
+        return os.getenv("GRAPHER_SIGNING_KEY") is not None
 
     @staticmethod
     def get_signing_key():
@@ -55,10 +180,14 @@ class Compiler:
 
     @staticmethod
     def __compile(source):
-        return dill.dumps(compile(source, "<MathLang>", "exec", optimize=2))
+        return dump_code(compile(source, "<MathLang>", "exec", optimize=2))
 
     @staticmethod
     def __decompile(bytecode):
+        if is_container(bytecode):
+            return load_code(bytecode)
+        # Legacy format, to be removed once no dill-pickled bytecode is left in use
+        import dill
         return dill.loads(bytecode)
 
     @staticmethod
@@ -90,7 +219,24 @@ class UnsafeDecompilationError(BaseException):
         super(UnsafeDecompilationError, self).__init__(*args)
 
 
-def execute(source) -> None:
-    """Executes MathLang source code. This function is dangerous and used for debugging purposes only."""
+def execute(source) -> list:
+    """Executes MathLang source code. This function is dangerous and used for debugging purposes only.
+
+    :return: What the PLOT statements of the program rendered, with the settings of the plot output of the process,
+        see 'PlotOutput.take()'. They are returned rather than left in the plot output.
+    :rtype: list
+    """
+    from MathLang.Core.plotting import PlotOutput, get_plot_output, set_plot_output
+
     s = Compiler.py_compile(source)
-    exec(Compiler.py_decompile(s, True))
+    output = get_plot_output()
+    own = PlotOutput(output.directory, output.fmt, output.prefix, max_images=None, **output.options)
+    # Image files go on being numbered where the output got to
+    own.count = output.count
+    set_plot_output(own)
+    try:
+        exec(Compiler.py_decompile(s, True))
+    finally:
+        output.count = own.count
+        set_plot_output(output)
+    return own.take()
@@ -0,0 +1,200 @@
+import io
+import os
+import queue
+import traceback
+import multiprocessing
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
+from time import perf_counter
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+class ExecutionResult:
+    """The outcome of running a compiled MathLang program in an execution pool."""
+
+    def __init__(self, output: str, error: str = None, elapsed: float = 0.0, images: list = ()):
+        self.output = output
+        self.error = error
+        self.elapsed = elapsed
+        # What the PLOT statements of the program rendered, see 'PlotOutput.take()'
+        self.images = list(images)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self):
+        return f"ExecutionResult(output={self.output!r}, error={self.error!r}, elapsed={self.elapsed:.3f})"
+
+
+def _worker_main(conn, unsafe, memory_limit, max_jobs):
+    if memory_limit is not None and resource is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    # Workers never have a display, so plots must not try to open a window
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    # Every generated program starts by importing SymPy, which is only slow the first time
+    import sympy  # noqa: F401
+    from MathLang.Core.compiler import Compiler
+    from MathLang.Core.plotting import get_plot_output
+
+    # Time limits only start once the worker is ready
+    conn.send_bytes(b"ready")
+    jobs = 0
+    while max_jobs is None or jobs < max_jobs:
+        try:
+            bytecode = conn.recv_bytes()
+        except EOFError:
+            break
+        if not bytecode:
+            # Asked to stop
+            break
+        jobs += 1
+        output = io.StringIO()
+        error = None
+        start = perf_counter()
+        try:
+            code = Compiler.py_decompile(bytecode, unsafe)
+            with redirect_stdout(output), redirect_stderr(output):
+                exec(code, {"__name__": "__mathlang__"})
+        except BaseException as e:
+            error = "".join(traceback.format_exception_only(type(e), e)).strip()
+        # Plots go back with the output, rather than piling up in the worker
+        conn.send((output.getvalue(), error, perf_counter() - start, get_plot_output().take()))
+    conn.close()
+
+
+class _Worker:
+    def __init__(self, context, unsafe, memory_limit, max_jobs):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn, unsafe, memory_limit, max_jobs), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+        self.ready = False
+
+    def wait_ready(self):
+        if not self.ready:
+            self.conn.recv_bytes()
+            self.ready = True
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def close(self):
+        try:
+            self.conn.send_bytes(b"")
+        except OSError:
+            pass
+        self.conn.close()
+        self.process.join()
+
+
+class ExecutionPool:
+    """A pool of warm worker processes running compiled MathLang programs.
+
+    Workers are started up front and import SymPy once, so that programs do not pay for it on every run. Each program
+    runs in a fresh namespace, and everything it prints is captured and returned to the caller. A worker is replaced
+    when a program times out or crashes it, and after it has run 'max_jobs_per_worker' programs.
+
+    :param workers: Number of worker processes, the number of CPUs by default.
+    :type workers: int
+    :param max_jobs_per_worker: Number of programs after which a worker is recycled, or None to never recycle.
+    :type max_jobs_per_worker: int
+    :param timeout: Default time limit of a program in seconds, or None for no limit.
+    :type timeout: float
+    :param memory_limit: Address space limit of each worker in bytes, or None for no limit. Only supported on POSIX.
+    :type memory_limit: int
+    :param unsafe: Whether to run programs whose signature cannot be verified.
+    :type unsafe: bool
+    """
+
+    def __init__(self, workers: int = None, max_jobs_per_worker: int = None, timeout: float = None,
+                 memory_limit: int = None, unsafe: bool = False):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.unsafe = unsafe
+        # Workers are started from the pool's threads, so they must not be forked from this process, where other
+        # threads may hold locks. A forkserver would not see changes to the environment, e.g. of the signing key.
+        self.__context = multiprocessing.get_context("spawn")
+        self.__idle = queue.Queue()
+        self.__all = set()
+        self.__threads = ThreadPoolExecutor(self.workers)
+        for _ in range(self.workers):
+            self.__idle.put(self.__spawn())
+
+    def __spawn(self):
+        worker = _Worker(self.__context, self.unsafe, self.memory_limit, self.max_jobs_per_worker)
+        self.__all.add(worker)
+        return worker
+
+    def __replace(self, worker, kill):
+        self.__all.discard(worker)
+        if kill:
+            worker.kill()
+        else:
+            worker.close()
+        return self.__spawn()
+
+    def run(self, bytecode: bytes, timeout: float = None) -> ExecutionResult:
+        """Runs a compiled program and waits for it to finish.
+
+        :param bytecode: MathLang bytecode.
+        :type bytecode: bytes
+        :param timeout: Time limit in seconds, the pool's default if not given.
+        :type timeout: float
+        :return: The captured output and error of the program.
+        :rtype: ExecutionResult
+        """
+        timeout = self.timeout if timeout is None else timeout
+        worker = self.__idle.get()
+        try:
+            worker.wait_ready()
+            worker.conn.send_bytes(bytecode)
+            if not worker.conn.poll(timeout):
+                worker = self.__replace(worker, True)
+                return ExecutionResult("", f"Program timed out after {timeout} seconds", timeout)
+            output, error, elapsed, images = worker.conn.recv()
+        except (EOFError, OSError):
+            worker = self.__replace(worker, True)
+            return ExecutionResult("", "Worker process exited unexpectedly")
+        except BaseException:
+            worker = self.__replace(worker, True)
+            raise
+        else:
+            worker.jobs += 1
+            if self.max_jobs_per_worker is not None and worker.jobs >= self.max_jobs_per_worker:
+                worker = self.__replace(worker, False)
+            return ExecutionResult(output, error, elapsed, images)
+        finally:
+            self.__idle.put(worker)
+
+    def submit(self, bytecode: bytes, timeout: float = None) -> Future:
+        """Runs a compiled program in the background.
+
+        :return: A future of the program's ExecutionResult.
+        :rtype: Future
+        """
+        return self.__threads.submit(self.run, bytecode, timeout)
+
+    def close(self) -> None:
+        """Waits for submitted programs to finish and stops every worker."""
+        self.__threads.shutdown()
+        for worker in list(self.__all):
+            worker.close()
+        self.__all.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
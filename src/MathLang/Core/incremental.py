@@ -0,0 +1,120 @@
+import re
+from io import StringIO
+from itertools import chain
+
+from MathLang.Core.compiler import Compiler
+from MathLang.Core.lexer import get_lexer, keywords
+from MathLang.Core.nodes import Assignment, CompilationContext, Program
+from MathLang.Core.parser import get_parser
+from MathLang.Core.streaming import iter_statements
+
+_placeholder = re.compile("\x00([^\x00]*)\x00")
+_name = re.compile(r"[_a-zA-Z][_a-zA-Z0-9]*")
+
+
+class _AnyName:
+    def __contains__(self, symbol):
+        return isinstance(symbol, str) and _name.fullmatch(symbol) is not None and symbol.upper() not in keywords
+
+
+class _TemplateContext(CompilationContext):
+    """Generates code with a placeholder in place of every name, so that names can be numbered afterwards."""
+
+    def __init__(self):
+        self.symbols = _AnyName()
+        self.indent = 0
+        self.nodes = None
+        self.shared = {}
+        self.values = {}
+        # Names used by the code, in order and without duplicates
+        self.names = {}
+
+    def declare(self, symbol):
+        pass
+
+    def get_symbol(self, symbol):
+        self.names[symbol] = None
+        return f"\x00{symbol}\x00"
+
+
+class _Statement:
+    """The parsed and generated form of a single statement, kept between compilations."""
+
+    def __init__(self, stmts):
+        context = _TemplateContext()
+        self.assigned = [stmt.name for stmt in stmts if isinstance(stmt, Assignment)]
+        self.template = "".join(str(stmt.codify(context)) for stmt in stmts)
+        self.names = tuple(context.names)
+        # The Python names the code was last rendered with
+        self.numbering = None
+        self.code = None
+
+    def render(self, symbols):
+        numbering = tuple(symbols.get(name) for name in self.names)
+        if numbering != self.numbering:
+            # Names which are never assigned are left as they are, like a full compilation does
+            self.code = _placeholder.sub(lambda m: symbols.get(m.group(1), m.group(1)), self.template)
+            self.numbering = numbering
+        return self.code
+
+
+class IncrementalCompiler:
+    """Recompiles a program which is being edited, only parsing and generating code for the statements that changed.
+
+    Statements are remembered by their source text between calls. A statement which is unchanged is neither lexed,
+    parsed nor generated again, and its code is only renumbered if an edit elsewhere changed the numbering of the names
+    it uses. The result is identical to compiling the whole program with 'Compiler.py_compile()'; only the final
+    Python compilation of the generated code still covers the whole program.
+
+    An IncrementalCompiler keeps the state of a single program, and must not be shared between threads.
+    """
+
+    def __init__(self):
+        self.__statements = {}
+        # Number of statements parsed by the last compilation
+        self.reparsed = 0
+
+    def generate_python_code(self, source: str) -> str:
+        """Generate valid Python code from MathLang source code, reusing what is known from the previous call.
+
+        :param source: MathLang source code.
+        :type source: str
+        :return: A Python code string, the same as 'generate_python_code(generate_ast(source))'.
+        :rtype: str
+        """
+        lexer = get_lexer()
+        parser = get_parser()
+        statements = {}
+        entries = []
+        reparsed = 0
+        for lineno, text in iter_statements(StringIO(source), max(len(source), 1)):
+            entry = statements.get(text) or self.__statements.get(text)
+            if entry is None:
+                tokens = lexer.lex(text, lineno)
+                first = next(tokens, None)
+                stmts = [] if first is None else parser.parse(chain((first,), tokens), CompilationContext()).stmts
+                entry = _Statement(stmts)
+                reparsed += 1
+            statements[text] = entry
+            entries.append(entry)
+
+        # Names are numbered in order of assignment over the whole program, as 'Program.codify()' does
+        context = CompilationContext()
+        for entry in entries:
+            for name in entry.assigned:
+                context.declare(name)
+        body = "".join(entry.render(context.symbols) for entry in entries)
+        # Statements which are no longer in the program are forgotten
+        self.__statements = statements
+        self.reparsed = reparsed
+        return Program.finalise_code(Program.init_code(context, body) + body, context)
+
+    def py_compile(self, source: str) -> bytes:
+        """Compiles MathLang source code to MathLang bytecode, reusing what is known from the previous call.
+
+        :param source: MathLang source code.
+        :type source: str
+        :return: MathLang bytecode.
+        :rtype: bytes
+        """
+        return Compiler.py_compile_code(self.generate_python_code(source))
@@ -0,0 +1,236 @@
+import os
+import sys
+import json
+import logging
+import threading
+import tracemalloc
+from itertools import count
+from time import perf_counter, process_time
+from typing import Callable, Dict, Optional
+
+from MathLang.Core.nodes import iter_children
+
+
+class PhaseRecord:
+    """The measurements of one phase of one compilation, e.g. parsing.
+
+    Allocations are the net number of memory blocks allocated by the interpreter during the phase, from all threads.
+    The net number of bytes allocated is only known while tracemalloc is tracing. Peaks are not recorded, since the
+    peak of tracemalloc belongs to whoever started it.
+    """
+
+    __slots__ = ("compilation", "phase", "wall_time", "cpu_time", "allocated_blocks", "allocated_bytes", "counts",
+                 "error")
+
+    def __init__(self, compilation: int, phase: str):
+        self.compilation = compilation
+        self.phase = phase
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.allocated_blocks = 0
+        self.allocated_bytes = None
+        # What the phase went through, e.g. {"tokens": 120}
+        self.counts = {}
+        # The name of the exception the phase failed with, if it did
+        self.error = None
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"PhaseRecord({self.compilation}, {self.phase!r}, wall_time={self.wall_time:.6f}, counts={self.counts})"
+
+
+class PhaseStatistics:
+    """Totals of one phase over many compilations."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.allocated_blocks = 0
+        self.counts = {}
+
+    def add(self, record: PhaseRecord) -> None:
+        self.calls += 1
+        self.errors += record.error is not None
+        self.wall_time += record.wall_time
+        self.cpu_time += record.cpu_time
+        self.allocated_blocks += record.allocated_blocks
+        for name, value in record.counts.items():
+            self.counts[name] = self.counts.get(name, 0) + value
+
+    def __repr__(self):
+        return (f"PhaseStatistics(calls={self.calls}, errors={self.errors}, wall_time={self.wall_time:.6f}, "
+                f"cpu_time={self.cpu_time:.6f}, allocated_blocks={self.allocated_blocks}, counts={self.counts})")
+
+
+class CompilerStatistics:
+    """Totals of every phase of the compiler over many compilations, in the order phases first ran.
+
+    Statistics are safe to share between threads.
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, PhaseStatistics] = {}
+        self.__lock = threading.Lock()
+
+    def add(self, record: PhaseRecord) -> None:
+        with self.__lock:
+            try:
+                phase = self.phases[record.phase]
+            except KeyError:
+                phase = self.phases[record.phase] = PhaseStatistics()
+            phase.add(record)
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.phases = {}
+
+    def format(self) -> str:
+        """Formats the statistics as a table, one line per phase."""
+        lines = [f"{'phase':>14} {'calls':>7} {'wall ms':>10} {'cpu ms':>10} {'blocks':>9}  counts"]
+        for name, phase in list(self.phases.items()):
+            counts = ", ".join(f"{key}={value}" for key, value in phase.counts.items())
+            lines.append(f"{name:>14} {phase.calls:>7} {phase.wall_time * 1000:>10.2f} {phase.cpu_time * 1000:>10.2f} "
+                         f"{phase.allocated_blocks:>9}  {counts}")
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return f"CompilerStatistics({self.phases!r})"
+
+
+class _Phase:
+    # Measures a phase while it runs, and reports it once it ends
+
+    __slots__ = ("instrumentation", "record", "start")
+
+    def __init__(self, instrumentation, record):
+        self.instrumentation = instrumentation
+        self.record = record
+
+    def __enter__(self) -> PhaseRecord:
+        traced = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        self.start = (perf_counter(), process_time(), sys.getallocatedblocks(), traced)
+        return self.record
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        wall, cpu, blocks, traced = self.start
+        record = self.record
+        record.wall_time = perf_counter() - wall
+        record.cpu_time = process_time() - cpu
+        record.allocated_blocks = sys.getallocatedblocks() - blocks
+        if traced is not None and tracemalloc.is_tracing():
+            record.allocated_bytes = tracemalloc.get_traced_memory()[0] - traced
+        if exc_type is not None:
+            record.error = exc_type.__name__
+        self.instrumentation.report(record)
+
+
+class Instrumentation:
+    """Records how long each phase of the compiler takes, and what it goes through.
+
+    Every phase of every compilation makes a PhaseRecord, which is added to 'statistics', passed to the callback if
+    there is one, and logged as a line of JSON if there is a logger. Phases are lexing, parsing, optimisation, code
+    generation, Python compilation, marshalling, signing, and looking up and storing in the cache, if they run. Lexing
+    is timed on its own, rather than interleaved with parsing as it is without instrumentation.
+
+    :param callback: Called with every record, in the compiling thread.
+    :type callback: Callable[[PhaseRecord], None]
+    :param statistics: Where to add up records, new statistics by default.
+    :type statistics: CompilerStatistics
+    :param logger: The logger to write records to, at the INFO level, or None not to log them.
+    :type logger: logging.Logger
+    """
+
+    def __init__(self, callback: Callable[[PhaseRecord], None] = None, statistics: CompilerStatistics = None,
+                 logger: logging.Logger = None):
+        self.callback = callback
+        self.statistics = statistics if statistics is not None else CompilerStatistics()
+        self.logger = logger
+        self.__compilations = count(1)
+
+    def begin_compilation(self) -> Callable[[str], _Phase]:
+        """Starts recording a compilation.
+
+        :return: Takes the name of a phase, and gives a context manager to run the phase in. The context manager gives
+            the record of the phase, whose counts may be filled in.
+        """
+        compilation = next(self.__compilations)
+        return lambda phase: _Phase(self, PhaseRecord(compilation, phase))
+
+    def report(self, record: PhaseRecord) -> None:
+        """Reports a record of a phase which has ended.
+
+        Errors of the callback or the logger are logged rather than raised, so that profiling never fails a compilation.
+        """
+        self.statistics.add(record)
+        if self.callback is not None:
+            try:
+                self.callback(record)
+            except Exception:
+                _logger.exception("Instrumentation callback failed on %r", record)
+        if self.logger is not None:
+            try:
+                self.logger.info(json.dumps(record.as_dict()))
+            except Exception:
+                _logger.exception("Instrumentation logger failed on %r", record)
+
+
+class _NullPhase:
+    # Stands in for a phase when instrumentation is off, and records nothing
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return None
+
+
+_null_phase = _NullPhase()
+
+
+def null_phase(phase: str) -> _NullPhase:
+    """Gives a context manager which records nothing, for compilations which are not instrumented, see
+    'Instrumentation.begin_compilation()'. It gives None rather than a record."""
+    return _null_phase
+
+
+def count_nodes(ast) -> int:
+    """Counts the nodes of an AST. A node shared by a hash-consed AST counts once for every place it appears."""
+    nodes = 0
+    stack = [ast]
+    while stack:
+        nodes += 1
+        stack.extend(iter_children(stack.pop()))
+    return nodes
+
+
+def _get_default_instrumentation():
+    # MATHLANG_PROFILE=on logs every phase of every compilation to the "MathLang.profile" logger
+    setting = os.environ.get("MATHLANG_PROFILE", "")
+    if setting.lower() in ("", "0", "off", "false", "no"):
+        return None
+    return Instrumentation(logger=logging.getLogger("MathLang.profile"))
+
+
+_logger = logging.getLogger(__name__)
+_instrumentation = _get_default_instrumentation()
+
+
+def get_instrumentation() -> Optional[Instrumentation]:
+    """Gets the instrumentation of the compiler in this process, or None if it is off."""
+    return _instrumentation
+
+
+def set_instrumentation(instrumentation: Optional[Instrumentation]) -> None:
+    """Sets the instrumentation of the compiler in this process.
+
+    :param instrumentation: The instrumentation to use, or None to turn it off.
+    :type instrumentation: Optional[Instrumentation]
+    """
+    global _instrumentation
+    _instrumentation = instrumentation
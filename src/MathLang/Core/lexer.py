@@ -1,7 +1,8 @@
 import re
 from typing import Generator
 
-from rply import LexerGenerator, Token
+from rply import LexingError, Token
+from rply.token import SourcePosition
 
 # This tuple is the master token-pattern pairs list
 token_pair = (
@@ -20,6 +21,8 @@ token_pair = (
     ("RATIONAL", r"RATIONAL"),
     # 7. Integer
     ("INTEGER", r"INTEGER"),
+    # 8. Step
+    ("STEP", r"step"),
 
     # For identifiers
     # At most 64 characters
@@ -36,6 +39,8 @@ token_pair = (
     ("SEMICOLON", r"\;"),
     # 3. Comma
     ("COMMA", r","),
+    # 4. Range
+    ("RANGE", r"\.\."),
 
     # For comparison operators
     ("EQ", r"=="),
@@ -58,9 +63,6 @@ token_pair = (
     ("CARAT", r"\^"),
     # 6. Equal
     ("EQUAL", r"="),
-
-    # Whitespace (to be ignored later)
-    ("WHITESPACE", " "),
 )
 
 # This tuple is the master token list
@@ -68,6 +70,8 @@ tokens = [_[0] for _ in token_pair]
 
 # This tuple is the master ignored token list
 ignored_tokens = (
+    # Spaces
+    r" ",
     # Newlines
     r"\r\n|\r|\n",
     # Tabs
@@ -76,40 +80,101 @@ ignored_tokens = (
     r"#.*"
 )
 
+# Reserved keywords are lexed as identifiers first, then looked up in this table (case-insensitively). This way, names
+# such as 'printer' are not split into a keyword and the rest of the name.
+keywords = {pattern.upper(): name for name, pattern in token_pair if pattern.isalpha()}
+
+# Contextual keywords are only keywords where a name could not go, and are names everywhere else. 'step' is a keyword
+# right after the end of a range in the same parentheses, e.g. 'f(1..n step 2)', but 'step = 2;' assigns to a name.
+contextual_keywords = {"STEP": "STEP"}
+for _keyword in contextual_keywords:
+    del keywords[_keyword]
+# Tokens which end an expression, so that a name cannot follow them
+expression_ends = {"ID", "NUMBER", "RPAREN"}
+
 
 class Lexer:
     def __init__(self):
         self.token_pair = token_pair
         self.tokens = tokens
         self.ignored_tokens = ignored_tokens
-        self.lg = LexerGenerator()
+        self.keywords = keywords
         self.lexer = self.get_lexer()
-        if "WHITESPACE" in self.tokens:
-            self.tokens.remove("WHITESPACE")
 
     def get_lexer(self):
-        # Add accepted tokens
-        for pair in self.token_pair:
-            self.lg.add(pair[0], pair[1], re.IGNORECASE)
+        """Combines every token pattern into a single master regex, so that each token is found with one match.
 
-        # Ignore ignored tokens
-        for it in self.ignored_tokens:
-            self.lg.ignore(it)
-        return self.lg.build()
+        Ignored tokens come first and are matched in runs. Keywords are left out, since they are matched as 'ID'.
+        """
+        patterns = [f"(?P<_ignored>(?:{'|'.join(self.ignored_tokens)})+)"]
+        for name, pattern in self.token_pair:
+            if pattern.upper() not in self.keywords and pattern.upper() not in contextual_keywords:
+                patterns.append(f"(?P<{name}>{pattern})")
+        return re.compile("|".join(patterns))
 
-    def lex(self, s) -> Generator[Token, None, None]:
+    def lex(self, s, lineno=1) -> Generator[Token, None, None]:
         """Yields a stream of tokens from source.
 
         :param s: MathLang source code.
         :type s: str
+        :param lineno: Line number of the start of the source, if it is part of a larger one.
+        :type lineno: int
         :return: A stream of tokens.
         :rtype: Generator[Token]
         """
-        for token in self.lexer.lex(s):
-            # Ignore whitespace
-            if token.name == "WHITESPACE":
-                continue
-            yield token
+        match = self.lexer.match
+        keywords = self.keywords
+        idx = 0
+        line_start = 0
+        # Parenthesis depth, the depths of ranges which have not been closed yet, and the previous token's name
+        depth = 0
+        ranges = []
+        previous = None
+        while idx < len(s):
+            m = match(s, idx)
+            if m is None:
+                raise LexingError(None, SourcePosition(idx, lineno, idx - line_start + 1))
+            name = m.lastgroup
+            end = m.end()
+            if name == "_ignored":
+                newlines = s.count("\n", idx, end)
+                if newlines:
+                    lineno += newlines
+                    line_start = s.rindex("\n", idx, end) + 1
+            else:
+                value = m.group()
+                if name == "ID":
+                    upper = value.upper()
+                    name = keywords.get(upper, "ID")
+                    if upper in contextual_keywords and ranges and ranges[-1] == depth and previous in expression_ends:
+                        name = contextual_keywords[upper]
+                elif name == "LPAREN":
+                    depth += 1
+                elif name == "RPAREN":
+                    depth -= 1
+                    while ranges and ranges[-1] > depth:
+                        ranges.pop()
+                elif name == "RANGE":
+                    ranges.append(depth)
+                elif name == "SEMICOLON":
+                    depth = 0
+                    ranges.clear()
+                previous = name
+                yield Token(name, value, SourcePosition(idx, lineno, idx - line_start + 1))
+            idx = end
+
+
+# The process-wide lexer, built once at import time
+_lexer = Lexer()
+
+
+def get_lexer() -> Lexer:
+    """Gets the process-wide MathLang lexer.
+
+    :return: The shared lexer.
+    :rtype: Lexer
+    """
+    return _lexer
 
 
 def get_source_signature(source) -> str:
@@ -123,4 +188,4 @@ def get_source_signature(source) -> str:
     :return: A signature string.
     :rtype: str
     """
-    return " ".join([f"{_.name}:{_.value}" for _ in Lexer().lex(source)])
+    return " ".join([f"{_.name}:{_.value}" for _ in get_lexer().lex(source)])
@@ -1,170 +1,429 @@
 from __future__ import annotations
 
 import abc
+from weakref import WeakValueDictionary
 
-import sympy
+class CompilationContext:
+    """Holds the state of a single compilation, so that several programs can be compiled at the same time.
 
-global_symbol_match = list()
-current_indent = 0
+    A context is filled in by the parser and then passed to every node while generating code. It must not be shared
+    between compilations. Subclasses generate code for other targets, by overriding how nodes, names and numbers are
+    turned into code.
+    """
 
+    # The kind of code generated with this context
+    target = "symbolic"
+
+    def __init__(self):
+        # Maps each MathLang name to its Python name, in order of declaration
+        self.symbols = {}
+        self.indent = 0
+        # The table the parser hash-conses nodes in, or None to build a new node every time
+        self.nodes = None
+        # Nodes the parser built more than once, mapped to their code once it is generated
+        self.shared = {}
+        # The SymPy values of shared operations, see 'MathLang.Core.symbolic.evaluate()'
+        self.values = {}
+        # Implicit x
+        self.declare("x")
+
+    def declare(self, symbol):
+        """Adds a name to the symbol table, if it is not there yet."""
+        if symbol not in self.symbols:
+            self.symbols[symbol] = f"_{len(self.symbols)}"
+
+    def get_symbol(self, symbol):
+        """Gets the Python name of a MathLang name, adding it to the symbol table if needed."""
+        try:
+            return self.symbols[symbol]
+        except KeyError:
+            self.declare(symbol)
+            return self.symbols[symbol]
+
+    def get_number(self, number):
+        """Gets the code of a numeric literal."""
+        return number
+
+    def intern(self, node):
+        """Gets the shared copy of a node the parser has just built, if nodes are hash-consed."""
+        if self.nodes is None:
+            return node
+        shared = self.nodes.intern(node)
+        if shared is not node:
+            self.shared.setdefault(shared, None)
+        return shared
+
+    def codify(self, node):
+        """Turns an AST node into code. The code of shared nodes is only generated once."""
+        if self.shared and node in self.shared:
+            code = self.shared[node]
+            if code is None:
+                code = self.shared[node] = node.codify(self)
+            return code
+        return node.codify(self)
 
-def populate_matching_table(table):
-    global global_symbol_match
-    global_symbol_match = table
 
+def lookup_type(t):
+    return {"INTEGER": "int", "REAL": "float", "STRING": "str"}[t]
 
-def get_symbol(symbol):
-    if symbol in global_symbol_match:
-        return f"_{global_symbol_match.index(symbol)}"
-    global_symbol_match.append(symbol)
-    return f"_{len(global_symbol_match) - 1}"
 
+def get_str(obj, context):
+    if isinstance(obj, AST):
+        return context.codify(obj)
+    if obj in context.symbols:
+        return context.get_symbol(obj)
+    if isinstance(obj, str) and obj[:1].isdigit():
+        return context.get_number(obj)
+    return obj
 
-def lookup_type(t):
-    return {"INTEGER": "int", "REAL": "float", "STRING": "str"}[t]
+
+# Python precedence of the operators used in generated code, from loosest to tightest binding
+precedence_table = {
+    "==": 1, "!=": 1, "<": 1, "<=": 1, ">": 1, ">=": 1,
+    "+": 2, "-": 2,
+    "*": 3, "/": 3,
+    "unary": 4,
+    "^": 5, "**": 5,
+}
+
+
+def get_precedence(node):
+    if not isinstance(node, (BinaryOps, Comparison)):
+        return max(precedence_table.values()) + 1
+    if is_unary(node):
+        return precedence_table["unary"]
+    return precedence_table[node.op]
 
 
-def get_str(obj):
-    while True:
-        if isinstance(obj, AST):
-            obj = obj.codify()
-        elif obj in global_symbol_match:
-            return get_symbol(obj)
+def is_unary(node):
+    # Unary plus and minus are parsed as 0 +/- operand
+    return isinstance(node.left, int) and node.left == 0 and node.op in ("+", "-")
+
+
+def get_operation_str(node, context):
+    """Turns a tree of operations into Python code in a single, iterative pass.
+
+    Operands are only parenthesised where Python's operator precedence would otherwise change the structure of the
+    tree. Fragments are collected in a list and joined once, so the cost is linear in the size of the tree.
+    """
+    parts = []
+    shared = context.shared
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, _Code):
+            parts.append(item)
+        elif isinstance(item, _Memo):
+            shared[item.node] = "".join(parts[item.start:])
+        elif isinstance(item, (BinaryOps, Comparison)):
+            if shared and item is not node and item in shared:
+                # Shared operations are generated once, and their code is collected when the marker is reached
+                code = shared[item]
+                if code is not None:
+                    parts.append(code)
+                    continue
+                stack.append(_Memo(item, len(parts)))
+            precedence = get_precedence(item)
+            op = _Code("**" if item.op == "^" else item.op)
+            if is_unary(item):
+                operands = ((op, None), (item.right, get_precedence(item.right) < precedence))
+            else:
+                right_assoc = op == "**"
+                left = get_precedence(item.left)
+                right = get_precedence(item.right)
+                operands = (
+                    (item.left, left < precedence or (left == precedence and (right_assoc or precedence == 1))),
+                    (op, None),
+                    (item.right, right < precedence or (right == precedence and not right_assoc)),
+                )
+            for operand, parenthesise in reversed(operands):
+                if parenthesise:
+                    stack.extend((_Code(")"), operand, _Code("(")))
+                else:
+                    stack.append(operand)
         else:
-            return obj
+            parts.append(get_str(item, context))
+    return "".join(parts)
+
+
+class _Code(str):
+    """Marks a fragment of Python code which has already been generated."""
+
+
+class _Memo:
+    """Marks where the code of a shared node ends, the node's code starting at 'start' in the generated fragments."""
+
+    __slots__ = ("node", "start")
+
+    def __init__(self, node, start):
+        self.node = node
+        self.start = start
 
 
 class AST(metaclass=abc.ABCMeta):
-    """Parent class of all AST nodes."""
+    """Parent class of all AST nodes.
+
+    Nodes are immutable. Their fields are the names in '__slots__', in the order of the arguments of '__init__()', and
+    lists given for them are stored as tuples. Nodes compare and hash by structure, so equal trees can be used as the
+    same dict key. The hash of a node is computed once, without recursion, and kept.
+    """
+
+    __slots__ = ("_hash", "__weakref__")
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            object.__setattr__(self, name, tuple(value) if isinstance(value, list) else value)
+        object.__setattr__(self, "_hash", None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"'{type(self).__name__}' nodes are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"'{type(self).__name__}' nodes are immutable")
+
+    def __reduce__(self):
+        return type(self), self.fields()
+
+    def fields(self) -> tuple:
+        """Gets the values of the fields of this node, in order."""
+        return tuple(getattr(self, name) for name in self.__slots__)
 
     @abc.abstractmethod
-    def codify(self) -> str:
-        """Turn this node into Python code."""
+    def codify(self, context: CompilationContext) -> str:
+        """Turn this node into Python code. This must not change the node."""
 
     @abc.abstractmethod
     def serialise(self) -> dict:
         """Serialise this node in to JSON object."""
 
-    def __eq__(self, other: AST):
+    def __hash__(self):
+        if self._hash is None:
+            # Children are hashed before their parents, so that hashing a parent only uses hashes already kept
+            stack = [(self, False)]
+            while stack:
+                node, ready = stack.pop()
+                if node._hash is not None:
+                    continue
+                if ready:
+                    object.__setattr__(node, "_hash", hash((type(node),) + node.fields()))
+                else:
+                    stack.append((node, True))
+                    stack.extend((child, False) for child in iter_children(node) if child._hash is None)
+        return self._hash
+
+    def __eq__(self, other):
+        if self is other:
+            return True
         if not isinstance(other, AST):
-            raise TypeError("Must be compared with another AST")
-        return self.codify() == other.codify()
+            return NotImplemented
+        stack = [(self, other)]
+        while stack:
+            a, b = stack.pop()
+            if a is b:
+                continue
+            if isinstance(a, AST):
+                # Different hashes tell most different trees apart without walking them
+                if type(a) is not type(b) or hash(a) != hash(b):
+                    return False
+                stack.extend(zip(a.fields(), b.fields()))
+            elif isinstance(a, tuple):
+                if not isinstance(b, tuple) or len(a) != len(b):
+                    return False
+                stack.extend(zip(a, b))
+            elif isinstance(b, (AST, tuple)) or type(a) is not type(b) or a != b:
+                return False
+        return True
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(map(repr, self.fields()))})"
+
+
+def iter_children(node: AST):
+    """Iterates over the nodes directly under a node."""
+    for value in node.fields():
+        if isinstance(value, AST):
+            yield value
+        elif isinstance(value, tuple):
+            yield from (item for item in value if isinstance(item, AST))
+
+
+# Modules of MathLang which generated programs import, by the name the code uses them with: how the code uses them, and
+# the statement importing them
+runtime_helpers = {
+    # SOLVE goes through a memoised helper
+    "_sv": ("_sv(", "from MathLang.Core.solver import solve as _sv;"),
+    # Evaluating functions at many points and plotting go through NumPy, which is only imported if a program does it
+    "_v": ("_v.", "import MathLang.Core.vectorised as _v;"),
+}
 
 
 class Program(AST):
+    __slots__ = ("stmts",)
+
     def __init__(self, stmts):
-        self.stmts = stmts
+        super().__init__(stmts)
 
     @staticmethod
-    def init_code():
+    def init_code(context, body: str = None):
+        """Gets the code which sets up a program. Helpers are only imported if the body uses them, or always if the
+        body is not known yet."""
         # Sympy's essentials
-        code = f"import sympy as _s;{get_symbol('x')}=_s.Symbol(\"x\");_s.init_printing();_pp=_s.pprint;"
+        code = f"import sympy as _s;{context.get_symbol('x')}=_s.Symbol(\"x\");_s.init_printing();_pp=_s.pprint;"
+        for use, statement in runtime_helpers.values():
+            if body is None or use in body:
+                code += statement
         return code
 
     @staticmethod
-    def finalise_code(code: str):
-        return code + "del _s,_pp," + ",".join([get_symbol(i) for i in global_symbol_match]) + ";"
+    def finalise_code(code: str, context):
+        helpers = "".join(f"{name}," for name, (_, statement) in runtime_helpers.items() if statement in code)
+        return code + "del _s,_pp," + helpers + ",".join(context.symbols.values()) + ";"
 
-    def codify(self):
-        code = Program.init_code()
+    def codify(self, context):
+        # Names are numbered in order of assignment, whether or not the parser has seen this program
         for stmt in self.stmts:
-            code += str(stmt.codify())
-        return Program.finalise_code(code)
+            if isinstance(stmt, Assignment):
+                context.declare(stmt.name)
+        body = "".join(str(context.codify(stmt)) for stmt in self.stmts)
+        return Program.finalise_code(Program.init_code(context, body) + body, context)
 
     def serialise(self):
         return {"type": "Program", "params": {"stmts": self.stmts}}
 
 
 class Assignment(AST):
+    __slots__ = ("name", "expr")
+
     def __init__(self, name, expr):
-        self.name = name
-        self.expr = expr
+        super().__init__(name, expr)
 
-    def codify(self):
-        return f"{get_str(self.name)}={get_str(self.expr)};"
+    def codify(self, context):
+        return f"{get_str(self.name, context)}={get_str(self.expr, context)};"
 
     def serialise(self):
         return {"type": "Assignment", "params": {"name": self.name, "expr": self.expr}}
 
 
 class Evaluation(AST):
+    __slots__ = ("name", "expr")
+
     def __init__(self, name, expr):
-        self.name = name
-        self.expr = expr
+        super().__init__(name, expr)
 
-    def codify(self):
-        return get_str(self.name) + ".subs({'x':" + str(sympy.sympify(get_str(self.expr))).replace(' ', '') + "})"
+    def codify(self, context):
+        # A function may have been simplified to a number, e.g. 'f = 0*x + 1', which SymPy evaluates to itself
+        return f"_s.sympify({get_str(self.name, context)},strict=True).subs({{'x':{get_str(self.expr, context)}}})"
 
     def serialise(self):
         return {"type": "Evaluation", "params": {"name": self.name, "expr": self.expr}}
 
 
+class BatchEvaluation(AST):
+    """Evaluates a function at many points at once with NumPy, e.g. 'f(1..10 STEP 0.5)' or 'f(1, 2, 3)'."""
+
+    __slots__ = ("name", "points")
+
+    def __init__(self, name, points):
+        # Either a Range or a tuple of expressions
+        super().__init__(name, points)
+
+    def codify(self, context):
+        if isinstance(self.points, tuple):
+            points = "[" + ",".join(get_str(p, context) for p in self.points) + "]"
+        else:
+            points = get_str(self.points, context)
+        return f"_v.evaluate({get_str(self.name, context)},{points})"
+
+    def serialise(self):
+        return {"type": "BatchEvaluation", "params": {"name": self.name, "points": self.points}}
+
+
+class Range(AST):
+    __slots__ = ("start", "stop", "step")
+
+    def __init__(self, start, stop, step=None):
+        super().__init__(start, stop, step)
+
+    def codify(self, context):
+        args = [get_str(self.start, context), get_str(self.stop, context)]
+        if self.step is not None:
+            args.append(get_str(self.step, context))
+        return f"_v.points({','.join(args)})"
+
+    def serialise(self):
+        return {"type": "Range", "params": {"start": self.start, "stop": self.stop, "step": self.step}}
+
+
 class Print(AST):
+    __slots__ = ("args",)
+
     def __init__(self, args):
-        self.args = args
+        super().__init__(args)
 
-    def codify(self):
-        self.args = list(map(lambda s: f"str({s})", map(get_str, self.args)))
-        return f"_pp({'+'.join(self.args)});"
+    def codify(self, context):
+        return f"_pp({'+'.join(f'str({get_str(a, context)})' for a in self.args)});"
 
     def serialise(self):
         return {"type": "Print", "params": {"args": self.args}}
 
 
 class Plot(AST):
+    __slots__ = ("args",)
+
     def __init__(self, args):
-        self.args = args
+        super().__init__(args)
 
-    def codify(self):
-        self.args = list(map(get_str, self.args))
-        code = f"_s.plot({','.join(self.args)});"
-        return code
+    def codify(self, context):
+        return f"_v.plot({','.join(get_str(a, context) for a in self.args)});"
 
     def serialise(self):
         return {"type": "Plot", "params": {"args": self.args}}
 
 
 class Solve(AST):
+    __slots__ = ("expr", "domain")
+
     def __init__(self, expr, domain):
-        self.expr = expr
-        self.domain = domain
+        super().__init__(expr, domain)
 
-    def codify(self):
+    def codify(self, context):
         domain_map = {
             "INTEGER": "_s.Integers",
             "REAL": "_s.Reals",
         }
-        return f"_s.solveset({get_str(self.expr)},domain={domain_map.get(get_str(self.domain), '_s.Reals')})"
+        expr = get_str(self.expr, context)
+        return f"_sv({expr},{domain_map.get(get_str(self.domain, context), '_s.Reals')})"
 
     def serialise(self):
         return {"type": "Solve", "params": {"expr": self.expr, "domain": self.domain}}
 
 
 class Input(AST):
+    __slots__ = ("name", "prompt")
+
     def __init__(self, name, prompt):
-        self.name = name
-        self.prompt = prompt
+        super().__init__(name, prompt)
 
-    def codify(self):
+    def codify(self, context):
         if self.prompt is not None:
             input_call = f"_i({self.prompt})"
         else:
             input_call = "_i()"
-        return f"{get_str(self.name)}={input_call};"
+        return f"{get_str(self.name, context)}={input_call};"
 
     def serialise(self):
         return {"type": "Input", "params": {"name": self.name, "prompt": self.prompt}}
 
 
 class BinaryOps(AST):
+    __slots__ = ("left", "op", "right")
+
     def __init__(self, left, op, right):
-        self.left = left
-        self.op = op
-        self.right = right
+        super().__init__(left, op, right)
 
-    def codify(self):
-        self.op = "**" if self.op == "^" else self.op
-        return str(sympy.sympify(f"({get_str(self.left)}){self.op}({get_str(self.right)})")).replace(" ", "")
+    def codify(self, context):
+        from MathLang.Core.symbolic import get_symbolic_str
+        return get_symbolic_str(self, context)
 
     def serialise(self):
         return {
@@ -178,13 +437,14 @@ class BinaryOps(AST):
 
 
 class Comparison(AST):
+    __slots__ = ("left", "op", "right")
+
     def __init__(self, left, op, right):
-        self.left = left
-        self.op = op
-        self.right = right
+        super().__init__(left, op, right)
 
-    def codify(self):
-        return str(sympy.sympify(f"({get_str(self.left)}){self.op}({get_str(self.right)})")).replace(" ", "")
+    def codify(self, context):
+        from MathLang.Core.symbolic import get_symbolic_str
+        return get_symbolic_str(self, context)
 
     def serialise(self):
         return {
@@ -197,6 +457,33 @@ class Comparison(AST):
         }
 
 
+class NodeTable:
+    """Hash-conses AST nodes, so that structurally identical nodes are replaced by a single shared one.
+
+    Nodes are only kept in the table while something else uses them, so it never keeps a program alive. Since the
+    children of a node are interned before it, finding a node only compares its children by identity.
+    """
+
+    def __init__(self):
+        self.__nodes = WeakValueDictionary()
+
+    def intern(self, node: AST) -> AST:
+        """Gets the node in the table which is identical to the given one, adding it if there is none."""
+        return self.__nodes.setdefault((type(node),) + node.fields(), node)
+
+    def __len__(self):
+        return len(self.__nodes)
+
+
+# The process-wide table of hash-consed nodes
+_node_table = NodeTable()
+
+
+def get_node_table() -> NodeTable:
+    """Gets the process-wide table of hash-consed nodes."""
+    return _node_table
+
+
 class InvalidToken(BaseException):
     def __init__(self, token, *args):
         self.token = token
@@ -217,14 +504,29 @@ class UndefinedName(BaseException):
         return f"Undefined name '{self.token.value}' at line {self.token.source_pos.lineno}"
 
 
-def generate_python_code(ast: AST) -> str:
+def generate_python_code(ast: AST, context: CompilationContext = None, target: str = None) -> str:
     """Generate valid Python code from MathLang AST.
 
-    The generated python code will be changed from time to time.
+    The generated python code will be changed from time to time. The "symbolic" target, the default, computes with
+    SymPy. The "numeric" target only computes with floats and NumPy, and never imports SymPy.
 
     :param ast: The abstract syntax tree of MathLang source code.
     :type ast: AST
+    :param context: The context the AST was generated with. A new one is used if not given.
+    :type context: CompilationContext
+    :param target: The kind of code to generate, the target of the context if not given.
+    :type target: str
     :return: A Python code string.
     :rtype: str
     """
-    return ast.codify()
+    if context is None:
+        if target in (None, "symbolic"):
+            context = CompilationContext()
+        elif target == "numeric":
+            from MathLang.Core.numeric import NumericContext
+            context = NumericContext()
+        else:
+            raise ValueError(f"Unknown target: {target}")
+    elif target is not None and target != context.target:
+        raise ValueError(f"A context for the {context.target} target cannot generate {target} code")
+    return context.codify(ast)
@@ -0,0 +1,154 @@
+from MathLang.Core.nodes import (
+    Assignment, BatchEvaluation, BinaryOps, CompilationContext, Comparison, Evaluation, Input, Plot, Print, Program,
+    Range, Solve, get_operation_str, get_str
+)
+
+
+class NumericContext(CompilationContext):
+    """Generates code which only computes with floats and NumPy, for programs which only need numeric answers.
+
+    Values which depend on x are lowered to Python functions of x, and everything else to plain numbers. The generated
+    code only imports 'MathLang.Core.numeric_runtime', and never SymPy.
+    """
+
+    target = "numeric"
+
+    def __init__(self):
+        super().__init__()
+        # MathLang names whose value currently depends on x
+        self.functions = {"x"}
+        # Whether x is still the variable of functions, rather than a value assigned to it
+        self.x_is_variable = True
+        # Python names read by the function being generated, or None outside of functions
+        self.captured = None
+
+    def get_symbol(self, symbol):
+        if self.captured is None:
+            return super().get_symbol(symbol)
+        if symbol == "x" and self.x_is_variable:
+            return "x"
+        name = self.get_reference(symbol)
+        return f"{name}(x)" if symbol in self.functions else name
+
+    def get_reference(self, symbol):
+        """Gets the Python name of a MathLang name, as a value rather than as a function call."""
+        name = super().get_symbol(symbol)
+        if self.captured is not None:
+            self.captured[name] = None
+        return name
+
+    def intern(self, node):
+        # The code of a node depends on where it is, e.g. on whether x is still a variable, so none is memoised
+        return node if self.nodes is None else self.nodes.intern(node)
+
+    def codify(self, node):
+        return _generators[type(node)](node, self)
+
+
+def depends_on_x(expr, context: NumericContext) -> bool:
+    """Tells whether the value of an expression depends on x, given the names which currently do."""
+    stack = [expr]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Evaluation):
+            # Evaluating a function which does not depend on x gives the function itself
+            if node.name in context.functions:
+                stack.append(node.expr)
+        elif isinstance(node, (BinaryOps, Comparison)):
+            stack.append(node.left)
+            stack.append(node.right)
+        elif isinstance(node, str) and node in context.functions:
+            return True
+    return False
+
+
+def lower(expr, context: NumericContext) -> str:
+    """Generates an expression, as a function of x if its value depends on x."""
+    if not depends_on_x(expr, context):
+        return get_str(expr, context)
+    outer = context.captured
+    context.captured = {}
+    try:
+        body = get_str(expr, context)
+    finally:
+        captured, context.captured = context.captured, outer
+    # Names are bound when the function is defined, since assigning them later must not change it
+    bindings = "".join(f",{name}={name}" for name in captured)
+    return f"_n.Function(lambda x{bindings}:{body})"
+
+
+def _program(node, context):
+    # Names are numbered in order of assignment, the same way as for the symbolic target
+    for stmt in node.stmts:
+        if isinstance(stmt, Assignment):
+            context.declare(stmt.name)
+    code = [f"import MathLang.Core.numeric_runtime as _n;{context.get_reference('x')}=_n.Function(lambda x:x);"]
+    code.extend(context.codify(stmt) for stmt in node.stmts)
+    code.append("del _n," + ",".join(context.symbols.values()) + ";")
+    return "".join(code)
+
+
+def _assignment(node, context):
+    value = lower(node.expr, context)
+    if depends_on_x(node.expr, context):
+        context.functions.add(node.name)
+    else:
+        context.functions.discard(node.name)
+    if node.name == "x":
+        context.x_is_variable = False
+    return f"{context.get_reference(node.name)}={value};"
+
+
+def _evaluation(node, context):
+    name = context.get_reference(node.name)
+    if node.name not in context.functions:
+        return name
+    return f"{name}({get_str(node.expr, context)})"
+
+
+def _batch_evaluation(node, context):
+    if isinstance(node.points, tuple):
+        points = "[" + ",".join(get_str(p, context) for p in node.points) + "]"
+    else:
+        points = get_str(node.points, context)
+    return f"_n.evaluate({context.get_reference(node.name)},{points})"
+
+
+def _range(node, context):
+    args = [get_str(node.start, context), get_str(node.stop, context)]
+    if node.step is not None:
+        args.append(get_str(node.step, context))
+    return f"_n.points({','.join(args)})"
+
+
+def _print(node, context):
+    return f"print({'+'.join(f'str({lower(a, context)})' for a in node.args)});"
+
+
+def _plot(node, context):
+    return f"_n.plot({','.join(lower(a, context) for a in node.args)});"
+
+
+def _solve(node, context):
+    return f"_n.solve({context.get_reference(node.expr)},'{str(node.domain).upper()}')"
+
+
+def _input(node, context):
+    prompt = node.prompt if node.prompt is not None else ""
+    context.functions.discard(node.name)
+    return f"{context.get_reference(node.name)}=float(input({prompt}));"
+
+
+_generators = {
+    Program: _program,
+    Assignment: _assignment,
+    Evaluation: _evaluation,
+    BatchEvaluation: _batch_evaluation,
+    Range: _range,
+    Print: _print,
+    Plot: _plot,
+    Solve: _solve,
+    Input: _input,
+    BinaryOps: get_operation_str,
+    Comparison: get_operation_str,
+}
@@ -0,0 +1,150 @@
+from functools import lru_cache
+
+from MathLang.Core.vectorised import points  # noqa: F401
+
+# Roots are looked for up to this far from the origin
+root_bound = 1e6
+
+# NumPy is imported by the functions needing it, so that programs which only do arithmetic start up quickly
+
+
+@lru_cache(maxsize=None)
+def _get_root_grid(bound):
+    import numpy as np
+
+    # Dense near the origin, and ever more sparse further out
+    return np.unique(np.concatenate((
+        np.linspace(-10, 10, 20001),
+        np.logspace(1, np.log10(bound), 4000),
+        -np.logspace(1, np.log10(bound), 4000),
+    )))
+
+
+class Function:
+    """A MathLang function of x, lowered to plain Python arithmetic. It can be called with a number or an array."""
+
+    __slots__ = ("func",)
+
+    def __init__(self, func):
+        self.func = func
+
+    def __call__(self, x):
+        return self.func(x)
+
+    def __str__(self):
+        return "<function of x>"
+
+    __repr__ = __str__
+
+
+def evaluate(function, values):
+    """Evaluates a function at many points in a single vectorised call.
+
+    :param function: A Function, or a number for functions which do not depend on x.
+    :param values: The values of x, as a list or an array.
+    :return: A NumPy array of the values of the function.
+    """
+    import numpy as np
+
+    values = np.asarray(values, dtype=float)
+    result = function(values) if isinstance(function, Function) else function
+    if np.shape(result) != values.shape:
+        result = np.full(values.shape, result, dtype=float)
+    return result
+
+
+def _bisect(func, lo, hi, f_lo):
+    import numpy as np
+
+    # Every bracket is halved at once, until they cannot be split any further
+    for _ in range(100):
+        mid = (lo + hi) / 2
+        f_mid = func(mid)
+        left = np.sign(f_mid) == np.sign(f_lo)
+        lo = np.where(left, mid, lo)
+        f_lo = np.where(left, f_mid, f_lo)
+        hi = np.where(left, hi, mid)
+    return (lo + hi) / 2
+
+
+def _minimise(func, lo, hi):
+    import numpy as np
+
+    # Golden section search for the minimum of |func| in every interval at once
+    ratio = (np.sqrt(5) - 1) / 2
+    for _ in range(100):
+        a = hi - ratio * (hi - lo)
+        b = lo + ratio * (hi - lo)
+        left = np.abs(func(a)) < np.abs(func(b))
+        hi = np.where(left, b, hi)
+        lo = np.where(left, lo, a)
+    return (lo + hi) / 2
+
+
+def find_roots(func, tolerance: float = 1e-9) -> list:
+    """Finds the real roots of a function numerically.
+
+    The function is sampled on a grid, roots are bracketed where it changes sign and narrowed down by bisection. Roots
+    where it only touches zero, such as that of (x-1)^2, are found by minimising its absolute value between samples.
+    Roots further than 'root_bound' from the origin, or closer together than the grid, may be missed.
+
+    :param func: A vectorised function of x.
+    :param tolerance: How close to zero the function must be at a root, relative to its scale around it.
+    :return: The roots, in increasing order.
+    :rtype: list
+    """
+    import numpy as np
+
+    with np.errstate(all="ignore"):
+        xs = _get_root_grid(root_bound)
+        ys = np.broadcast_to(np.asarray(func(xs), dtype=float), xs.shape)
+        finite = np.isfinite(ys)
+        scale = np.maximum(1.0, np.abs(ys))
+        roots = [xs[(ys == 0) & finite]]
+
+        # Sign changes, which are either roots or poles
+        i = np.nonzero(finite[:-1] & finite[1:] & (ys[:-1] * ys[1:] < 0))[0]
+        if len(i):
+            candidates = _bisect(func, xs[i], xs[i + 1], ys[i])
+            values = np.abs(np.broadcast_to(np.asarray(func(candidates), dtype=float), candidates.shape))
+            roots.append(candidates[values <= tolerance * np.maximum(scale[i], scale[i + 1])])
+
+        # Local minima of |func| which might touch zero
+        a = np.abs(ys)
+        i = np.nonzero(finite[1:-1] & (a[1:-1] < a[:-2]) & (a[1:-1] <= a[2:]) & (ys[:-2] * ys[2:] > 0))[0] + 1
+        if len(i):
+            candidates = _minimise(func, xs[i - 1], xs[i + 1])
+            values = np.abs(np.broadcast_to(np.asarray(func(candidates), dtype=float), candidates.shape))
+            roots.append(candidates[values <= tolerance * scale[i]])
+
+    found = []
+    for root in np.sort(np.concatenate(roots)):
+        # Tidy up rounding errors, so that e.g. 2 is not printed as 1.9999999999999998
+        root = float(f"{root:.15g}") + 0.0
+        if not found or abs(root - found[-1]) > 1e-9 * max(1.0, abs(root)):
+            found.append(root)
+    return found
+
+
+def solve(function, domain: str = "REAL"):
+    """Solves an equation numerically, for the code generated from SOLVE.
+
+    :param function: A Function, or a number for functions which do not depend on x.
+    :param domain: "INTEGER" for integer roots only, real roots otherwise.
+    :return: The roots in increasing order, or the name of the whole domain if every number is a root.
+    """
+    if not isinstance(function, Function):
+        if function == 0:
+            return "Integers" if domain == "INTEGER" else "Reals"
+        return []
+    roots = find_roots(function.func)
+    if domain == "INTEGER":
+        return [float(round(r)) for r in roots if abs(r - round(r)) <= 1e-9 * max(1.0, abs(r))]
+    return roots
+
+
+def plot(*functions) -> None:
+    """Renders the functions of a PLOT statement to the current plot output, see 'get_plot_output()'."""
+    from MathLang.Core.plotting import get_plot_output
+
+    get_plot_output().add(functions)
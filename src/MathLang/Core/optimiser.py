@@ -0,0 +1,313 @@
+import re
+from collections import Counter
+from typing import Callable, Dict, List, Sequence
+
+from MathLang.Core.lexer import keywords
+from MathLang.Core.nodes import (
+    AST, Assignment, BatchEvaluation, BinaryOps, Comparison, Evaluation, Program, Range, Solve, is_unary
+)
+
+# An optimisation pass takes a program and returns an equivalent one. Passes must not modify the program they are given.
+OptimisationPass = Callable[[Program], Program]
+
+_name = re.compile(r"[_a-zA-Z][_a-zA-Z0-9]*")
+
+# Largest integer constant folding may produce, in bits. Anything bigger is left for SymPy to compute at runtime.
+max_folded_bits = 4096
+
+
+def is_name(obj) -> bool:
+    """Tells whether a leaf of the AST is a MathLang name."""
+    return isinstance(obj, str) and _name.fullmatch(obj) is not None and obj.upper() not in keywords
+
+
+def get_operands(node) -> tuple:
+    """Gets the sub-expressions of an expression node."""
+    if isinstance(node, (BinaryOps, Comparison)):
+        return node.left, node.right
+    if isinstance(node, Evaluation):
+        return node.expr,
+    if isinstance(node, BatchEvaluation):
+        return node.points if isinstance(node.points, tuple) else (node.points,)
+    if isinstance(node, Range):
+        return node.start, node.stop, node.step
+    return ()
+
+
+def with_operands(node, operands):
+    """Makes a copy of an expression node with other sub-expressions."""
+    if isinstance(node, (BinaryOps, Comparison)):
+        return type(node)(operands[0], node.op, operands[1])
+    if isinstance(node, Evaluation):
+        return Evaluation(node.name, operands[0])
+    if isinstance(node, BatchEvaluation):
+        return BatchEvaluation(node.name, tuple(operands) if isinstance(node.points, tuple) else operands[0])
+    if isinstance(node, Range):
+        return Range(*operands)
+    return node
+
+
+def map_expression(expr, func, replace=None):
+    """Rebuilds an expression bottom-up, without recursion so that deep chains of operations are fine.
+
+    :param expr: The expression to rebuild.
+    :param func: Called on every node once its operands have been rebuilt, returning what to put in its place.
+    :param replace: Called on every node before its operands are visited. If it returns anything but None, that is put
+        in place of the node, and the operands are left alone.
+    :return: The rebuilt expression. Nodes of 'expr' are never modified.
+    """
+    results = []
+    stack = [(expr, False)]
+    while stack:
+        node, visited = stack.pop()
+        operands = get_operands(node)
+        if not visited:
+            if replace is not None:
+                replacement = replace(node)
+                if replacement is not None:
+                    results.append(replacement)
+                    continue
+            if operands:
+                stack.append((node, True))
+                stack.extend((operand, False) for operand in reversed(operands))
+                continue
+        if operands:
+            new_operands = results[-len(operands):]
+            del results[-len(operands):]
+            if any(new is not old for new, old in zip(new_operands, operands)):
+                node = with_operands(node, new_operands)
+        results.append(func(node))
+    return results[0]
+
+
+def iter_expression(expr):
+    """Iterates over every node of an expression, parents first."""
+    stack = [expr]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(get_operands(node)))
+
+
+def get_names(expr) -> set:
+    """Gets the names an expression reads."""
+    names = set()
+    for node in iter_expression(expr):
+        if isinstance(node, (Evaluation, BatchEvaluation)):
+            names.add(node.name)
+        elif isinstance(node, Solve):
+            names.add(node.expr)
+        elif is_name(node):
+            names.add(node)
+    return names
+
+
+def get_expressions(stmt) -> list:
+    """Gets the expressions a statement evaluates."""
+    if isinstance(stmt, Assignment):
+        return [stmt.expr]
+    return list(getattr(stmt, "args", ()))
+
+
+def with_expressions(stmt, exprs):
+    """Makes a copy of a statement evaluating other expressions."""
+    if isinstance(stmt, Assignment):
+        return Assignment(stmt.name, exprs[0])
+    if hasattr(stmt, "args"):
+        return type(stmt)(tuple(exprs))
+    return stmt
+
+
+def _get_constant(node):
+    # Only integers are folded, since they are exact. SymPy's floats have a precision of their own.
+    if isinstance(node, str) and node.isdigit():
+        return int(node)
+    if isinstance(node, BinaryOps) and is_unary(node) and isinstance(node.right, str) and node.right.isdigit():
+        return -int(node.right) if node.op == "-" else int(node.right)
+    return None
+
+
+def _make_constant(value):
+    # Numbers are never negative in the AST, negative ones are negated instead
+    if value < 0:
+        return BinaryOps(0, "-", str(-value))
+    return str(value)
+
+
+def _fold(node):
+    if not isinstance(node, BinaryOps) or is_unary(node):
+        return node
+    left = _get_constant(node.left)
+    right = _get_constant(node.right)
+    if left is None or right is None:
+        return node
+    if node.op == "+":
+        return _make_constant(left + right)
+    if node.op == "-":
+        return _make_constant(left - right)
+    if node.op == "*":
+        return _make_constant(left * right)
+    if node.op == "/":
+        # Anything else is a rational, or infinite, which SymPy keeps symbolic
+        if right != 0 and left % right == 0:
+            return _make_constant(left // right)
+    elif node.op == "^":
+        if right >= 0 and (abs(left) <= 1 or right * left.bit_length() <= max_folded_bits):
+            return _make_constant(left ** right)
+    return node
+
+
+def fold_constants(program: Program) -> Program:
+    """Computes operations on integer constants at compile time, e.g. '2*3*x' becomes '6*x'."""
+    stmts = []
+    for stmt in program.stmts:
+        stmts.append(with_expressions(stmt, [map_expression(expr, _fold) for expr in get_expressions(stmt)]))
+    return Program(stmts)
+
+
+def eliminate_dead_assignments(program: Program) -> Program:
+    """Removes assignments whose value is never used by a later PRINT or PLOT, directly or through other names.
+
+    Since variables are deleted at the end of a program, a value nobody prints or plots can never be seen. Errors the
+    removed expressions would have raised at runtime, e.g. when evaluating an undefined name, are removed with them.
+    """
+    live = set()
+    stmts = []
+    for stmt in reversed(program.stmts):
+        if isinstance(stmt, Assignment):
+            if stmt.name not in live:
+                continue
+            live.discard(stmt.name)
+            live |= get_names(stmt.expr)
+        else:
+            for expr in get_expressions(stmt):
+                live |= get_names(expr)
+        stmts.append(stmt)
+    stmts.reverse()
+    return Program(stmts)
+
+
+def _is_worth_sharing(node) -> bool:
+    if isinstance(node, BinaryOps) and is_unary(node):
+        # Negative numbers and negated names are as cheap as a name
+        return isinstance(node.right, AST)
+    return isinstance(node, (BinaryOps, Comparison, Evaluation, BatchEvaluation, Solve))
+
+
+def eliminate_common_subexpressions(program: Program) -> Program:
+    """Computes every expression which occurs more than once only once, in a new variable, even across statements.
+
+    Two occurrences are only shared if every name they read has the same value at both, i.e. none of them is assigned
+    in between. Expressions which read no name are not shared: SymPy computes them exactly where they are, e.g.
+    '(1/2)*x' is 'x/2', while a variable would hold the number Python computes for them.
+    """
+    # Number every distinct (sub-)expression, taking the value of each name into account
+    numbers = {}
+    # The number of every node, kept per statement since a node shared between statements may read other values in each
+    keys = {}
+    statement_keys = []
+    counts = Counter()
+    generations = Counter()
+
+    def number(node):
+        if isinstance(node, AST):
+            if isinstance(node, Solve):
+                key = ("Solve", node.expr, generations[node.expr], node.domain)
+            else:
+                name = getattr(node, "name", None)
+                key = (type(node).__name__, getattr(node, "op", None), name, generations[name]) + tuple(
+                    keys[id(operand)] if isinstance(operand, AST) else number(operand) for operand in get_operands(node)
+                )
+        elif is_name(node):
+            key = ("Name", node, generations[node])
+        else:
+            key = ("Constant", node)
+        n = numbers.setdefault(key, len(numbers))
+        if isinstance(node, AST):
+            keys[id(node)] = n
+            if _is_worth_sharing(node):
+                counts[n] += 1
+        return n
+
+    names = set()
+    for stmt in program.stmts:
+        keys = {}
+        statement_keys.append(keys)
+        for expr in get_expressions(stmt):
+            names |= get_names(expr)
+            for node in reversed(list(iter_expression(expr))):
+                number(node)
+        if isinstance(stmt, Assignment):
+            names.add(stmt.name)
+            generations[stmt.name] += 1
+
+    temporaries = {}
+    new_names = (f"_t{i}" for i in range(len(numbers) + len(names) + 1))
+    stmts = []
+    for stmt, keys in zip(program.stmts, statement_keys):
+        # Decide what to share top-down, so that the largest shared expressions are found first
+        marked = {}
+        definitions = []
+        stack = get_expressions(stmt)
+        while stack:
+            node = stack.pop()
+            if not isinstance(node, AST):
+                continue
+            n = keys[id(node)]
+            if n in temporaries:
+                marked[id(node)] = temporaries[n]
+                continue
+            if counts[n] >= 2 and _is_worth_sharing(node) and get_names(node):
+                temporaries[n] = marked[id(node)] = next(name for name in new_names if name not in names)
+                definitions.append(node)
+                # Sub-expressions are now only computed once for all occurrences of this expression
+                for inner in iter_expression(node):
+                    if inner is not node and isinstance(inner, AST):
+                        counts[keys[id(inner)]] -= counts[n] - 1
+            stack.extend(get_operands(node))
+
+        def replace(node):
+            return marked.get(id(node))
+
+        # Shared sub-expressions of a definition must be defined before it
+        for node in reversed(definitions):
+            expr = map_expression(node, lambda n: n, lambda n: None if n is node else replace(n))
+            stmts.append(Assignment(marked[id(node)], expr))
+        stmts.append(with_expressions(stmt, [
+            map_expression(expr, lambda n: n, replace) for expr in get_expressions(stmt)
+        ]))
+    return Program(stmts)
+
+
+# Passes run at each optimisation level. Other passes can be plugged in by adding levels, or passing them to
+# 'optimise()' directly.
+optimisation_levels: Dict[int, List[OptimisationPass]] = {
+    0: [],
+    1: [fold_constants],
+    2: [fold_constants, eliminate_dead_assignments, eliminate_common_subexpressions],
+}
+
+
+def optimise(ast: Program, level: int = 2, passes: Sequence[OptimisationPass] = None) -> Program:
+    """Optimises MathLang AST, to be run between 'generate_ast()' and 'generate_python_code()'.
+
+    The optimised AST must be turned into code with a new compilation context, since names may have been added or
+    removed.
+
+    :param ast: The abstract syntax tree of a MathLang program.
+    :type ast: Program
+    :param level: The optimisation level, from 0 (none) to 2 (all).
+    :type level: int
+    :param passes: The passes to run in order, instead of those of the level.
+    :type passes: Sequence[OptimisationPass]
+    :return: An equivalent program.
+    :rtype: Program
+    """
+    if passes is None:
+        try:
+            passes = optimisation_levels[level]
+        except KeyError:
+            raise ValueError(f"Unknown optimisation level: {level}") from None
+    for optimisation_pass in passes:
+        ast = optimisation_pass(ast)
+    return ast
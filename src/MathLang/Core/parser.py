@@ -1,78 +1,87 @@
 from rply import ParserGenerator
 
-from MathLang.Core import Lexer
+from MathLang.Core.lexer import get_lexer
 from MathLang.Core.nodes import *
 
+# Parser tables are cached on disk by rply under this ID, together with rply's cache version and a hash of the grammar,
+# so any change to the productions invalidates the cache automatically.
+PARSER_CACHE_ID = "MathLang"
+
 
 class Parser:
-    def __init__(self, tokens):
-        self.pg = ParserGenerator(tokens)
-        self.symbol_table = []
-        self.populate_symbol_table()
+    def __init__(self, tokens, cache_id=PARSER_CACHE_ID):
+        self.pg = ParserGenerator(tokens, cache_id=cache_id)
         self.make_production()
-        self.parser = self.pg.build()
+        self.parser = self.build()
 
-    def populate_symbol_table(self):
-        # Implicit x
-        self.symbol_table.append("x")
+    def build(self):
+        try:
+            return self.pg.build()
+        except (OSError, ValueError, KeyError, TypeError):
+            # The cache directory is not writable, or a cached table is truncated or corrupt, so keep the tables in
+            # memory only
+            self.pg.cache_id = None
+            return self.pg.build()
 
     def make_production(self):
         @self.pg.production("prog : stmts")
-        def program(p):
+        def program(context, p):
             return Program(p[0])
 
         @self.pg.production("stmts : stmt_semicolon")
         @self.pg.production("stmts : stmts stmt_semicolon")
-        def single_statement(p):
+        def single_statement(context, p):
             if len(p) == 1:
                 return [p[0]]
-            return p[0] + [p[1]]
+            # Extend the list in place, copying it on every statement would take quadratic time
+            p[0].append(p[1])
+            return p[0]
 
         @self.pg.production("stmt_semicolon : stmt SEMICOLON")
-        def statement(p):
+        def statement(context, p):
             return p[0]
 
         @self.pg.production("stmt : assignment")
         @self.pg.production("stmt : print_stmt")
         @self.pg.production("stmt : plot_stmt")
-        def simple_statement(p):
+        def simple_statement(context, p):
             return p[0]
 
         @self.pg.production("assignment : ID EQUAL expr")
-        def assignment(p):
-            if p[0].value not in self.symbol_table:
-                self.symbol_table.append(p[0].value)
-            return Assignment(p[0].value, p[2])
-
-        @self.pg.production("print_stmt : PRINT expr")
-        @self.pg.production("print_stmt : print_stmt COMMA expr")
-        def print_statement(p):
-            if len(p) == 2:
-                return Print([p[1]])
-            else:
-                return Print(p[0].args + [p[2]])
+        def assignment(context, p):
+            context.declare(p[0].value)
+            return context.intern(Assignment(p[0].value, p[2]))
 
-        @self.pg.production("plot_stmt : PLOT expr")
-        @self.pg.production("plot_stmt : plot_stmt COMMA expr")
-        def plot_statement(p):
-            if len(p) == 2:
-                return Plot([p[1]])
-            else:
-                return Plot(p[0].args + [p[2]])
+        @self.pg.production("print_stmt : PRINT args")
+        def print_statement(context, p):
+            return context.intern(Print(p[1]))
+
+        @self.pg.production("plot_stmt : PLOT args")
+        def plot_statement(context, p):
+            return context.intern(Plot(p[1]))
+
+        @self.pg.production("args : expr")
+        @self.pg.production("args : args COMMA expr")
+        def arguments(context, p):
+            if len(p) == 1:
+                return [p[0]]
+            # Nodes cannot be changed once built, so arguments are collected in a list first
+            p[0].append(p[2])
+            return p[0]
 
         @self.pg.production("expr : m_expr")
         @self.pg.production("expr : solve_expr")
-        def expression(p):
+        def expression(context, p):
             return p[0]
 
         @self.pg.production("solve_expr : SOLVE ID IN set")
-        def solve_statement(p):
-            return Solve(p[1].value, p[3])
+        def solve_statement(context, p):
+            return context.intern(Solve(p[1].value, p[3]))
 
         @self.pg.production("set : REAL")
         @self.pg.production("set : RATIONAL")
         @self.pg.production("set : INTEGER")
-        def num_set(p):
+        def num_set(context, p):
             return p[0].value
 
         @self.pg.production("m_expr : sum")
@@ -82,89 +91,129 @@ class Parser:
         @self.pg.production("m_expr : m_expr LT sum")
         @self.pg.production("m_expr : m_expr GTE sum")
         @self.pg.production("m_expr : m_expr GT sum")
-        def bool_expression(p):
+        def bool_expression(context, p):
             if len(p) == 1:
                 return p[0]
-            return Comparison(p[0], p[1].value, p[2])
+            return context.intern(Comparison(p[0], p[1].value, p[2]))
 
         @self.pg.production("sum : term")
         @self.pg.production("sum : sum PLUS term")
         @self.pg.production("sum : sum MINUS term")
-        def math_expression(p):
+        def math_expression(context, p):
             if len(p) == 1:
                 return p[0]
             else:
-                return BinaryOps(p[0], p[1].value, p[2])
+                return context.intern(BinaryOps(p[0], p[1].value, p[2]))
 
         @self.pg.production("term : factor")
         @self.pg.production("term : term TIMES factor")
         @self.pg.production("term : term DIVIDE factor")
-        def term(p):
+        def term(context, p):
             if len(p) == 1:
                 return p[0]
             else:
-                return BinaryOps(p[0], p[1].value, p[2])
+                return context.intern(BinaryOps(p[0], p[1].value, p[2]))
 
         @self.pg.production("factor : power")
         @self.pg.production("factor : PLUS factor")
         @self.pg.production("factor : MINUS factor")
-        def factor(p):
+        def factor(context, p):
             if len(p) == 1:
                 return p[0]
             else:
-                return BinaryOps(0, p[0].value, p[1])
+                return context.intern(BinaryOps(0, p[0].value, p[1]))
 
         @self.pg.production("power : primary")
         @self.pg.production("power : primary CARAT factor")
-        def power(p):
+        def power(context, p):
             if len(p) == 1:
                 return p[0]
             else:
-                return BinaryOps(p[0], p[1].value, p[2])
+                return context.intern(BinaryOps(p[0], p[1].value, p[2]))
 
         @self.pg.production("primary : atom")
         @self.pg.production("primary : func_eval")
-        def primary(p):
+        def primary(context, p):
             return p[0]
 
         @self.pg.production("atom : ID")
         @self.pg.production("atom : NUMBER")
         @self.pg.production("atom : group")
-        def atom(p):
+        def atom(context, p):
             try:
                 return p[0].value
             except AttributeError:
                 return p[0]
 
         @self.pg.production("func_eval : ID group")
-        def func_eval(p):
-            return Evaluation(p[0].value, p[1])
+        def func_eval(context, p):
+            return context.intern(Evaluation(p[0].value, p[1]))
+
+        @self.pg.production("func_eval : ID LPAREN points RPAREN")
+        @self.pg.production("func_eval : ID LPAREN range RPAREN")
+        def batch_eval(context, p):
+            return context.intern(BatchEvaluation(p[0].value, p[2]))
+
+        @self.pg.production("points : expr COMMA expr")
+        @self.pg.production("points : points COMMA expr")
+        def points(context, p):
+            if isinstance(p[0], list):
+                p[0].append(p[2])
+                return p[0]
+            return [p[0], p[2]]
+
+        @self.pg.production("range : expr RANGE expr")
+        @self.pg.production("range : expr RANGE expr STEP expr")
+        def value_range(context, p):
+            return context.intern(Range(p[0], p[2], p[4] if len(p) == 5 else None))
 
         @self.pg.production("group : LPAREN expr RPAREN")
-        def group(p):
+        def group(context, p):
             return p[1]
 
         @self.pg.error
-        def error_handle(token):
+        def error_handle(context, token):
             raise InvalidToken(token)
 
-    def parse(self, tokens):
+    def parse(self, tokens, context):
         """Parses the token stream into MathLang AST. Please do not call this function directly, use 'generate_ast()'
         instead for AST generation.
+
+        The parser itself holds no state, so one parser can be used by many threads at once. Names are recorded in the
+        given compilation context instead.
         """
-        return self.parser.parse(tokens)
+        return self.parser.parse(tokens, state=context)
+
+
+# The process-wide parser, built (or loaded from the table cache) once at import time
+_parser = Parser(get_lexer().tokens)
+
+
+def get_parser() -> Parser:
+    """Gets the process-wide MathLang parser.
+
+    :return: The shared parser.
+    :rtype: Parser
+    """
+    return _parser
 
 
-def generate_ast(source: str) -> AST:
+def generate_ast(source: str, context: CompilationContext = None, intern: bool = False) -> AST:
     """Generates MathLang AST from MathLang source code.
 
     :param source: MathLang source code.
     :type source: str
+    :param context: The context to record names in, to be passed on to 'generate_python_code()'. A new one is used if
+        not given.
+    :type context: CompilationContext
+    :param intern: Whether to hash-cons nodes in the process-wide node table, so that repeated sub-expressions are
+        a single shared node. Generating code with the same context then only generates each shared node once.
+    :type intern: bool
     :return: MathLang AST.
     :rtype: str
     """
-    lexer = Lexer()
-    parser = Parser(lexer.tokens)
-    ast = parser.parse(lexer.lex(source))
-    populate_matching_table(parser.symbol_table)
-    return ast
+    if context is None:
+        context = CompilationContext()
+    if intern:
+        context.nodes = get_node_table()
+    return get_parser().parse(get_lexer().lex(source), context)
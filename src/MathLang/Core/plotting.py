@@ -0,0 +1,298 @@
+import io
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from os import PathLike
+from pathlib import Path
+from time import perf_counter
+from typing import BinaryIO, Callable, List, Optional, Sequence, Union
+
+# NumPy and Matplotlib are imported by the functions needing them, so that programs which never plot do not pay for
+# them. Matplotlib is only used through its Figure API, which never opens a window or needs a display.
+
+Output = Union[PathLike, str, BinaryIO]
+
+
+def _evaluate(func, xs):
+    import numpy as np
+
+    with np.errstate(all="ignore"):
+        ys = func(xs) if callable(func) else func
+        ys = np.asarray(ys)
+        if np.iscomplexobj(ys):
+            # Only the real part of a function is drawn, where it is real
+            ys = np.where(np.abs(ys.imag) < 1e-12, ys.real, np.nan)
+        return np.broadcast_to(ys.astype(float), np.shape(xs)).copy()
+
+
+def _get_view(ys):
+    import numpy as np
+
+    # The range of y to show, ignoring poles and other outliers
+    finite = ys[np.isfinite(ys)]
+    if not len(finite):
+        return -1.0, 1.0
+    lo, hi = np.percentile(finite, (2, 98))
+    if hi - lo < 1e-12:
+        lo, hi = lo - 1, hi + 1
+    return float(lo), float(hi)
+
+
+def sample(func: Callable, start: float = -10, stop: float = 10, budget: int = 1000, initial: int = None,
+           tolerance: float = 1e-3):
+    """Samples a function of x, adaptively placing more points where it is steep or turns sharply.
+
+    Sampling starts from a uniform grid. Every round, the intervals where the curve strays the furthest from a straight
+    line, once both axes are scaled to the plot, are split in two, and all new points are evaluated in one vectorised
+    call. This stops when 'budget' points have been evaluated or the curve looks straight at the scale of a pixel.
+
+    :param func: A vectorised function of x, or a constant.
+    :param start: Smallest value of x.
+    :param stop: Largest value of x.
+    :param budget: Maximum number of points.
+    :param initial: Number of points of the initial grid, a quarter of the budget by default.
+    :param tolerance: How far from straight a segment may look, as a fraction of the size of the plot.
+    :return: Arrays of the values of x, in increasing order, and of the function.
+    """
+    import numpy as np
+
+    initial = max(2, min(budget, initial or budget // 4))
+    xs = np.linspace(start, stop, initial)
+    ys = _evaluate(func, xs)
+    width = stop - start
+    while len(xs) < budget:
+        lo, hi = _get_view(ys)
+        height = hi - lo
+        # Outliers would otherwise take the whole budget
+        ny = np.clip((ys - lo) / height, -1, 2)
+        nx = (xs - start) / width
+        dx = np.diff(nx)
+        dy = np.diff(ny)
+        length = np.hypot(dx, dy)
+        angle = np.arctan2(dy, dx)
+        turn = np.zeros(len(xs))
+        turn[1:-1] = np.abs(np.angle(np.exp(1j * np.diff(angle))))
+        # How far the curve may stray from each segment, as a fraction of the plot
+        score = length * np.maximum(turn[:-1], turn[1:])
+        # Where the function is only defined on one side, its edge is found
+        score = np.where(np.isnan(score), np.where(np.isfinite(ys[:-1]) != np.isfinite(ys[1:]), 1.0, 0.0), score)
+        # Intervals which cannot be seen, or already look straight, are left alone
+        score[(dx < 1e-9) | (score < tolerance)] = 0
+        candidates = np.nonzero(score)[0]
+        if not len(candidates):
+            break
+        count = min(budget - len(xs), max(1, len(candidates) // 2))
+        split = candidates[np.argsort(score[candidates])[-count:]]
+        new_xs = (xs[split] + xs[split + 1]) / 2
+        new_ys = _evaluate(func, new_xs)
+        xs = np.insert(xs, split + 1, new_xs)
+        ys = np.insert(ys, split + 1, new_ys)
+    return xs, ys
+
+
+def render(functions: Sequence, output: Output = None, fmt: str = "png", start: float = -10, stop: float = 10,
+           budget: int = 1000, width: float = 6.4, height: float = 4.8, dpi: int = 100) -> Optional[bytes]:
+    """Renders the graphs of functions of x to an image, without any display.
+
+    :param functions: Vectorised functions of x, or constants.
+    :param output: A file name or a binary file to write the image to. The image is returned if not given.
+    :param fmt: The image format, e.g. "png" or "svg".
+    :param start: Smallest value of x.
+    :param stop: Largest value of x.
+    :param budget: Maximum number of points sampled for each function.
+    :param width: Width of the image in inches.
+    :param height: Height of the image in inches.
+    :param dpi: Resolution of the image in dots per inch.
+    :return: The image, if no output was given.
+    :rtype: Optional[bytes]
+    """
+    import numpy as np
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(width, height), dpi=dpi)
+    ax = fig.add_subplot()
+    views = []
+    for func in functions:
+        xs, ys = sample(func, start, stop, budget)
+        lo, hi = _get_view(ys)
+        views.append((lo, hi))
+        # Break the line at poles, instead of joining both sides
+        margin = 10 * (hi - lo)
+        ys[(ys < lo - margin) | (ys > hi + margin)] = np.nan
+        ax.plot(xs, ys)
+    if views:
+        lo = min(v[0] for v in views)
+        hi = max(v[1] for v in views)
+        ax.set_ylim(lo - 0.1 * (hi - lo), hi + 0.1 * (hi - lo))
+    ax.set_xlim(start, stop)
+    ax.axhline(0, color="black", linewidth=0.5)
+    ax.axvline(0, color="black", linewidth=0.5)
+    ax.set_xlabel("x")
+    ax.grid(True, alpha=0.3)
+    if output is None:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt)
+        return buffer.getvalue()
+    fig.savefig(output, format=fmt)
+    return None
+
+
+class PlotOutput:
+    """Where the PLOT statements of programs render to.
+
+    Each PLOT statement renders one image. Images are written to files named '<prefix>-<n>.<fmt>' in 'directory', and
+    their paths kept in 'paths', or kept in 'images' if no directory is given.
+
+    The output owns what it keeps until it is taken with 'take()', which whoever set the output, or ran the programs,
+    should do. Only the last 'max_images' images and paths are kept, so that an output nobody takes from, e.g. the
+    default one of a long-lived process, does not grow without bound. 'dropped' counts those which were not kept.
+
+    :param directory: The directory to write images to, or None to keep them in memory.
+    :type directory: PathLike
+    :param fmt: The image format, e.g. "png" or "svg".
+    :type fmt: str
+    :param prefix: Start of the names of image files.
+    :type prefix: str
+    :param max_images: The number of images, or paths, to keep until they are taken, or None to keep every one.
+    :type max_images: int
+    :param options: Other options of 'render()'.
+    """
+
+    def __init__(self, directory: PathLike = None, fmt: str = "png", prefix: str = "plot", max_images: int = 16,
+                 **options):
+        self.directory = directory
+        self.fmt = fmt
+        self.prefix = prefix
+        self.max_images = max_images
+        self.options = options
+        self.images = deque(maxlen=max_images)
+        self.paths = deque(maxlen=max_images)
+        self.count = 0
+        self.dropped = 0
+
+    def add(self, functions: Sequence) -> None:
+        """Renders the functions of a PLOT statement."""
+        self.count += 1
+        if self.directory is None:
+            self.__keep(self.images, render(functions, fmt=self.fmt, **self.options))
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{self.prefix}-{self.count}.{self.fmt}")
+        render(functions, path, self.fmt, **self.options)
+        self.__keep(self.paths, path)
+
+    def take(self) -> List[Union[bytes, str]]:
+        """Takes what has been rendered since the last call, i.e. images, or paths of image files if there is a
+        directory, leaving none kept.
+
+        :return: The images or paths, oldest first.
+        :rtype: List[Union[bytes, str]]
+        """
+        taken = list(self.paths if self.directory is not None else self.images)
+        self.images.clear()
+        self.paths.clear()
+        return taken
+
+    def __keep(self, kept, item):
+        if len(kept) == kept.maxlen:
+            self.dropped += 1
+        kept.append(item)
+
+
+def _get_default_output():
+    # Images are written to MATHLANG_PLOT_DIR if it is set
+    return PlotOutput(os.environ.get("MATHLANG_PLOT_DIR") or None)
+
+
+_plot_output = _get_default_output()
+
+
+def get_plot_output() -> PlotOutput:
+    """Gets where PLOT statements render to in this process."""
+    return _plot_output
+
+
+def set_plot_output(output: PlotOutput) -> None:
+    """Sets where PLOT statements render to in this process."""
+    global _plot_output
+    _plot_output = output
+
+
+class RenderResult:
+    """The outcome of rendering the plots of one program in a batch."""
+
+    def __init__(self, path, images=(), error=None, elapsed=0.0):
+        self.path = path
+        self.images = list(images)
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self):
+        return f"RenderResult({self.path!r}, images={len(self.images)}, error={self.error!r})"
+
+
+def _warm_up():
+    import sympy  # noqa: F401
+    import matplotlib.figure  # noqa: F401
+    import MathLang.Core.parser  # noqa: F401
+
+
+def _render_one(job):
+    from MathLang.Core.nodes import Print, Program, generate_python_code
+    from MathLang.Core.optimiser import eliminate_dead_assignments
+    from MathLang.Core.parser import generate_ast
+
+    path, out_prefix, fmt, options = job
+    start = perf_counter()
+    output = PlotOutput(os.path.dirname(out_prefix) or ".", fmt, os.path.basename(out_prefix),
+                        max_images=None, **options)
+    old = get_plot_output()
+    try:
+        with open(path) as fp:
+            ast = generate_ast(fp.read())
+        # Only what the plots need is run
+        ast = eliminate_dead_assignments(Program([stmt for stmt in ast.stmts if not isinstance(stmt, Print)]))
+        set_plot_output(output)
+        exec(compile(generate_python_code(ast), "<MathLang>", "exec", optimize=2), {"__name__": "__mathlang__"})
+        return RenderResult(path, output.paths, elapsed=perf_counter() - start)
+    except (KeyboardInterrupt, SystemExit):
+        raise
+    except BaseException as e:
+        return RenderResult(path, output.paths, f"{type(e).__name__}: {e}", perf_counter() - start)
+    finally:
+        set_plot_output(old)
+
+
+def render_many(paths: Sequence[PathLike], out_prefixes: Sequence[PathLike] = None, fmt: str = "png",
+                jobs: int = None, **options) -> List[RenderResult]:
+    """Renders every PLOT statement of many MathLang files in parallel.
+
+    Programs run in a pool of worker processes, with everything that no PLOT statement needs left out. The plots of a
+    file are written to '<prefix>-<n>.<fmt>'.
+
+    :param paths: MathLang source files.
+    :type paths: Sequence[PathLike]
+    :param out_prefixes: Start of the names of the images of each file, the file name without its suffix by default.
+    :type out_prefixes: Sequence[PathLike]
+    :param fmt: The image format, e.g. "png" or "svg".
+    :type fmt: str
+    :param jobs: Number of worker processes, the number of CPUs by default. With 1, files are rendered in this process.
+    :type jobs: int
+    :param options: Other options of 'render()'.
+    :return: A result for every file, in order.
+    :rtype: List[RenderResult]
+    """
+    paths = list(paths)
+    if out_prefixes is None:
+        out_prefixes = [Path(path).with_suffix("") for path in paths]
+    batch = [(path, str(prefix), fmt, options) for path, prefix in zip(paths, out_prefixes)]
+    jobs = min(jobs or os.cpu_count() or 1, max(len(batch), 1))
+    if jobs == 1:
+        return list(map(_render_one, batch))
+    chunksize = max(1, len(batch) // (jobs * 8))
+    with ProcessPoolExecutor(jobs, initializer=_warm_up) as pool:
+        return list(pool.map(_render_one, batch, chunksize=chunksize))
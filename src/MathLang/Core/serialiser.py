@@ -1,5 +1,11 @@
+import re
+from codecs import getincrementaldecoder
 from json import dumps, JSONEncoder, loads
+from json.decoder import scanstring
+from json.encoder import encode_basestring_ascii
+from typing import BinaryIO, TextIO, Union
 
+from MathLang.Core.binary_ast import ASTFormatError
 from MathLang.Core.nodes import *
 
 
@@ -11,20 +17,18 @@ class ASTSerialiser(JSONEncoder):
             raise TypeError(f"Object of type '{type(o)}' is not serialisable")
 
 
+# Types of the nodes which can be deserialised, by name
+_node_types = {
+    node_type.__name__: node_type for node_type in (
+        Assignment, BatchEvaluation, BinaryOps, Comparison, Evaluation, Input, Plot, Print, Program, Range, Solve
+    )
+}
+
+
 def json_decode_hook(o):
-    obj_list = [
-        "Assignment",
-        "BinaryOps",
-        "Comparison",
-        "Evaluation",
-        "Plot",
-        "Print",
-        "Program",
-        "Solve",
-    ]
-    t = o.get("type", None)
-    if t is not None and t in obj_list:
-        return eval(f"{o['type']}(**(o['params']))")
+    node_type = _node_types.get(o.get("type", None))
+    if node_type is not None:
+        return node_type(**o["params"])
     return o
 
 
@@ -36,3 +40,239 @@ def serialise_ast(ast: AST) -> str:
 def deserialise_ast(d: str) -> AST:
     """Deserialises JSON to MathLang AST. This function is dangerous and used for debugging purposes only."""
     return loads(d, object_hook=json_decode_hook)
+
+
+class _Text(str):
+    """Marks JSON text which is written as it is."""
+
+
+_comma = _Text(", ")
+_colon = _Text(": ")
+
+
+def _get_fragments(node_type):
+    # The JSON of a node, as 'serialise()' makes it, is made of these fragments with the values of its fields in between
+    keys = [encode_basestring_ascii(name) for name in node_type.__slots__]
+    first = f'{{"type": {encode_basestring_ascii(node_type.__name__)}, "params": {{{keys[0]}: '
+    return _Text(first), [_Text(f", {key}: ") for key in keys[1:]], _Text("}}")
+
+
+_fragments = {node_type: _get_fragments(node_type) for node_type in _node_types.values()}
+
+# Tokens of JSON text, after any whitespace. A string followed by a colon is a key.
+_token = re.compile(r"""\s*(?:
+    (,)
+    |("[^"\\]*(?:\\.[^"\\]*)*")\s*:
+    |([{\[])
+    |([}\]])
+    |("[^"\\]*(?:\\.[^"\\]*)*")
+    |(-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?)
+    |(true|false|null)
+    |(:)
+)""", re.VERBOSE)
+_COMMA, _KEY, _OPEN, _CLOSE, _STRING, _NUMBER, _LITERAL, _COLON = range(1, 9)
+_literals = {"true": True, "false": False, "null": None}
+
+# What the JSON reader expects next
+_VALUE, _VALUE_OR_END, _KEY_OR_END, _KEY_NEXT, _COLON_NEXT, _COMMA_OR_END, _END = range(7)
+_expected = ["a value", "a value or ']'", "a key or '}'", "a key", "':'", "',' or the end of the object or array",
+             "the end of data"]
+
+
+def _invalid(offset, state):
+    return ASTFormatError(f"Invalid JSON AST at offset {offset}: expected {_expected[state]}.")
+
+
+def _decode_string(text, offset):
+    try:
+        return scanstring(text, 1)[0] if "\\" in text else text[1:-1]
+    except ValueError as e:
+        raise ASTFormatError(f"Invalid JSON AST at offset {offset}: {e}.") from None
+
+
+def _decode_object(o, offset):
+    try:
+        return json_decode_hook(o)
+    except (KeyError, TypeError, ValueError) as e:
+        raise ASTFormatError(f"Invalid JSON AST at offset {offset}: malformed node, {type(e).__name__}: {e}.") from None
+
+
+def write_ast(ast: AST, fp: TextIO, buffer_size: int = 65536) -> None:
+    """Serialises MathLang AST to JSON, writing it to a file as it goes. The JSON is the same as 'serialise_ast()'.
+
+    The tree is walked without recursion, so deep chains of operations are fine, and at most 'buffer_size' characters
+    are kept before being written.
+
+    :param ast: MathLang AST.
+    :type ast: AST
+    :param fp: A text file to write to.
+    :type fp: TextIO
+    :param buffer_size: The number of characters to collect before writing them.
+    :type buffer_size: int
+    """
+    fragments = _fragments
+    parts = []
+    size = 0
+    stack = [ast]
+    while stack:
+        item = stack.pop()
+        item_type = type(item)
+        if item_type is _Text:
+            text = item
+        elif item_type is str:
+            text = encode_basestring_ascii(item)
+        elif item_type in fragments:
+            text, separators, last = fragments[item_type]
+            values = item.fields()
+            stack.append(last)
+            for i in range(len(values) - 1, 0, -1):
+                stack.append(values[i])
+                stack.append(separators[i - 1])
+            stack.append(values[0])
+        else:
+            if isinstance(item, AST):
+                item = item.serialise()
+            if isinstance(item, str):
+                text = encode_basestring_ascii(item)
+            elif isinstance(item, dict):
+                text = "{"
+                stack.append(_Text("}"))
+                for i, (key, value) in enumerate(reversed(item.items())):
+                    if i:
+                        stack.append(_comma)
+                    stack.extend((value, _colon, _Text(encode_basestring_ascii(key))))
+            elif isinstance(item, (list, tuple)):
+                text = "["
+                stack.append(_Text("]"))
+                for i, value in enumerate(reversed(item)):
+                    if i:
+                        stack.append(_comma)
+                    stack.append(value)
+            elif item is None:
+                text = "null"
+            elif isinstance(item, bool):
+                text = "true" if item else "false"
+            elif isinstance(item, int):
+                text = int.__repr__(item)
+            else:
+                raise TypeError(f"Object of type '{type(item)}' is not serialisable")
+        parts.append(text)
+        size += len(text)
+        if size >= buffer_size:
+            fp.write("".join(parts))
+            parts.clear()
+            size = 0
+    fp.write("".join(parts))
+
+
+def read_ast(fp: Union[TextIO, BinaryIO], chunk_size: int = 65536) -> AST:
+    """Deserialises MathLang AST from JSON, reading it from a file as it goes.
+
+    The file is read 'chunk_size' characters at a time, and nodes are built as soon as the JSON of each is complete,
+    without recursion. Neither the whole JSON text nor a tree of JSON objects is ever kept in memory.
+
+    :param fp: A text or binary file to read from, e.g. written by 'write_ast()'.
+    :type fp: Union[TextIO, BinaryIO]
+    :param chunk_size: The number of characters or bytes to read at once.
+    :type chunk_size: int
+    :return: MathLang AST.
+    :rtype: AST
+    :raises ASTFormatError: If the JSON is invalid, or is not of a MathLang AST.
+    """
+    match = _token.match
+    decoder = None
+    buffer = ""
+    # Offset of the buffer in the whole text, and of the next token in the buffer
+    offset = pos = 0
+    eof = False
+    # 'top' is the innermost object or array being read, and 'key' the key of its next value. Those around it are kept
+    # on the stack, with their keys.
+    stack = []
+    top = key = None
+    root = []
+    state = _VALUE
+    while True:
+        m = match(buffer, pos)
+        if not eof and (m is None or m.end() > len(buffer) - 3):
+            # The token might go on after what has been read so far, e.g. '1' could be the start of '1.5' or '1e-5'
+            chunk = fp.read(chunk_size)
+            eof = not chunk
+            if isinstance(chunk, bytes):
+                if decoder is None:
+                    decoder = getincrementaldecoder("utf-8")()
+                chunk = decoder.decode(chunk, final=eof)
+            offset += pos
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+        if m is None:
+            if buffer[pos:].strip():
+                raise ASTFormatError(f"Invalid JSON AST at offset {offset + pos}.")
+            break
+        kind = m.lastindex
+        pos = m.end()
+
+        if kind == _COMMA:
+            if state != _COMMA_OR_END:
+                raise _invalid(offset + m.start(kind), state)
+            state = _KEY_NEXT if type(top) is dict else _VALUE
+            continue
+        if kind == _KEY or kind == _STRING and (state == _KEY_OR_END or state == _KEY_NEXT):
+            if state != _KEY_OR_END and state != _KEY_NEXT:
+                raise _invalid(offset + m.start(kind), state)
+            key = _decode_string(m.group(kind), offset + m.start(kind))
+            state = _VALUE if kind == _KEY else _COLON_NEXT
+            continue
+        if kind == _COLON:
+            if state != _COLON_NEXT:
+                raise _invalid(offset + m.start(kind), state)
+            state = _VALUE
+            continue
+        if kind == _OPEN:
+            if state != _VALUE and state != _VALUE_OR_END:
+                raise _invalid(offset + m.start(kind), state)
+            stack.append((top, key))
+            if m.group(kind) == "{":
+                top = {}
+                state = _KEY_OR_END
+            else:
+                top = []
+                state = _VALUE_OR_END
+            key = None
+            continue
+        if kind == _CLOSE:
+            if top is None or (m.group(kind) == "}") != (type(top) is dict) or not (
+                    state == _COMMA_OR_END or state == _KEY_OR_END and type(top) is dict or state == _VALUE_OR_END):
+                raise _invalid(offset + m.start(kind), state)
+            value = _decode_object(top, offset + m.start(kind)) if type(top) is dict else top
+            top, key = stack.pop()
+        else:
+            if state != _VALUE and state != _VALUE_OR_END:
+                raise _invalid(offset + m.start(kind), state)
+            text = m.group(kind)
+            if kind == _STRING:
+                value = _decode_string(text, offset + m.start(kind))
+            elif kind == _NUMBER:
+                try:
+                    value = int(text) if text.lstrip("-").isdigit() else float(text)
+                except ValueError as e:
+                    # e.g. more digits than Python converts
+                    raise ASTFormatError(f"Invalid JSON AST at offset {offset + m.start(kind)}: {e}.") from None
+            else:
+                value = _literals[text]
+
+        # A value is complete, and goes in the innermost object or array
+        if top is None:
+            root.append(value)
+            state = _END
+        elif type(top) is dict:
+            top[key] = value
+            state = _COMMA_OR_END
+        else:
+            top.append(value)
+            state = _COMMA_OR_END
+    if state != _END:
+        raise ASTFormatError(f"Invalid JSON AST: unexpected end of data, expected {_expected[state]}.")
+    if not isinstance(root[0], AST):
+        raise ASTFormatError(f"Invalid JSON AST: the root is a {type(root[0]).__name__}, not a node.")
+    return root[0]
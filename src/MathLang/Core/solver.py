@@ -0,0 +1,113 @@
+import os
+import pickle
+import hashlib
+from os import PathLike
+from typing import Optional
+
+import sympy
+
+from MathLang.Core.cache import CacheStatistics, CompileCache
+
+
+class SolveCache:
+    """A memoisation cache of the results of SOLVE, which is by far the most expensive thing programs do.
+
+    Equations are keyed by the structure of the expression and the domain, as given by 'srepr()', so that solving the
+    same polynomial again, in any program, is a lookup. Results are kept pickled in a CompileCache, which bounds the
+    memory they take, evicts the least recently used ones and, if a directory is given and a signing key is set,
+    persists them on disk. Results on disk are signed, and only unpickled once their signature is verified. A result
+    which fails verification is solved again.
+
+    :param max_memory_size: Maximum total size of the results kept in memory, in bytes.
+    :type max_memory_size: int
+    :param directory: The directory to persist results in, or None to only keep them in memory.
+    :type directory: PathLike
+    :param max_disk_size: Maximum total size of the results kept on disk, in bytes.
+    :type max_disk_size: int
+    """
+
+    def __init__(self, max_memory_size: int = 16 * 1024 ** 2, directory: PathLike = None,
+                 max_disk_size: int = 256 * 1024 ** 2):
+        self.__results = CompileCache(max_memory_size, directory, max_disk_size)
+
+    @property
+    def stats(self) -> CacheStatistics:
+        return self.__results.stats
+
+    @staticmethod
+    def get_key(expr, domain) -> str:
+        """Gets the cache key of an equation.
+
+        :param expr: The expression to find the roots of.
+        :param domain: The set to find them in.
+        :return: A hexadecimal cache key.
+        :rtype: str
+        """
+        canonical = f"{sympy.__version__}:{sympy.srepr(expr)}:{sympy.srepr(domain)}"
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def solve(self, expr, domain):
+        """Solves an equation, or looks its solutions up if it has been solved before.
+
+        :param expr: The expression to find the roots of.
+        :param domain: The set to find them in.
+        :return: The set of solutions, as returned by 'sympy.solveset()'.
+        """
+        expr = sympy.sympify(expr)
+        key = self.get_key(expr, domain)
+        # Only results this process made, or verified ones from disk, are ever unpickled
+        value = self.__results.get(key)
+        if value is not None:
+            try:
+                return pickle.loads(value)
+            except Exception:
+                # An entry written by an incompatible version, solve it again
+                pass
+        result = sympy.solveset(expr, domain=domain)
+        try:
+            value = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return result
+        self.__results.put(key, value)
+        return result
+
+    def clear(self) -> None:
+        """Removes every result from the cache. Statistics are kept."""
+        self.__results.clear()
+
+    def __len__(self):
+        return len(self.__results)
+
+
+def _get_default_cache():
+    # MATHLANG_SOLVE_CACHE=off turns memoisation off, any other value is a directory to persist results in
+    setting = os.environ.get("MATHLANG_SOLVE_CACHE", "")
+    if setting.lower() in ("0", "off", "false", "no"):
+        return None
+    return SolveCache(directory=setting or None)
+
+
+_solve_cache = _get_default_cache()
+
+
+def get_solve_cache() -> Optional[SolveCache]:
+    """Gets the cache used by SOLVE in this process, or None if memoisation is off."""
+    return _solve_cache
+
+
+def set_solve_cache(cache: Optional[SolveCache]) -> None:
+    """Sets the cache used by SOLVE in this process.
+
+    :param cache: The cache to use, or None to turn memoisation off.
+    :type cache: Optional[SolveCache]
+    """
+    global _solve_cache
+    _solve_cache = cache
+
+
+def solve(expr, domain):
+    """Solves an equation for the code generated from SOLVE, through the memoisation cache unless it is off."""
+    cache = _solve_cache
+    if cache is None:
+        return sympy.solveset(expr, domain=domain)
+    return cache.solve(expr, domain)
@@ -0,0 +1,122 @@
+import re
+from itertools import chain
+from typing import Iterator, TextIO, Tuple
+
+from MathLang.Core.lexer import get_lexer
+from MathLang.Core.nodes import AST, CompilationContext, Program
+from MathLang.Core.parser import get_parser
+
+# A statement ends at the first semicolon which is not inside a comment
+_statement_end = re.compile(r"[;#]")
+
+
+def iter_statements(stream: TextIO, chunk_size: int = 64 * 1024) -> Iterator[Tuple[int, str]]:
+    """Splits MathLang source read from a stream into statements, without reading the whole stream first.
+
+    Only the statement being read is kept in memory. Whatever follows the last statement, such as trailing comments or
+    an unterminated statement, is yielded as well.
+
+    :param stream: A text stream of MathLang source code.
+    :type stream: TextIO
+    :param chunk_size: Number of characters to read at once.
+    :type chunk_size: int
+    :return: Pairs of the line number each statement starts on and its source.
+    :rtype: Iterator[Tuple[int, str]]
+    """
+    buffer = ""
+    lineno = 1
+    # Position up to which the buffer has been searched already
+    scanned = 0
+    while True:
+        chunk = stream.read(chunk_size)
+        buffer += chunk
+        start = 0
+        pos = scanned
+        while True:
+            m = _statement_end.search(buffer, pos)
+            if m is None:
+                pos = len(buffer)
+                break
+            if m.group() == "#":
+                end = buffer.find("\n", m.end())
+                if end < 0:
+                    # The comment goes on in the next chunk
+                    pos = m.start()
+                    break
+                pos = end
+                continue
+            statement = buffer[start:m.end()]
+            yield lineno, statement
+            lineno += statement.count("\n")
+            start = pos = m.end()
+        buffer = buffer[start:]
+        scanned = pos - start
+        if not chunk:
+            break
+    if buffer:
+        yield lineno, buffer
+
+
+def iter_ast_stream(stream: TextIO, context: CompilationContext, chunk_size: int = 64 * 1024) -> Iterator[AST]:
+    """Parses MathLang source read from a stream one statement at a time.
+
+    :param stream: A text stream of MathLang source code.
+    :type stream: TextIO
+    :param context: The context to record names in, shared by every statement.
+    :type context: CompilationContext
+    :param chunk_size: Number of characters to read at once.
+    :type chunk_size: int
+    :return: The AST of each statement.
+    :rtype: Iterator[AST]
+    """
+    lexer = get_lexer()
+    parser = get_parser()
+    for lineno, statement in iter_statements(stream, chunk_size):
+        tokens = lexer.lex(statement, lineno)
+        first = next(tokens, None)
+        if first is None:
+            # Only comments and whitespace
+            continue
+        yield from parser.parse(chain((first,), tokens), context).stmts
+
+
+def generate_python_stream(stream: TextIO, context: CompilationContext = None,
+                           chunk_size: int = 64 * 1024) -> Iterator[str]:
+    """Generates Python code from MathLang source read from a stream, one statement at a time.
+
+    The first piece of code sets up the environment, and every following one is the code of a single statement. They
+    must be run in order, in the same namespace.
+
+    :param stream: A text stream of MathLang source code.
+    :type stream: TextIO
+    :param context: The context to generate code with. A new one is used if not given.
+    :type context: CompilationContext
+    :param chunk_size: Number of characters to read at once.
+    :type chunk_size: int
+    :return: A stream of Python code strings.
+    :rtype: Iterator[str]
+    """
+    if context is None:
+        context = CompilationContext()
+    yield Program.init_code(context)
+    for stmt in iter_ast_stream(stream, context, chunk_size):
+        yield stmt.codify(context)
+
+
+def execute_stream(stream: TextIO, namespace: dict = None, chunk_size: int = 64 * 1024) -> None:
+    """Executes MathLang source read from a stream, running each statement as soon as it has been read.
+
+    Memory use is bounded by the largest statement rather than by the size of the program. This function is dangerous
+    and used for debugging purposes only.
+
+    :param stream: A text stream of MathLang source code.
+    :type stream: TextIO
+    :param namespace: The namespace to run the program in, which keeps its variables. A new one is used if not given.
+    :type namespace: dict
+    :param chunk_size: Number of characters to read at once.
+    :type chunk_size: int
+    """
+    if namespace is None:
+        namespace = {}
+    for code in generate_python_stream(stream, chunk_size=chunk_size):
+        exec(compile(code, "<MathLang>", "exec", optimize=2), namespace)
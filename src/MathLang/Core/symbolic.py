@@ -0,0 +1,202 @@
+from sympy import Add, Expr, Float, Integer, Mul, Pow, Rel, S, Symbol
+from sympy.printing.str import StrPrinter
+
+from MathLang.Core.nodes import AST, BinaryOps, Comparison, get_operation_str, is_unary
+
+# Integer powers of rationals with more bits than this are left for the program to compute, rather than computed while
+# generating code
+max_power_bits = 1 << 16
+
+
+def get_symbolic_str(node, context) -> str:
+    """Generates the code of a tree of operations for the symbolic target.
+
+    The tree is evaluated with SymPy while the code is generated, and the code is the evaluated expression as SymPy
+    prints it. Python evaluates the printed numbers when the program runs, so e.g. '1/2' gives 0.5 and '0.1+0.2' gives
+    0.3, while 'x*(1/2)' stays 'x/2'. Chains of sums and products are evaluated at once, so the cost stays close to
+    linear in the size of the tree.
+    """
+    return _CodePrinter(context).doprint(evaluate(node, context))
+
+
+def evaluate(node, context):
+    """Evaluates a tree of operations with SymPy, in a single, iterative pass.
+
+    Names are symbols named after their MathLang names. Nodes SymPy cannot evaluate, e.g. function evaluations, are
+    symbols which print as the code of the node. The values of operations the parser shared are kept in the context.
+    """
+    values = context.values
+    shared = context.shared
+    results = []
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, _Apply):
+            start = len(results) - item.arity
+            value = item.apply(results[start:])
+            del results[start:]
+            if shared and item.node in shared:
+                values[item.node] = value
+            results.append(value)
+        elif isinstance(item, (BinaryOps, Comparison)):
+            if shared and item in values:
+                results.append(values[item])
+                continue
+            operands, apply = _split(item, shared)
+            stack.append(apply)
+            stack.extend(reversed(operands))
+        elif isinstance(item, AST):
+            results.append(_Opaque.of(item))
+        elif item in context.symbols:
+            results.append(Symbol(item))
+        elif isinstance(item, str) and item[:1].isdigit():
+            results.append(Float(item) if "." in item else Integer(item))
+        else:
+            results.append(Symbol(str(item)))
+    return results[0]
+
+
+def _split(node, shared):
+    # Gets the operands of an operation and how to combine their values. Sums and products are followed down the left
+    # of the tree, so that a chain of them is a single operation
+    if is_unary(node):
+        return (node.right,), _Apply(node, "+", (node.op == "-",))
+    if node.op not in ("+", "-", "*", "/"):
+        return (node.left, node.right), _Apply(node, node.op, (False, False))
+    ops = ("+", "-") if node.op in ("+", "-") else ("*", "/")
+    operands = []
+    inverted = []
+    item = node
+    while True:
+        operands.append(item.right)
+        inverted.append(item.op == ops[1])
+        left = item.left
+        if not isinstance(left, BinaryOps) or left.op not in ops or is_unary(left) or (shared and left in shared):
+            break
+        item = left
+    operands.append(left)
+    inverted.append(False)
+    operands.reverse()
+    inverted.reverse()
+    return operands, _Apply(node, ops[0], tuple(inverted))
+
+
+class _Apply:
+    """Marks where the values of the operands of an operation are ready, the last 'arity' results."""
+
+    __slots__ = ("node", "op", "inverted")
+
+    def __init__(self, node, op, inverted):
+        self.node = node
+        self.op = op
+        # For each operand, whether it is subtracted or divided by, or negated by a unary minus
+        self.inverted = inverted
+
+    @property
+    def arity(self):
+        return len(self.inverted)
+
+    def apply(self, args):
+        op = self.op
+        if op not in ("==", "!=") and not all(isinstance(arg, Expr) for arg in args):
+            # E.g. the sum of a comparison, which Python computes from bools
+            return _Opaque.of(self.node)
+        try:
+            if op == "+":
+                return Add(*(-arg if inverted else arg for arg, inverted in zip(args, self.inverted)))
+            if op == "*":
+                if len(args) == 2 and not any(self.inverted):
+                    coefficient, factor = sorted(args, key=lambda arg: not arg.is_Rational)
+                    if (coefficient.is_Rational and coefficient.p and coefficient is not S.One
+                            and type(factor) is Symbol):
+                        # A rational number times a name, e.g. '2*x', is built the way Mul would build it, without
+                        # deducing its assumptions, which is most of the cost of generating the code of a polynomial
+                        return Mul._from_args((coefficient, factor))
+                return Mul(*(Pow(arg, -1) if inverted else arg for arg, inverted in zip(args, self.inverted)))
+            left, right = args
+            if op == "^":
+                if (left.is_Rational and right.is_Integer
+                        and max(abs(left.p), left.q).bit_length() * abs(int(right)) > max_power_bits):
+                    return _Opaque.of(self.node)
+                return Pow(left, right)
+            if op == "==":
+                return S(left == right)
+            if op == "!=":
+                return S(left != right)
+            return Rel(left, right, op)
+        except TypeError:
+            # SymPy cannot evaluate it, e.g. a comparison of complex numbers, so the program computes it with Python
+            return _Opaque.of(self.node)
+
+
+class _Opaque(Symbol):
+    """Stands for the value of a node SymPy does not evaluate while generating code, and prints as its code."""
+
+    __slots__ = ("node",)
+
+    @classmethod
+    def of(cls, node):
+        symbol = cls(_get_name(node))
+        symbol.node = node
+        return symbol
+
+
+class _Close:
+    pass
+
+
+def _get_name(node) -> str:
+    # Names a node by its structure, so that it sorts the same way in a sum whatever the Python names of the program are
+    parts = []
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, AST):
+            parts.append(type(item).__name__ + "(")
+            stack.append(_Close)
+            stack.extend(reversed(item.fields()))
+        elif isinstance(item, tuple):
+            parts.append("(")
+            stack.append(_Close)
+            stack.extend(reversed(item))
+        elif item is _Close:
+            parts.append(")")
+        else:
+            parts.append(repr(item) + ",")
+    return "\x01" + "".join(parts)
+
+
+class _CodePrinter(StrPrinter):
+    """Prints a SymPy value as the code of a generated program, in which SymPy is imported as '_s'."""
+
+    def __init__(self, context):
+        super().__init__()
+        self.context = context
+
+    def _print_Symbol(self, expr):
+        name = expr.name
+        return self.context.get_symbol(name) if name in self.context.symbols else name
+
+    def _print__Opaque(self, expr):
+        node = expr.node
+        if isinstance(node, (BinaryOps, Comparison)):
+            return f"({get_operation_str(node, self.context)})"
+        return f"({self.context.codify(node)})"
+
+    def _print_Pow(self, expr, rational=False):
+        if not rational and (expr.exp is S.Half or (expr.is_commutative and -expr.exp is S.Half)):
+            code = f"_s.sqrt({self._print(expr.base)})"
+            return code if expr.exp is S.Half else "1/" + code
+        return super()._print_Pow(expr, rational)
+
+    def _print_Function(self, expr):
+        return "_s." + super()._print_Function(expr)
+
+    def _print_NegativeInfinity(self, expr):
+        return "-_s.oo"
+
+
+# Constants SymPy prints by name, e.g. 'zoo' for 1/0, are names in SymPy's namespace
+for _name in ("Infinity", "ComplexInfinity", "NaN", "ImaginaryUnit", "Exp1", "Pi", "EulerGamma", "Catalan",
+              "GoldenRatio", "TribonacciConstant"):
+    setattr(_CodePrinter, f"_print_{_name}", lambda self, expr: f"_s.{expr}")
@@ -0,0 +1,57 @@
+from functools import lru_cache
+
+
+@lru_cache(maxsize=256)
+def get_function(expr):
+    """Lowers a MathLang function of x to a NumPy function, compiling each distinct function only once.
+
+    :param expr: A SymPy expression in x.
+    :return: A function taking an array of values of x and returning an array of values of the expression.
+    """
+    import sympy
+
+    x = sympy.Symbol("x")
+    expr = sympy.sympify(expr)
+    unknown = expr.free_symbols - {x}
+    if unknown:
+        raise ValueError(f"Cannot evaluate a function of {', '.join(sorted(map(str, unknown)))} numerically")
+    return sympy.lambdify(x, expr, "numpy")
+
+
+def points(start, stop, step=1):
+    """Gets the points of a range, e.g. '1..2 STEP 0.25'. Both ends are included.
+
+    :return: A NumPy array of the points.
+    """
+    import numpy as np
+
+    start, stop, step = float(start), float(stop), float(step)
+    if step == 0:
+        raise ValueError("The step of a range must not be zero")
+    # Allow for rounding, so that the last point is not lost when the step does not divide the range exactly
+    count = int(np.floor((stop - start) / step + 1e-9)) + 1
+    return start + step * np.arange(max(count, 0))
+
+
+def evaluate(function, values):
+    """Evaluates a function at many points in a single vectorised call.
+
+    :param function: A SymPy expression in x.
+    :param values: The values of x, as a list or an array.
+    :return: A NumPy array of the values of the function.
+    """
+    import numpy as np
+
+    values = np.asarray(values, dtype=float)
+    result = get_function(function)(values)
+    if np.shape(result) != values.shape:
+        # Functions which do not depend on x return a single value
+        result = np.full(values.shape, result, dtype=float)
+    return result
+
+
+def plot(*functions):
+    """Renders the functions of a PLOT statement to the current plot output, see 'get_plot_output()'."""
+    from MathLang.Core.plotting import get_plot_output
+
+    get_plot_output().add([get_function(function) for function in functions])
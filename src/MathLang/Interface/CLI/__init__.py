@@ -0,0 +1,108 @@
+import os
+import json
+from pathlib import Path
+from time import perf_counter
+
+import click
+
+from MathLang.Core.batch import compile_many
+from MathLang.Core.plotting import render_many
+
+# Name of the file recording what was built, kept in the output directory
+build_manifest = ".mathlang-build.json"
+
+
+@click.group()
+def cli():
+    """MathLang is a specially designed programming language for maths."""
+
+
+@cli.command()
+@click.argument("source_dir", type=click.Path(exists=True, file_okay=False, path_type=Path))
+@click.argument("output_dir", type=click.Path(file_okay=False, path_type=Path))
+@click.option("-j", "--jobs", type=int, default=None, help="Number of worker processes, the number of CPUs by default.")
+@click.option("-p", "--pattern", default="*.gp", show_default=True, help="Pattern of MathLang source files.")
+@click.option("-f", "--force", is_flag=True, help="Recompile every file, even if it has not changed.")
+@click.option("-q", "--quiet", is_flag=True, help="Only report failures and the summary.")
+def build(source_dir, output_dir, jobs, pattern, force, quiet):
+    """Compiles every MathLang file in SOURCE_DIR into OUTPUT_DIR.
+
+    Builds are incremental: a file is only recompiled if its code (not its comments) or the compiler has changed
+    since the last build.
+    """
+    start = perf_counter()
+    manifest_path = output_dir / build_manifest
+    manifest = {}
+    if manifest_path.exists() and not force:
+        with open(manifest_path) as fp:
+            manifest = json.load(fp)
+
+    sources = sorted(p.relative_to(source_dir) for p in source_dir.rglob(pattern) if p.is_file())
+    names = [p.as_posix() for p in sources]
+    paths = [str(source_dir / p) for p in sources]
+    known_keys = {path: manifest.get(name) for path, name in zip(paths, names)}
+    results = compile_many(
+        paths, jobs, [str(output_dir / p.with_suffix(".mlc")) for p in sources], known_keys
+    )
+
+    new_manifest = {}
+    failed = skipped = 0
+    for name, result in zip(names, results):
+        if result.error is not None:
+            failed += 1
+            click.echo(f"FAILED     {name}: {result.error}", err=True)
+            continue
+        new_manifest[name] = result.key
+        if result.skipped:
+            skipped += 1
+            if not quiet:
+                click.echo(f"unchanged  {name}")
+        elif not quiet:
+            click.echo(f"compiled   {name} ({result.elapsed * 1000:.1f} ms)")
+
+    # Outputs of sources which no longer exist are stale
+    for name in manifest.keys() - set(names):
+        try:
+            os.remove(output_dir / Path(name).with_suffix(".mlc"))
+        except OSError:
+            pass
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with open(manifest_path, "w") as fp:
+        json.dump(new_manifest, fp, indent=0, sort_keys=True)
+
+    compiled = len(results) - failed - skipped
+    click.echo(f"{compiled} compiled, {skipped} unchanged, {failed} failed in {perf_counter() - start:.2f} s")
+    if failed:
+        raise SystemExit(1)
+
+
+@cli.command()
+@click.argument("source_dir", type=click.Path(exists=True, file_okay=False, path_type=Path))
+@click.argument("output_dir", type=click.Path(file_okay=False, path_type=Path))
+@click.option("-j", "--jobs", type=int, default=None, help="Number of worker processes, the number of CPUs by default.")
+@click.option("-p", "--pattern", default="*.gp", show_default=True, help="Pattern of MathLang source files.")
+@click.option("-f", "--format", "fmt", type=click.Choice(["png", "svg", "pdf"]), default="png", show_default=True,
+              help="Format of the images.")
+@click.option("-q", "--quiet", is_flag=True, help="Only report failures and the summary.")
+def render(source_dir, output_dir, jobs, pattern, fmt, quiet):
+    """Renders the PLOT statements of every MathLang file in SOURCE_DIR into OUTPUT_DIR.
+
+    The n-th plot of 'dir/prog.gp' is written to 'OUTPUT_DIR/dir/prog-n.FORMAT'.
+    """
+    start = perf_counter()
+    sources = sorted(p.relative_to(source_dir) for p in source_dir.rglob(pattern) if p.is_file())
+    results = render_many(
+        [source_dir / p for p in sources], [output_dir / p.with_suffix("") for p in sources], fmt, jobs
+    )
+    failed = images = 0
+    for name, result in zip(sources, results):
+        images += len(result.images)
+        if result.error is not None:
+            failed += 1
+            click.echo(f"FAILED     {name.as_posix()}: {result.error}", err=True)
+        elif not quiet:
+            click.echo(f"rendered   {name.as_posix()} ({len(result.images)} plots, {result.elapsed * 1000:.1f} ms)")
+    click.echo(f"{images} plots from {len(results) - failed} files, {failed} failed in {perf_counter() - start:.2f} s")
+    if failed:
+        raise SystemExit(1)
@@ -0,0 +1,74 @@
+import os
+import asyncio
+import base64
+from concurrent.futures import ProcessPoolExecutor
+
+from pytest import fixture, raises
+
+from MathLang.Core import AsyncCompiler, compile_async, Compiler, decompile_async, ExecutionPool
+from MathLang.Core.adaptors import compile_file_to_bytecode_async, compile_source_to_file_async
+
+
+class TestAsynchronous:
+    @staticmethod
+    @fixture()
+    def quick_src():
+        return "f=2*x+1;roots=SOLVE f IN REAL;"
+
+    @staticmethod
+    @fixture()
+    def signing_key(monkeypatch):
+        monkeypatch.setenv("GRAPHER_SIGNING_KEY", base64.b64encode(os.urandom(32)).decode())
+
+    @staticmethod
+    def test_compile_and_decompile(quick_src, signing_key):
+        async def main():
+            return await decompile_async(await compile_async(quick_src))
+
+        assert asyncio.run(main()) == Compiler.py_decompile(Compiler.py_compile(quick_src))
+
+    @staticmethod
+    def test_process_executor(signing_key):
+        sources = [f"f={i}*x;PRINT f(1);" for i in range(20)]
+
+        async def main(compiler):
+            return await asyncio.gather(*(compiler.compile(s) for s in sources))
+
+        with ProcessPoolExecutor(2) as executor:
+            results = asyncio.run(main(AsyncCompiler(executor, max_concurrency=4)))
+        assert [Compiler.py_decompile(r) for r in results] == [Compiler.py_decompile(Compiler.py_compile(s))
+                                                               for s in sources]
+
+    @staticmethod
+    def test_execute(signing_key):
+        with ExecutionPool(workers=1) as pool:
+            compiler = AsyncCompiler(pool=pool)
+
+            async def main():
+                return await compiler.execute(await compiler.compile("PRINT 6*7;"))
+
+            assert asyncio.run(main()).output.strip() == "42"
+
+    @staticmethod
+    def test_cancellation(quick_src):
+        async def main():
+            compiler = AsyncCompiler(max_concurrency=1)
+            first = asyncio.ensure_future(compiler.run(lambda: __import__("time").sleep(0.5)))
+            second = asyncio.ensure_future(compiler.compile(quick_src))
+            await asyncio.sleep(0.05)
+            second.cancel()
+            await first
+            with raises(asyncio.CancelledError):
+                await second
+
+        asyncio.run(main())
+
+    @staticmethod
+    def test_file_adaptors(quick_src, tmp_path, signing_key):
+        async def main():
+            await compile_source_to_file_async(quick_src, tmp_path / "out.mlc")
+            (tmp_path / "in.gp").write_text(quick_src)
+            return await compile_file_to_bytecode_async(tmp_path / "in.gp")
+
+        bytecode = asyncio.run(main())
+        assert Compiler.py_decompile(bytecode) == Compiler.py_decompile((tmp_path / "out.mlc").read_bytes())
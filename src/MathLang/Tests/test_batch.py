@@ -0,0 +1,35 @@
+from pytest import fixture
+
+from MathLang.Core import compile_many, Compiler
+
+
+class TestBatch:
+    @staticmethod
+    @fixture()
+    def source_files(tmp_path):
+        paths = []
+        for i in range(12):
+            paths.append(tmp_path / f"prog{i}.gp")
+            paths[-1].write_text(f"f={i}*x+1;PRINT f({i});")
+        paths.append(tmp_path / "broken.gp")
+        paths[-1].write_text("f=;")
+        return paths
+
+    @staticmethod
+    def test_compile_many(source_files):
+        results = compile_many(source_files, jobs=2)
+        assert [r.path for r in results] == source_files
+        assert [r.ok for r in results] == [True] * 12 + [False]
+        for path, result in zip(source_files, results[:-1]):
+            expected = Compiler.py_decompile(Compiler.py_compile(path.read_text()), True)
+            assert Compiler.py_decompile(result.bytecode, True) == expected
+
+    @staticmethod
+    def test_known_keys_are_skipped(source_files, tmp_path):
+        out_paths = [tmp_path / f"{p.stem}.mlc" for p in source_files]
+        first = compile_many(source_files, 1, out_paths)
+        source_files[0].write_text("# Only a comment changed\nf=0*x+1;PRINT f(0);")
+        source_files[1].write_text("f=x;")
+        second = compile_many(source_files, 1, out_paths, {r.path: r.key for r in first})
+        assert [r.skipped for r in second[:3]] == [True, False, True]
+        assert out_paths[1].exists() and second[1].bytecode is None
@@ -0,0 +1,63 @@
+from pathlib import Path
+
+from pytest import fixture, raises
+
+from MathLang.Core import ASTFormatError, deserialise_ast, dump_ast, generate_ast, load_ast, serialise_ast
+from MathLang.Core.binary_ast import HEADER, MAGIC
+from MathLang.Core.nodes import BinaryOps, Input, Program
+
+test_data_path = Path(__file__).parent.absolute() / "test_data"
+
+
+class TestBinaryAST:
+    @staticmethod
+    @fixture()
+    def demo():
+        with open(test_data_path / "simple_demo.gp") as fp:
+            return fp.read()
+
+    @staticmethod
+    def test_round_trip(demo):
+        ast = generate_ast(demo)
+        data = dump_ast(ast)
+        assert data.startswith(MAGIC)
+        assert load_ast(data) == ast
+        assert len(data) < len(serialise_ast(ast)) / 4
+
+    @staticmethod
+    def test_same_as_json(demo):
+        src = demo + "g = f(1..10 STEP 2) + f(1, 2, 3); PRINT g, SOLVE f IN INTEGER;"
+        json = serialise_ast(generate_ast(src))
+        assert serialise_ast(load_ast(dump_ast(deserialise_ast(json)))) == json
+        assert dump_ast(deserialise_ast(json)) == dump_ast(generate_ast(src))
+        ast = Program([Input("a", None), Input("b", '"b? "'), BinaryOps(-7, "+", 2 ** 70)])
+        assert load_ast(dump_ast(ast)) == ast == deserialise_ast(serialise_ast(ast))
+
+    @staticmethod
+    def test_large_trees():
+        # Deeper than the JSON serialiser can go, and with more strings than fit in a single byte
+        ast = generate_ast("f=" + "+".join(f"{i}*x" for i in range(20000)) + ";")
+        assert load_ast(dump_ast(ast)) == ast
+        shared = generate_ast("f=(x+1)^2*(x+1)^2;", intern=True)
+        assert load_ast(dump_ast(shared)) == shared
+
+    @staticmethod
+    def test_invalid_data(demo):
+        data = dump_ast(generate_ast(demo))
+        with raises(ASTFormatError, match="Not a MathLang binary AST"):
+            load_ast(b"XXXX" + data[4:])
+        with raises(ASTFormatError, match="version"):
+            load_ast(HEADER.pack(MAGIC, 99) + data[HEADER.size:])
+        for i in (HEADER.size, HEADER.size + 1, len(data) // 2, len(data) - 1):
+            with raises(ASTFormatError, match="truncated"):
+                load_ast(data[:i])
+        with raises(ASTFormatError, match="trailing"):
+            load_ast(data + b"\x00")
+        with raises(ASTFormatError, match="Missing fields"):
+            load_ast(HEADER.pack(MAGIC, 1) + b"\x00\x00\x19")
+        with raises(ASTFormatError, match="Unknown opcode"):
+            load_ast(HEADER.pack(MAGIC, 1) + b"\x00\xff")
+        with raises(ASTFormatError, match="UTF-8"):
+            load_ast(HEADER.pack(MAGIC, 1) + b"\x01\x01\xff\x01\x00")
+        with raises(TypeError):
+            dump_ast(Program([1.5]))
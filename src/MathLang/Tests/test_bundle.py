@@ -0,0 +1,66 @@
+import os
+import base64
+
+from pytest import fixture, raises
+
+from MathLang.Core import Bundle, Compiler
+from MathLang.Core.adaptors import compile_files_to_bundle, compile_sources_to_bundle
+
+test_sources = {
+    "linear": "f=2*x+1;roots=SOLVE f IN REAL;",
+    "quadratic": "f=x^2-1;PRINT f(3);",
+    "constant": "a=5;PRINT a;",
+}
+
+
+class TestBundle:
+    @staticmethod
+    @fixture()
+    def signing_key(monkeypatch):
+        monkeypatch.setenv("GRAPHER_SIGNING_KEY", base64.b64encode(os.urandom(32)).decode())
+
+    @staticmethod
+    @fixture()
+    def bundle_path(tmp_path, signing_key):
+        path = tmp_path / "programs.mlb"
+        compile_sources_to_bundle(test_sources, path)
+        return path
+
+    @staticmethod
+    def test_random_access(bundle_path):
+        with Bundle(bundle_path) as bundle:
+            assert sorted(bundle) == sorted(test_sources)
+            for name, source in test_sources.items():
+                assert bundle.get_code(name) == Compiler.py_decompile(Compiler.py_compile(source))
+
+    @staticmethod
+    def test_files_to_bundle(tmp_path, signing_key):
+        paths = []
+        for name, source in test_sources.items():
+            paths.append(tmp_path / f"{name}.gp")
+            paths[-1].write_text(source)
+        compile_files_to_bundle(paths, tmp_path / "files.mlb")
+        with Bundle(tmp_path / "files.mlb") as bundle:
+            assert sorted(bundle) == sorted(map(str, paths))
+            assert bundle.verify() == []
+
+    @staticmethod
+    def test_bulk_verify(bundle_path):
+        with Bundle(bundle_path) as bundle:
+            offset, size, _ = bundle.index["quadratic"]
+        data = bytearray(bundle_path.read_bytes())
+        data[offset + size - 1] ^= 0xFF
+        bundle_path.write_bytes(bytes(data))
+        with Bundle(bundle_path) as bundle:
+            assert bundle.verify() == ["quadratic"]
+            with raises(BaseException, match="Signature verification failed"):
+                bundle.get_code("quadratic")
+            assert bundle.get_code("linear") is not None
+
+    @staticmethod
+    def test_tampered_index(bundle_path):
+        data = bytearray(bundle_path.read_bytes())
+        data[20] ^= 0xFF
+        bundle_path.write_bytes(bytes(data))
+        with raises(BaseException, match="Signature verification failed"):
+            Bundle(bundle_path)
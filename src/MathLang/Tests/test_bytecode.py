@@ -0,0 +1,56 @@
+import os
+import base64
+import hmac
+
+import dill
+from pytest import fixture, raises
+
+from MathLang.Core import BytecodeFormatError, Compiler, generate_ast, generate_python_code
+from MathLang.Core.bytecode import HEADER, MAGIC
+
+
+class TestBytecode:
+    @staticmethod
+    @fixture()
+    def quick_src():
+        return "f=2*x+1;roots=SOLVE f IN REAL;"
+
+    @staticmethod
+    @fixture()
+    def signing_key(monkeypatch):
+        key = os.urandom(32)
+        monkeypatch.setenv("GRAPHER_SIGNING_KEY", base64.b64encode(key).decode())
+        return key
+
+    @staticmethod
+    def test_round_trip(quick_src, signing_key):
+        bytecode = Compiler.py_compile(quick_src)
+        assert bytecode.startswith(MAGIC)
+        code = generate_python_code(generate_ast(quick_src))
+        assert Compiler.py_decompile(bytecode) == compile(code, "<MathLang>", "exec", optimize=2)
+
+    @staticmethod
+    def test_legacy_dill_bytecode(quick_src, signing_key):
+        code = Compiler.py_decompile(Compiler.py_compile(quick_src))
+        legacy = dill.dumps(code)
+        legacy += hmac.new(signing_key, legacy, "sha512").digest()
+        assert Compiler.py_decompile(legacy) == code
+
+    @staticmethod
+    def test_signature_checked_before_loading(quick_src, signing_key, monkeypatch):
+        bytecode = bytearray(Compiler.py_compile(quick_src))
+        bytecode[HEADER.size] ^= 0xFF
+
+        def fail_loads(*args):
+            raise AssertionError("Payload must not be deserialised")
+
+        monkeypatch.setattr("marshal.loads", fail_loads)
+        with raises(BaseException, match="Signature verification failed"):
+            Compiler.py_decompile(bytes(bytecode))
+
+    @staticmethod
+    def test_foreign_python_version(quick_src):
+        bytecode = bytearray(Compiler.py_compile(quick_src))
+        bytecode[6:10] = b"\0\0\r\n"
+        with raises(BytecodeFormatError):
+            Compiler.py_decompile(bytes(bytecode), True)
@@ -0,0 +1,94 @@
+import os
+import base64
+
+from pytest import fixture
+
+from MathLang.Core import CompileCache, Compiler
+
+
+class TestCache:
+    @staticmethod
+    @fixture()
+    def signing_key(monkeypatch):
+        monkeypatch.setenv("GRAPHER_SIGNING_KEY", base64.b64encode(os.urandom(32)).decode())
+
+    @staticmethod
+    @fixture()
+    def quick_src():
+        return "f=2*x+1;roots=SOLVE f IN REAL;"
+
+    @staticmethod
+    @fixture()
+    def commented_src():
+        return "# Define f\nf = 2*x + 1;\n# Solve f\nroots = SOLVE f IN REAL;\n"
+
+    @staticmethod
+    def test_comment_insensitive_hit(quick_src, commented_src):
+        cache = CompileCache()
+        first = Compiler.py_decompile(Compiler.py_compile(quick_src, cache), True)
+        second = Compiler.py_decompile(Compiler.py_compile(commented_src, cache), True)
+        assert first == second
+        assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+        assert len(cache) == 1
+
+    @staticmethod
+    def test_memory_eviction():
+        cache = CompileCache(max_memory_size=10)
+        cache.put("a", b"12345")
+        cache.put("b", b"12345")
+        assert cache.get("a") == b"12345"
+        cache.put("c", b"12345")
+        assert cache.get("b") is None
+        assert cache.get("a") == b"12345"
+        assert cache.stats.evictions == 1
+
+    @staticmethod
+    def test_disk_tier(quick_src, tmp_path, signing_key):
+        bytecode = Compiler.py_compile(quick_src, CompileCache(directory=tmp_path))
+        cache = CompileCache(directory=tmp_path)
+        assert Compiler.py_compile(quick_src, cache)[:-64] == bytecode[:-64]
+        assert (cache.stats.disk_hits, cache.stats.misses) == (1, 0)
+
+    @staticmethod
+    def test_disk_eviction(tmp_path, signing_key):
+        # Entries on disk take 64 more bytes for their signatures
+        cache = CompileCache(max_memory_size=0, directory=tmp_path, max_disk_size=2 * 69)
+        a, b, c = (CompileCache.get_key(source, "test") for source in "abc")
+        for key in (a, b, c):
+            cache.put(key, b"12345")
+        assert sorted(p.name for p in tmp_path.iterdir()) == sorted([b, c])
+        assert cache.get(a) is None
+        assert cache.get(c) == b"12345"
+
+    @staticmethod
+    def test_other_files(quick_src, tmp_path, signing_key):
+        (tmp_path / "notes.txt").write_text("not a cache entry")
+        (tmp_path / ("0" * 64 + ".bak")).write_bytes(b"12345")
+        cache = CompileCache(directory=tmp_path)
+        Compiler.py_compile(quick_src, cache)
+        cache.put("notes.txt", b"12345")
+        assert len(CompileCache(directory=tmp_path)) == 1
+        cache.clear()
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["0" * 64 + ".bak", "notes.txt"]
+        assert (tmp_path / "notes.txt").read_text() == "not a cache entry"
+
+    @staticmethod
+    def test_tampered_entry(quick_src, tmp_path, signing_key):
+        Compiler.py_compile(quick_src, CompileCache(directory=tmp_path))
+        path, = tmp_path.iterdir()
+        entry = path.read_bytes()
+        path.write_bytes(entry[:-65] + bytes([entry[-65] ^ 1]) + entry[-64:])
+        cache = CompileCache(directory=tmp_path)
+        Compiler.py_compile(quick_src, cache)
+        assert (cache.stats.disk_hits, cache.stats.misses) == (0, 1)
+        # The entry was removed, then written again
+        assert path.read_bytes() != entry[:-65] + bytes([entry[-65] ^ 1]) + entry[-64:]
+        assert CompileCache(directory=tmp_path).get(path.name) is not None
+
+    @staticmethod
+    def test_no_signing_key(tmp_path, monkeypatch):
+        monkeypatch.delenv("GRAPHER_SIGNING_KEY", raising=False)
+        cache = CompileCache(directory=tmp_path)
+        cache.put("a", b"12345")
+        assert not list(tmp_path.iterdir())
+        assert cache.get("a") == b"12345"
@@ -0,0 +1,49 @@
+import json
+
+from click.testing import CliRunner
+from pytest import fixture
+
+from MathLang.Interface.CLI import build_manifest, cli
+
+
+class TestCLI:
+    @staticmethod
+    @fixture()
+    def source_dir(tmp_path):
+        (tmp_path / "src" / "nested").mkdir(parents=True)
+        (tmp_path / "src" / "a.gp").write_text("f=2*x+1;")
+        (tmp_path / "src" / "nested" / "b.gp").write_text("g=x^2;PRINT g(3);")
+        return tmp_path / "src"
+
+    @staticmethod
+    def test_incremental_build(source_dir, tmp_path):
+        out = tmp_path / "out"
+        runner = CliRunner()
+        result = runner.invoke(cli, ["build", str(source_dir), str(out), "-j", "1"])
+        assert result.exit_code == 0, result.output
+        assert "2 compiled, 0 unchanged, 0 failed" in result.output
+        assert (out / "a.mlc").exists() and (out / "nested" / "b.mlc").exists()
+        assert set(json.loads((out / build_manifest).read_text())) == {"a.gp", "nested/b.gp"}
+
+        (source_dir / "a.gp").write_text("# Comment\nf = 2*x + 1;")
+        (source_dir / "nested" / "b.gp").unlink()
+        (source_dir / "c.gp").write_text("c=1;")
+        result = runner.invoke(cli, ["build", str(source_dir), str(out), "-j", "1"])
+        assert "1 compiled, 1 unchanged, 0 failed" in result.output
+        assert not (out / "nested" / "b.mlc").exists()
+
+    @staticmethod
+    def test_failures(source_dir, tmp_path):
+        (source_dir / "bad.gp").write_text("f=;")
+        result = CliRunner().invoke(cli, ["build", str(source_dir), str(tmp_path / "out"), "-j", "1"])
+        assert result.exit_code == 1
+        assert "FAILED     bad.gp" in result.output
+
+    @staticmethod
+    def test_render(source_dir, tmp_path):
+        (source_dir / "nested" / "c.gp").write_text("f=x^2;PLOT f;PLOT f, 1/x;")
+        out = tmp_path / "plots"
+        result = CliRunner().invoke(cli, ["render", str(source_dir), str(out), "-j", "1", "-f", "svg"])
+        assert result.exit_code == 0, result.output
+        assert "2 plots from 3 files, 0 failed" in result.output
+        assert sorted(p.name for p in (out / "nested").iterdir()) == ["c-1.svg", "c-2.svg"]
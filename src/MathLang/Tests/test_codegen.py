@@ -1,9 +1,9 @@
 from pathlib import Path
 from json import dumps, loads
 
-from pytest import fixture
+from pytest import fixture, mark
 
-from MathLang.Core import deserialise_ast, generate_ast, generate_python_code
+from MathLang.Core import CompilationContext, deserialise_ast, generate_ast, generate_python_code
 
 test_data_path = Path(__file__).parent.absolute() / "test_data"
 
@@ -34,3 +34,50 @@ class TestCodegen:
     def test_demo_codegen(redirect_stdout, demo_ast):
         code = redirect_stdout + generate_python_code(deserialise_ast(demo_ast))
         assert exec(code) is None
+
+    @staticmethod
+    def test_long_expression_codegen(capsys):
+        terms = 1000
+        code = generate_python_code(generate_ast(f"f={'+'.join(['1'] * terms)}-x/x;PRINT f;"))
+        assert "sympify" not in code
+        exec(code)
+        assert capsys.readouterr().out.strip() == str(terms - 1)
+
+    @staticmethod
+    @mark.parametrize("src, output", [
+        # What programs printed when the code of every operation was sympified
+        ("PRINT 1/2, 7/-2, 2^-1;", "0.5-3.50.5"),
+        ("PRINT 0.1+0.2;", "0.3"),
+        ("f=x^2; PRINT f(1/3);", "0.111111111111111"),
+        ("f=(x+1)/2; PRINT f;", "x/2 + 0.5"),
+        ("PRINT (1/3)*3, 4/2, 3^2/3;", "123"),
+        ("f=x/2+0.1+0.2; PRINT f;", "x/2 + 0.3"),
+        ("f=2*x/4; PRINT f, f(3);", "x/23/2"),
+        ("f=x^2-2*x+1; PRINT f(0.5), f(2);", "0.2500000000000001"),
+        ("f=3*x-1/3; PRINT f, f(1);", "3*x - 0.3333333333333332.66666666666667"),
+        ("PRINT 1.5*2, 3-5, -2^2;", "3.0-2-4"),
+        ("f=x^-1; PRINT f, f(2);", "1/x1/2"),
+        ("PRINT 1 < 2, 1/2 == 0.5;", "TrueFalse"),
+        ("PRINT 2^100, 10^20/3;", "12676506002282294014967032053763.333333333333333e+19"),
+        ("f=0.5*x; PRINT f(0.1), f;", "0.05000000000000000.5*x"),
+        ("a=1/2; PRINT a*x, (1/2)*x;", "0.5*xx/2"),
+    ])
+    def test_numeric_semantics(src, output, capsys):
+        exec(generate_python_code(generate_ast(src)), {})
+        assert capsys.readouterr().out.strip() == output
+
+    @staticmethod
+    def test_helpers_are_imported_when_used(quick_src):
+        assert "MathLang.Core" not in generate_python_code(generate_ast("f=2*x+1;PRINT f(2);"))
+        code = generate_python_code(generate_ast(quick_src))
+        assert "MathLang.Core.solver" in code and "MathLang.Core.vectorised" not in code
+        assert code.endswith("del _s,_pp,_sv,_0,_1,_2;")
+        code = generate_python_code(generate_ast("f=x^2;PLOT f;PRINT f(1..3);"))
+        assert "MathLang.Core.solver" not in code and "MathLang.Core.vectorised" in code
+
+    @staticmethod
+    def test_symbol_interning():
+        context = CompilationContext()
+        generate_ast("a=1;b=a;a=b;", context)
+        assert list(context.symbols) == ["x", "a", "b"]
+        assert [context.get_symbol(s) for s in ("b", "c", "x")] == ["_2", "_3", "_0"]
@@ -26,8 +26,8 @@ class TestCompiler:
 
     @staticmethod
     def test_compiler(redirect_stdout, quick_src):
-        assert execute(quick_src) is None
+        assert execute(quick_src) == []
 
     @staticmethod
     def test_demo_compiler(redirect_stdout, demo_src):
-        assert execute(demo_src) is None
+        assert len(execute(demo_src)) == 1
@@ -0,0 +1,29 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from pytest import fixture
+
+from MathLang.Core import Compiler, generate_ast, generate_python_code
+
+
+class TestConcurrency:
+    @staticmethod
+    @fixture()
+    def programs():
+        # Every program declares a different number of names in a different order, so that any symbol table shared
+        # between compilations would change the generated code.
+        sources = []
+        for i in range(2000):
+            names = [f"v{i}_{k}" for k in range(i % 7 + 1)]
+            if i % 2:
+                names.reverse()
+            stmts = [f"{name}={k}*x+{i};" for k, name in enumerate(names)]
+            stmts.append(f"PRINT {'+'.join(names)};")
+            sources.append("".join(stmts))
+        return sources
+
+    @staticmethod
+    def test_parallel_compilation(programs):
+        expected = [compile(generate_python_code(generate_ast(s)), "<MathLang>", "exec", optimize=2) for s in programs]
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(lambda s: Compiler.py_decompile(Compiler.py_compile(s), True), programs))
+        assert results == expected
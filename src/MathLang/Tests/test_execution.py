@@ -0,0 +1,73 @@
+import os
+import base64
+
+from pytest import fixture
+
+from MathLang.Core import Compiler, ExecutionPool
+from MathLang.Core.bytecode import dump_code
+
+
+class TestExecution:
+    @staticmethod
+    @fixture()
+    def signing_key(monkeypatch):
+        monkeypatch.setenv("GRAPHER_SIGNING_KEY", base64.b64encode(os.urandom(32)).decode())
+
+    @staticmethod
+    def python_bytecode(source):
+        bytecode = dump_code(compile(source, "<test>", "exec"))
+        return bytecode + Compiler.sign(bytecode)
+
+    @staticmethod
+    def test_captured_output(signing_key):
+        with ExecutionPool(workers=2) as pool:
+            futures = [pool.submit(Compiler.py_compile(f"f={i}*x+1;PRINT f(2);")) for i in range(6)]
+            results = [future.result() for future in futures]
+        assert [result.output.strip() for result in results] == [str(2 * i + 1) for i in range(6)]
+        assert all(result.ok for result in results)
+
+    @staticmethod
+    def test_errors_are_reported(signing_key):
+        with ExecutionPool(workers=1) as pool:
+            result = pool.run(Compiler.py_compile("PRINT y;"))
+            assert "NameError" in result.error
+            assert pool.run(Compiler.py_compile("PRINT 1;")).output.strip() == "1"
+
+    @staticmethod
+    def test_unsigned_bytecode_is_rejected():
+        with ExecutionPool(workers=1) as pool:
+            assert "No signing key found" in pool.run(Compiler.py_compile("PRINT 1;")).error
+
+    @staticmethod
+    def test_timeout(signing_key):
+        with ExecutionPool(workers=1, timeout=0.5) as pool:
+            result = pool.run(TestExecution.python_bytecode("while True: pass"))
+            assert "timed out" in result.error
+            assert pool.run(Compiler.py_compile("PRINT 1;")).output.strip() == "1"
+
+    @staticmethod
+    def test_memory_limit(signing_key):
+        with ExecutionPool(workers=1, memory_limit=2 * 1024 ** 3) as pool:
+            result = pool.run(TestExecution.python_bytecode("b = bytearray(4 * 1024 ** 3)"))
+            assert "MemoryError" in result.error
+
+    @staticmethod
+    def test_worker_recycling(signing_key):
+        bytecode = TestExecution.python_bytecode("import os; print(os.getpid())")
+        with ExecutionPool(workers=1, max_jobs_per_worker=2) as pool:
+            pids = [pool.run(bytecode).output for _ in range(4)]
+        assert pids[0] == pids[1] != pids[2] == pids[3]
+
+    @staticmethod
+    def test_workers_are_not_forked(signing_key):
+        # A forked worker would have inherited every module of this process
+        with ExecutionPool(workers=1) as pool:
+            result = pool.run(TestExecution.python_bytecode("import sys; print('pytest' in sys.modules)"))
+        assert result.output.strip() == "False"
+
+    @staticmethod
+    def test_plots_are_returned(signing_key):
+        with ExecutionPool(workers=1) as pool:
+            results = [pool.run(Compiler.py_compile("PLOT x; PLOT x^2;")) for _ in range(2)]
+        assert [len(result.images) for result in results] == [2, 2]
+        assert results[0].images[0].startswith(b"\x89PNG")
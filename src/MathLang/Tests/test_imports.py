@@ -0,0 +1,69 @@
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+from pytest import fixture
+
+src_path = Path(__file__).parent.parent.parent.absolute()
+
+# Total import time allowed for lexing and parsing, in microseconds
+import_time_budget = 250000
+heavy_modules = ("sympy", "dill", "numpy", "py")
+
+
+class TestImports:
+    @staticmethod
+    def import_times(code):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=src_path, stderr=subprocess.PIPE, universal_newlines=True, check=True,
+        )
+        times = {}
+        for match in re.finditer(r"^import time:\s+(\d+) \|\s+\d+ \|\s+(\S+)$", result.stderr, re.MULTILINE):
+            times[match.group(2)] = int(match.group(1))
+        return times
+
+    @staticmethod
+    @fixture()
+    def parsing_times():
+        return TestImports.import_times(
+            "import MathLang.Core.lexer, MathLang.Core.parser\n"
+            "from MathLang.Core import generate_ast, get_source_signature\n"
+            "get_source_signature('f=2*x+1;')\n"
+            "generate_ast('f=2*x+1;roots=SOLVE f IN REAL;')\n"
+        )
+
+    @staticmethod
+    def test_package_import_is_lazy():
+        times = TestImports.import_times("import MathLang.Core")
+        assert not any(name.startswith(("rply", "MathLang.Core.")) for name in times)
+
+    @staticmethod
+    def test_parsing_avoids_heavy_modules(parsing_times):
+        assert not [name for name in parsing_times if name.split(".")[0] in heavy_modules]
+
+    @staticmethod
+    def test_parsing_import_time_budget(parsing_times):
+        assert sum(parsing_times.values()) < import_time_budget
+
+    @staticmethod
+    def test_star_imports():
+        for package in ("MathLang", "MathLang.Core"):
+            result = subprocess.run(
+                [sys.executable, "-c", f"from {package} import *; import {package}; "
+                                       f"print(sorted(set({package}.__all__) - set(dir())))"],
+                cwd=src_path, stdout=subprocess.PIPE, universal_newlines=True, check=True,
+            )
+            assert result.stdout.strip() == "[]"
+        import MathLang
+        assert {"Compiler", "compile_source_to_bytecode", "open_bundle"} <= set(MathLang.__all__)
+
+    @staticmethod
+    def test_adaptors_are_exported():
+        import MathLang
+        from MathLang.Core import adaptors
+        public = {name for name, value in vars(adaptors).items()
+                  if not name.startswith("_") and getattr(value, "__module__", "").startswith("MathLang.")}
+        assert public <= set(MathLang.__all__)
+        assert all(getattr(MathLang, name) is getattr(adaptors, name) for name in public)
@@ -0,0 +1,61 @@
+import base64
+import os
+from pathlib import Path
+
+from pytest import fixture, raises
+
+from MathLang.Core import Compiler, IncrementalCompiler, generate_ast, generate_python_code
+from MathLang.Core.nodes import InvalidToken
+
+test_data_path = Path(__file__).parent.absolute() / "test_data"
+
+
+class TestIncremental:
+    @staticmethod
+    @fixture()
+    def demo_src():
+        with open(test_data_path / "simple_demo.gp") as fp:
+            return fp.read()
+
+    @staticmethod
+    def test_edits_match_full_compile(demo_src):
+        compiler = IncrementalCompiler()
+        edits = [
+            demo_src,
+            # Renumbers every name after it
+            "z = 3;\n" + demo_src,
+            demo_src.replace("PRINT roots;", "PRINT roots, z;"),
+            # A name used before being assigned anywhere becomes a symbol
+            demo_src.replace("PRINT roots;", "PRINT roots, z;") + "\nz = 2;",
+            demo_src.replace("b = 7;", ""),
+            demo_src.replace("# Plot function f", "# Plot it"),
+        ]
+        for source in edits:
+            assert compiler.generate_python_code(source) == generate_python_code(generate_ast(source))
+
+    @staticmethod
+    def test_only_changed_statements_are_parsed(demo_src):
+        compiler = IncrementalCompiler()
+        compiler.generate_python_code(demo_src)
+        assert compiler.reparsed == 9
+        compiler.generate_python_code(demo_src.replace("b = 7;", "b = 8;"))
+        assert compiler.reparsed == 1
+        compiler.generate_python_code("\n\n" + demo_src.replace("b = 7;", "b = 8;") + "\ng = f;")
+        assert compiler.reparsed == 2
+
+    @staticmethod
+    def test_same_bytecode(demo_src, monkeypatch):
+        monkeypatch.setenv("GRAPHER_SIGNING_KEY", base64.b64encode(os.urandom(32)).decode())
+        compiler = IncrementalCompiler()
+        compiler.py_compile(demo_src)
+        source = demo_src.replace("PRINT f(0);", "PRINT f(1);")
+        assert compiler.py_compile(source) == Compiler.py_compile(source)
+
+    @staticmethod
+    def test_errors_keep_previous_state(demo_src):
+        compiler = IncrementalCompiler()
+        compiler.generate_python_code(demo_src)
+        with raises(InvalidToken, match="line 3"):
+            compiler.generate_python_code(demo_src.replace("b = 7;", "b = ;"))
+        compiler.generate_python_code(demo_src)
+        assert compiler.reparsed == 0
@@ -0,0 +1,110 @@
+import json
+import logging
+import tracemalloc
+
+from pytest import fixture, raises
+
+from MathLang.Core import CompileCache, Compiler, Instrumentation, get_instrumentation, set_instrumentation
+from MathLang.Core.instrumentation import count_nodes
+from MathLang.Core.nodes import InvalidToken, generate_python_code
+from MathLang.Core.optimiser import optimise
+from MathLang.Core.parser import generate_ast
+
+source = "f = x^2 - 2*x + 1; r = SOLVE f IN REAL; PRINT r, f(3);"
+
+
+class TestInstrumentation:
+    @staticmethod
+    @fixture()
+    def records():
+        records = []
+        previous = get_instrumentation()
+        set_instrumentation(Instrumentation(records.append))
+        yield records
+        set_instrumentation(previous)
+
+    @staticmethod
+    def test_phases(records):
+        bytecode = Compiler.py_compile(source, CompileCache())
+        assert [record.phase for record in records] == ["cache_lookup", "lex", "parse", "codegen", "compile",
+                                                        "marshal", "cache_store", "sign"]
+        assert len({record.compilation for record in records}) == 1
+        counts = {record.phase: record.counts for record in records}
+        assert counts["lex"]["tokens"] == 27
+        assert counts["parse"]["nodes"] == count_nodes(generate_ast(source))
+        assert counts["parse"]["symbols"] == 3
+        assert counts["marshal"]["bytes"] == len(bytecode) - 64
+        assert all(record.wall_time >= 0 and record.error is None for record in records)
+
+    @staticmethod
+    def test_same_code(records):
+        # Marshalled code is not byte for byte the same every time, but the generated code is
+        bytecode = Compiler.py_compile(source, optimisation_level=2, target="numeric")
+        expected = generate_python_code(optimise(generate_ast(source), 2), target="numeric")
+        code = compile(expected, "<MathLang>", "exec", optimize=2)
+        assert Compiler.py_decompile(bytecode, unsafe=True).co_code == code.co_code
+        assert [record.phase for record in records] == ["lex", "parse", "optimise", "codegen", "compile", "marshal",
+                                                        "sign"]
+
+    @staticmethod
+    def test_cache_hit(records):
+        cache = CompileCache()
+        Compiler.py_compile(source, cache)
+        records.clear()
+        Compiler.py_compile(source, cache)
+        assert [record.phase for record in records] == ["cache_lookup", "sign"]
+        assert records[0].counts["hits"] == 1
+
+    @staticmethod
+    def test_statistics_and_log(caplog):
+        instrumentation = Instrumentation(logger=logging.getLogger("MathLang.profile"))
+        previous = get_instrumentation()
+        set_instrumentation(instrumentation)
+        try:
+            with caplog.at_level(logging.INFO, "MathLang.profile"):
+                Compiler.py_compile(source)
+                with raises(InvalidToken):
+                    Compiler.py_compile("f = ;")
+        finally:
+            set_instrumentation(previous)
+        phases = instrumentation.statistics.phases
+        assert phases["lex"].calls == 2
+        assert phases["parse"].calls == 2 and phases["parse"].errors == 1
+        assert phases["sign"].calls == 1
+        logged = [json.loads(record.getMessage()) for record in caplog.records]
+        assert logged[0]["phase"] == "lex" and logged[-1]["error"] is not None
+        assert "parse" in instrumentation.statistics.format()
+        instrumentation.statistics.reset()
+        assert not instrumentation.statistics.phases
+
+    @staticmethod
+    def test_traced_allocations(records):
+        tracemalloc.start()
+        try:
+            data = bytearray(10 * 1024 ** 2)
+            del data
+            Compiler.py_compile(source)
+            # The peak belongs to whoever started tracing
+            assert tracemalloc.get_traced_memory()[1] >= 10 * 1024 ** 2
+        finally:
+            tracemalloc.stop()
+        assert all(record.allocated_bytes is not None for record in records)
+
+    @staticmethod
+    def test_failing_hooks(caplog):
+        def callback(record):
+            raise RuntimeError("broken callback")
+
+        logger = logging.getLogger("MathLang.test_profile")
+        logger.setLevel(logging.INFO)
+        logger.addFilter(lambda record: 1 / 0)
+        previous = get_instrumentation()
+        set_instrumentation(Instrumentation(callback, logger=logger))
+        try:
+            with caplog.at_level(logging.ERROR, "MathLang.Core.instrumentation"):
+                assert Compiler.py_compile(source)
+        finally:
+            set_instrumentation(previous)
+        messages = [record.getMessage() for record in caplog.records]
+        assert any("callback failed" in message for message in messages)
+        assert any("logger failed" in message for message in messages)
@@ -1,8 +1,9 @@
 from pathlib import Path
 
-from pytest import fixture
+from pytest import fixture, raises
+from rply import LexingError
 
-from MathLang.Core import get_source_signature
+from MathLang.Core import get_lexer, get_source_signature
 
 test_data_path = Path(__file__).parent.absolute() / "test_data"
 
@@ -23,3 +24,22 @@ class TestLexer:
     @staticmethod
     def test_demo_parsing(demo, demo_sgn):
         assert get_source_signature(demo) == demo_sgn.strip("\n")
+
+    @staticmethod
+    def test_keywords_inside_names():
+        tokens = list(get_lexer().lex("printer = Interest;\n  PRINT printer, In;"))
+        assert [t.name for t in tokens] == ["ID", "EQUAL", "ID", "SEMICOLON", "PRINT", "ID", "COMMA", "IN", "SEMICOLON"]
+        assert [(t.source_pos.lineno, t.source_pos.colno) for t in tokens[4:6]] == [(2, 3), (2, 9)]
+
+    @staticmethod
+    def test_invalid_character():
+        with raises(LexingError) as e:
+            list(get_lexer().lex("a = 1;\nb = $;"))
+        assert (e.value.source_pos.lineno, e.value.source_pos.colno) == (2, 5)
+
+    @staticmethod
+    def test_step_is_contextual():
+        names = [[t.name for t in get_lexer().lex(src)] for src in ("step = 2;", "f(1..step)", "f(1..n Step step)")]
+        assert names[0] == ["ID", "EQUAL", "NUMBER", "SEMICOLON"]
+        assert names[1] == ["ID", "LPAREN", "NUMBER", "RANGE", "ID", "RPAREN"]
+        assert names[2] == ["ID", "LPAREN", "NUMBER", "RANGE", "ID", "STEP", "ID", "RPAREN"]
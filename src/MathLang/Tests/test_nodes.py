@@ -0,0 +1,91 @@
+import gc
+import pickle
+
+from pytest import fixture, raises
+
+from MathLang.Core import CompilationContext, generate_ast, generate_python_code, get_node_table
+from MathLang.Core.nodes import BinaryOps, Plot, Print
+
+
+class TestNodes:
+    @staticmethod
+    @fixture()
+    def src():
+        return "f=(x+1)^2;g=f(3);roots=SOLVE f IN REAL;PRINT f,g,roots;PLOT f,x;"
+
+    @staticmethod
+    def test_structural_equality(src):
+        a = generate_ast(src)
+        b = generate_ast(src)
+        assert a is not b
+        assert a == b and hash(a) == hash(b)
+        assert a != generate_ast(src.replace("+1", "+2"))
+        assert BinaryOps("x", "+", "1") != BinaryOps("x", "+", 1)
+        assert BinaryOps("x", "+", "1") != "x+1"
+
+    @staticmethod
+    def test_dict_keys(src):
+        cache = {generate_ast(src): "compiled"}
+        assert cache[generate_ast(src)] == "compiled"
+        exprs = [stmt.expr for stmt in generate_ast("a=x+1;b=x+1;c=x+2;").stmts]
+        assert len(set(exprs)) == 2
+
+    @staticmethod
+    def test_immutable():
+        node = BinaryOps("x", "+", "1")
+        with raises(AttributeError):
+            node.op = "-"
+        with raises(AttributeError):
+            node.extra = None
+        assert not hasattr(node, "__dict__")
+        assert Print(["a", "b"]).args == ("a", "b")
+
+    @staticmethod
+    def test_codegen_has_no_side_effects(src):
+        ast = generate_ast(src)
+        copy = pickle.loads(pickle.dumps(ast))
+        code = generate_python_code(ast)
+        assert generate_python_code(ast) == code
+        assert ast == copy
+        node = Plot(["x", BinaryOps("x", "^", "2")])
+        assert CompilationContext().codify(node) == CompilationContext().codify(node)
+
+    @staticmethod
+    def test_deep_trees():
+        n = 50000
+        a = generate_ast("a=" + "+".join(["x"] * n) + ";")
+        b = generate_ast("a=" + "+".join(["x"] * n) + ";")
+        c = generate_ast("a=" + "+".join(["x"] * (n - 1)) + "+1;")
+        assert a == b and hash(a) == hash(b)
+        assert a != c
+
+    @staticmethod
+    def test_hash_consing():
+        src = "f=(x+1)^2+(x+1)^2;g=(x+1)^2*f;PRINT (x+1)^2,f,g;"
+        ast = generate_ast(src, intern=True)
+        f, g, p = ast.stmts
+        assert f.expr.left is f.expr.right
+        assert g.expr.left is f.expr.left is p.args[0]
+        assert generate_ast("a=(x+1)^2;", intern=True).stmts[0].expr is f.expr.left
+        assert ast == generate_ast(src)
+
+    @staticmethod
+    def test_shared_code_is_generated_once(src):
+        context = CompilationContext()
+        shared = "+".join(["(x+1)^2"] * 50)
+        ast = generate_ast(f"f={shared};g=f-({shared});" + src, context, intern=True)
+        assert context.shared
+        expected = generate_python_code(generate_ast(f"f={shared};g=f-({shared});" + src))
+        assert generate_python_code(ast, context) == expected
+        # Shared operations inside other operations are evaluated once, and only their value is kept
+        assert all(code is not None or node in context.values for node, code in context.shared.items())
+
+    @staticmethod
+    def test_table_is_weak():
+        table = get_node_table()
+        size = len(table)
+        ast = generate_ast("a=" + "+".join(f"x^{i}" for i in range(1000)) + ";", intern=True)
+        assert len(table) >= size + 1000
+        del ast
+        gc.collect()
+        assert len(table) < size + 1000
@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from pytest import approx, fixture, raises
+
+from MathLang.Core import Compiler, generate_ast, generate_python_code
+from MathLang.Core.numeric_runtime import find_roots, solve, Function
+
+test_data_path = Path(__file__).parent.absolute() / "test_data"
+
+
+def run_numeric(source):
+    exec(generate_python_code(generate_ast(source), target="numeric"), {})
+
+
+class TestNumeric:
+    @staticmethod
+    @fixture()
+    def demo_src():
+        with open(test_data_path / "simple_demo.gp") as fp:
+            # Plotting needs a display
+            return fp.read().replace("PLOT f;", "")
+
+    @staticmethod
+    def test_demo(demo_src, capsys):
+        run_numeric(demo_src)
+        assert capsys.readouterr().out.split() == ["-8", "[-8.0,", "1.0]"]
+
+    @staticmethod
+    def test_functions(capsys):
+        run_numeric("a = 2; f = a*x^2; a = 3; g = f + a; PRINT f(2), g(1), f; x = 5; PRINT f(1), x, g(1..2);")
+        assert capsys.readouterr().out.split("\n")[:2] == ["85<function of x>", "25[ 5. 11.]"]
+
+    @staticmethod
+    def test_root_finding():
+        assert find_roots(lambda x: x ** 2 - 2) == approx([-2 ** 0.5, 2 ** 0.5], rel=1e-14)
+        assert find_roots(lambda x: (x - 1) ** 2 * (x + 3)) == [-3, 1]
+        # Poles are not roots
+        assert find_roots(lambda x: 1 / (x - 2)) == []
+        assert find_roots(lambda x: x ** 2 + 1) == []
+        assert solve(Function(lambda x: (2 * x - 1) * (x - 4)), "INTEGER") == [4]
+        assert solve(0) == "Reals"
+        assert solve(1) == []
+
+    @staticmethod
+    def test_never_imports_sympy(demo_src):
+        env = dict(os.environ, PYTHONPATH=str(Path(__file__).parent.parent.parent))
+        script = (
+            "import sys;from MathLang.Core import Compiler;"
+            f"exec(Compiler.py_decompile(Compiler.py_compile({demo_src!r}, target='numeric'), True));"
+            "assert 'sympy' not in sys.modules"
+        )
+        result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.split() == ["-8", "[-8.0,", "1.0]"]
+
+    @staticmethod
+    def test_targets(demo_src):
+        with raises(ValueError):
+            Compiler.py_compile(demo_src, target="quantum")
+        assert "sympy" not in generate_python_code(generate_ast(demo_src), target="numeric")
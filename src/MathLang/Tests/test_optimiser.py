@@ -0,0 +1,75 @@
+from pytest import fixture, raises
+
+from MathLang.Core import CompileCache, Compiler, generate_ast, generate_python_code, optimise
+from MathLang.Core.optimiser import eliminate_common_subexpressions, eliminate_dead_assignments, fold_constants
+
+
+def generate(source, level=2, passes=None):
+    return generate_python_code(optimise(generate_ast(source), level, passes))
+
+
+class TestOptimiser:
+    @staticmethod
+    @fixture()
+    def script_src():
+        return (
+            "a = 2*3; b = 10/5 - 2^3; f = a*x^2 + b*x - 1; g = x^2 - 4;\n"
+            "unused = SOLVE g IN REAL;\n"
+            "roots = SOLVE f IN REAL; PRINT roots, SOLVE f IN REAL;\n"
+            "h = (x+1)*(x+1) + (x+1)*(x+1); PRINT h, f(2), f(2)*(x+1);\n"
+            "a = 1/2; PRINT a*x, (1/2)*x, (-2)^3;"
+        )
+
+    @staticmethod
+    def test_constant_folding():
+        assert generate("f = 2*3*x - 2^3 + 7/7;", passes=[fold_constants]) == generate("f = 6*x - 8 + 1;", 0)
+        # Rationals and floats are left to SymPy
+        assert generate("f = 1/2 + 0.5*2;", passes=[fold_constants]) == generate("f = 1/2 + 0.5*2;", 0)
+        assert generate("f = (-2)^3 + -(2^2);", passes=[fold_constants]) == generate("f = -12;", 0)
+
+    @staticmethod
+    def test_dead_assignments():
+        code = generate("f = x^2 - 1; roots = SOLVE f IN REAL; g = f; PRINT g;", passes=[eliminate_dead_assignments])
+        assert "_sv(" not in code
+        assert generate("a = 1; a = 2; PRINT a;", passes=[eliminate_dead_assignments]) == generate("a = 2; PRINT a;", 0)
+
+    @staticmethod
+    def test_common_subexpressions():
+        code = generate("f = x^2 - 1; r = SOLVE f IN REAL; PRINT SOLVE f IN REAL, r;",
+                        passes=[eliminate_common_subexpressions])
+        assert code.count("_sv(") == 1
+        # The value of f is not the same for both
+        code = generate("f = x^2 - 1; r = SOLVE f IN REAL; f = x; PRINT SOLVE f IN REAL, r;",
+                        passes=[eliminate_common_subexpressions])
+        assert code.count("_sv(") == 2
+
+    @staticmethod
+    def test_same_output(script_src, capsys):
+        outputs = []
+        for level in (0, 1, 2):
+            exec(generate(script_src, level), {})
+            outputs.append(capsys.readouterr().out)
+        assert outputs[0] == outputs[1] == outputs[2]
+        assert generate(script_src).count("_sv(") == 1
+
+    @staticmethod
+    def test_hash_consed_ast(script_src):
+        # The same node stands for different values of f before and after it is assigned again
+        src = script_src + "f = x; a = f+1; f = 2; b = f+1; PRINT a, b, f+1;"
+        for level in (0, 1, 2):
+            assert generate_python_code(optimise(generate_ast(src, intern=True), level)) == generate(src, level)
+
+    @staticmethod
+    def test_deep_expressions():
+        terms = 5000
+        assert generate(f"f={'+'.join(['1'] * terms)}*x;PRINT f;") == generate(f"f={terms - 1}+1*x;PRINT f;", 0)
+
+    @staticmethod
+    def test_py_compile_levels(script_src):
+        cache = CompileCache()
+        bytecode = [Compiler.py_compile(script_src, cache, level)[:-64] for level in (0, 2, 0)]
+        assert bytecode[0] != bytecode[1]
+        assert bytecode[0] == bytecode[2]
+        assert cache.stats.memory_hits == 1
+        with raises(ValueError):
+            Compiler.py_compile(script_src, optimisation_level=9)
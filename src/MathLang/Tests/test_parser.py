@@ -3,7 +3,12 @@ from json import dumps, loads
 
 from pytest import fixture
 
-from MathLang.Core import deserialise_ast, generate_ast, serialise_ast
+import rply.parsergenerator
+from rply import ParserGenerator
+
+from MathLang.Core import deserialise_ast, generate_ast, get_lexer, get_parser, serialise_ast
+from MathLang.Core.nodes import CompilationContext
+from MathLang.Core.parser import Parser
 
 test_data_path = Path(__file__).parent.absolute() / "test_data"
 
@@ -39,3 +44,34 @@ class TestParser:
     @staticmethod
     def test_demo_deserialisation(demo, demo_ast):
         assert deserialise_ast(demo_ast) == generate_ast(demo)
+
+    @staticmethod
+    def test_parser_is_built_once(quick_src, monkeypatch):
+        parser = get_parser()
+
+        def fail_build(self):
+            raise AssertionError("Parser tables must not be rebuilt")
+
+        monkeypatch.setattr(ParserGenerator, "build", fail_build)
+        assert generate_ast(quick_src) == generate_ast(quick_src)
+        assert get_parser() is parser
+
+    @staticmethod
+    def test_long_lists():
+        ast = generate_ast("a=x;" + "PRINT a;" * 500 + "PRINT " + ",".join(map(str, range(500))) + ";")
+        assert len(ast.stmts) == 502
+        assert ast.stmts[-1].args == tuple(str(i) for i in range(500))
+
+    @staticmethod
+    def test_corrupt_table_cache(quick_src, tmp_path, monkeypatch):
+        class AppDirs:
+            def __init__(self, name):
+                self.user_cache_dir = str(tmp_path)
+
+        monkeypatch.setattr(rply.parsergenerator, "AppDirs", AppDirs)
+        Parser(get_lexer().tokens)
+        cache_file, = tmp_path.iterdir()
+        for data in (cache_file.read_text()[:100], "[]", '{"start": 1}'):
+            cache_file.write_text(data)
+            parser = Parser(get_lexer().tokens)
+            assert parser.parse(get_lexer().lex(quick_src), CompilationContext()) == generate_ast(quick_src)
@@ -0,0 +1,72 @@
+import numpy
+from pytest import fixture
+
+from MathLang.Core import PlotOutput, execute, get_plot_output, render_many, set_plot_output
+from MathLang.Core.numeric import NumericContext
+from MathLang.Core.nodes import generate_python_code
+from MathLang.Core.parser import generate_ast
+from MathLang.Core.plotting import render, sample
+
+
+class TestPlotting:
+    @staticmethod
+    @fixture()
+    def plot_output():
+        old = get_plot_output()
+        output = PlotOutput()
+        set_plot_output(output)
+        yield output
+        set_plot_output(old)
+
+    @staticmethod
+    def test_adaptive_sampling():
+        xs, ys = sample(lambda x: numpy.tanh(20 * x), budget=400)
+        assert len(xs) <= 400
+        assert numpy.all(numpy.diff(xs) > 0)
+        # The steep region around 0 is a twentieth of the range, where the initial grid has 5 points
+        assert numpy.sum(numpy.abs(xs) < 0.5) > 5 * 5
+        # A straight line needs no more than the initial grid
+        xs, ys = sample(lambda x: 2 * x + 1, budget=400)
+        assert len(xs) == 100
+        xs, ys = sample(5, budget=400)
+        assert numpy.all(ys == 5)
+
+    @staticmethod
+    def test_render_formats(tmp_path):
+        assert render([lambda x: 1 / x, numpy.sin]).startswith(b"\x89PNG")
+        assert b"<svg" in render([numpy.cos], fmt="svg")
+        render([numpy.sqrt], tmp_path / "sqrt.svg", "svg")
+        assert (tmp_path / "sqrt.svg").stat().st_size > 0
+
+    @staticmethod
+    def test_plot_statements(plot_output):
+        images = execute("f = x^2 - 1; PLOT f, 2*x; PLOT f(2);")
+        assert len(images) == 2 and not plot_output.images
+        exec(generate_python_code(generate_ast("PLOT x^2;"), NumericContext()), {})
+        assert len(plot_output.images) == 1
+        images = plot_output.take()
+        assert len(images) == 1 and images[0].startswith(b"\x89PNG")
+        assert not plot_output.images
+
+    @staticmethod
+    def test_bounded_output(plot_output):
+        output = PlotOutput(max_images=2)
+        set_plot_output(output)
+        assert len(execute("PLOT x; PLOT 2*x; PLOT 3*x;")) == 3
+        assert output.count == 3 and not output.images
+        for _ in range(2):
+            exec(generate_python_code(generate_ast("PLOT x; PLOT 2*x;"), NumericContext()), {})
+        assert output.count == 7 and len(output.images) == 2 and output.dropped == 2
+
+    @staticmethod
+    def test_render_many(tmp_path):
+        (tmp_path / "a.gp").write_text("f = x^3; PRINT SOLVE f IN REAL; PLOT f; g = f - 1; PLOT g, f;")
+        (tmp_path / "b.gp").write_text("PLOT x; PLOT y;")
+        results = render_many(
+            [tmp_path / "a.gp", tmp_path / "b.gp"], [tmp_path / "out" / "a", tmp_path / "out" / "b"], "svg", jobs=2
+        )
+        assert results[0].ok
+        assert [p.rsplit("/", 1)[1] for p in results[0].images] == ["a-1.svg", "a-2.svg"]
+        assert not results[1].ok
+        assert len(results[1].images) == 1
+        assert sorted(p.name for p in (tmp_path / "out").iterdir()) == ["a-1.svg", "a-2.svg", "b-1.svg"]
@@ -0,0 +1,66 @@
+import io
+import json
+from pathlib import Path
+
+from pytest import fixture, mark, raises
+
+from MathLang.Core import ASTFormatError, deserialise_ast, generate_ast, read_ast, serialise_ast, write_ast
+from MathLang.Core.nodes import Input, Program
+from MathLang.Core.serialiser import ASTSerialiser
+
+test_data_path = Path(__file__).parent.absolute() / "test_data"
+
+
+class TestStreamingSerialiser:
+    @staticmethod
+    @fixture()
+    def demo():
+        with open(test_data_path / "simple_demo.gp") as fp:
+            return fp.read()
+
+    @staticmethod
+    @mark.parametrize("chunk_size", [1, 2, 3, 7, 4096])
+    def test_round_trip(demo, chunk_size):
+        ast = generate_ast(demo + "g = f(1..10 STEP 2) + f(1, 2, 3); PRINT g, SOLVE f IN INTEGER;")
+        fp = io.StringIO()
+        write_ast(ast, fp, buffer_size=chunk_size)
+        assert fp.getvalue() == serialise_ast(ast)
+        fp.seek(0)
+        assert read_ast(fp, chunk_size) == ast
+        assert read_ast(io.BytesIO(fp.getvalue().encode()), chunk_size) == ast
+
+    @staticmethod
+    def test_any_json():
+        ast = Program([Input("a", '"é€\U0001f600"'), Input("b", None)])
+        # Other whitespace, escapes and non-ASCII text are read like the json module does
+        text = serialise_ast(ast).replace(": ", " :\n\t").replace("\\u00e9", "é")
+        assert deserialise_ast(text) == ast
+        assert read_ast(io.BytesIO(text.encode()), 1) == ast
+        ast = Program([Input(1, -2.5e-3), Input(True, False), Input(None, "\n"), Program([])])
+        assert read_ast(io.StringIO(json.dumps(ast, cls=ASTSerialiser, indent=1)), 1) == ast
+
+    @staticmethod
+    def test_deep_trees():
+        ast = generate_ast("f=" + "+".join(f"{i}*x" for i in range(50000)) + ";")
+        with raises(RecursionError):
+            serialise_ast(ast)
+        fp = io.StringIO()
+        write_ast(ast, fp)
+        fp.seek(0)
+        assert read_ast(fp) == ast
+
+    @staticmethod
+    @mark.parametrize("text", ["", "{", '{"a" 1}', "[1,]", "[1 2]", '{"a": 1,}', "[1]]", "[1] 2", '{"a": 1]', "nul",
+                               '"abc', "{1: 2}", "[,1]", ":"])
+    def test_invalid_json(text):
+        with raises(ASTFormatError, match="Invalid JSON AST"):
+            read_ast(io.StringIO(text), 1)
+
+    @staticmethod
+    @mark.parametrize("text", ['{"type": "Program"}', '{"type": "Program", "params": {"stmts": [], "x": 1}}',
+                               '{"type": "Program", "params": 1}', '{"type": "Input", "params": {"var": "\\q"}}',
+                               '"a\\ud800\\x"', "1", '"a"', "[]", '{"type": "Nothing", "params": {}}',
+                               "1" * 5000])
+    def test_malformed_ast(text):
+        with raises(ASTFormatError, match="Invalid JSON AST"):
+            read_ast(io.StringIO(text), 7)
@@ -0,0 +1,76 @@
+import os
+import base64
+import pickle
+
+import sympy
+from pytest import fixture
+
+from MathLang.Core import SolveCache, execute, get_solve_cache, set_solve_cache
+
+
+class Exploit:
+    def __reduce__(self):
+        return exit, (1,)
+
+
+class TestSolver:
+    @staticmethod
+    @fixture()
+    def solve_cache():
+        old = get_solve_cache()
+        cache = SolveCache()
+        set_solve_cache(cache)
+        yield cache
+        set_solve_cache(old)
+
+    @staticmethod
+    def test_memoisation():
+        cache = SolveCache()
+        x = sympy.Symbol("x")
+        first = cache.solve(x ** 2 - 4, sympy.Reals)
+        assert cache.solve(x ** 2 - 4, sympy.Reals) == first == sympy.FiniteSet(-2, 2)
+        assert cache.solve(x ** 2 + 4, sympy.Reals) == sympy.EmptySet
+        assert cache.stats.memory_hits == 1
+        assert cache.stats.misses == 2
+        assert SolveCache.get_key(x ** 2 - 4, sympy.Reals) != SolveCache.get_key(x ** 2 - 4, sympy.Integers)
+
+    @staticmethod
+    def test_eviction_and_persistence(tmp_path, monkeypatch):
+        monkeypatch.setenv("GRAPHER_SIGNING_KEY", base64.b64encode(os.urandom(32)).decode())
+        x = sympy.Symbol("x")
+        cache = SolveCache(max_memory_size=1, directory=tmp_path)
+        cache.solve(x - 1, sympy.Reals)
+        assert len(cache) == 1
+        other = SolveCache(directory=tmp_path)
+        assert other.solve(x - 1, sympy.Reals) == sympy.FiniteSet(1)
+        assert other.stats.disk_hits == 1
+        cache.clear()
+        assert len(SolveCache(directory=tmp_path)) == 0
+
+    @staticmethod
+    def test_tampered_result(tmp_path, monkeypatch):
+        monkeypatch.setenv("GRAPHER_SIGNING_KEY", base64.b64encode(os.urandom(32)).decode())
+        x = sympy.Symbol("x")
+        SolveCache(directory=tmp_path).solve(x - 1, sympy.Reals)
+        path, = tmp_path.iterdir()
+        # A pickle which would run code when loaded
+        path.write_bytes(pickle.dumps(Exploit()) + path.read_bytes()[-64:])
+        cache = SolveCache(directory=tmp_path)
+        assert cache.solve(x - 1, sympy.Reals) == sympy.FiniteSet(1)
+        assert (cache.stats.disk_hits, cache.stats.misses) == (0, 1)
+
+    @staticmethod
+    def test_generated_code_is_memoised(solve_cache, capsys):
+        source = "f = x^2 - 4; r = SOLVE f IN REAL; g = 1*f; PRINT r, SOLVE g IN REAL;"
+        execute(source)
+        execute(source)
+        assert solve_cache.stats.misses == 1
+        assert solve_cache.stats.hits == 3
+        assert capsys.readouterr().out.count("{-2, 2}") == 4
+
+    @staticmethod
+    def test_disabled(solve_cache, capsys):
+        set_solve_cache(None)
+        execute("PRINT SOLVE x IN INTEGER;")
+        assert capsys.readouterr().out.strip() == "{0}"
+        assert solve_cache.stats.misses == 0
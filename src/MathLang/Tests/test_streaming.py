@@ -0,0 +1,46 @@
+from io import StringIO
+from pathlib import Path
+
+from pytest import fixture, raises
+
+from MathLang.Core import execute_stream, generate_python_stream
+from MathLang.Core.nodes import InvalidToken
+from MathLang.Core.streaming import iter_statements
+
+test_data_path = Path(__file__).parent.absolute() / "test_data"
+
+
+class TestStreaming:
+    @staticmethod
+    @fixture()
+    def demo_src():
+        with open(test_data_path / "simple_demo.gp") as fp:
+            return fp.read()
+
+    @staticmethod
+    def test_statement_splitting():
+        source = "a = 1; # not; a statement\nb = a;\n# trailing; comment"
+        for chunk_size in (1, 3, 7, 1000):
+            statements = list(iter_statements(StringIO(source), chunk_size))
+            assert statements == [(1, "a = 1;"), (1, " # not; a statement\nb = a;"), (2, "\n# trailing; comment")]
+
+    @staticmethod
+    def test_execute_stream(capsys):
+        source = "a = 2; # comment;\nf = a*x + 1;\nPRINT f(3);\nb = f(1);\nPRINT b, a;"
+        namespace = {}
+        execute_stream(StringIO(source), namespace, chunk_size=5)
+        assert capsys.readouterr().out.split() == ["7", "32"]
+        assert str(namespace["_2"]) == "2*x + 1"
+
+    @staticmethod
+    def test_generates_same_statements(demo_src):
+        code = "".join(generate_python_stream(StringIO(demo_src), chunk_size=16))
+        assert "_s.sympify(_4,strict=True).subs({'x':0})" in code
+        assert code.count("_sv(") == 1
+
+    @staticmethod
+    def test_error_line_numbers():
+        with raises(InvalidToken, match="line 3"):
+            list(generate_python_stream(StringIO("a = 1;\n\nb = ;\n"), chunk_size=4))
+        with raises(InvalidToken, match="Unexpected EOF"):
+            list(generate_python_stream(StringIO("a = 1;\nb = 2")))
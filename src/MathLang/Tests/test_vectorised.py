@@ -0,0 +1,53 @@
+import numpy
+import sympy
+from pytest import raises
+
+from MathLang.Core import deserialise_ast, execute, generate_ast, get_lexer, serialise_ast
+from MathLang.Core.nodes import BatchEvaluation, Range
+from MathLang.Core.vectorised import evaluate, get_function, points
+
+
+class TestVectorised:
+    @staticmethod
+    def test_lexing():
+        tokens = list(get_lexer().lex("f(1..2.5 step 0.5)"))
+        assert [t.name for t in tokens] == ["ID", "LPAREN", "NUMBER", "RANGE", "NUMBER", "STEP", "NUMBER", "RPAREN"]
+
+    @staticmethod
+    def test_parsing():
+        ast = generate_ast("f = x; a = f(1..10 STEP 2); b = f(1, 2, 3); c = f(1);")
+        assert isinstance(ast.stmts[1].expr, BatchEvaluation)
+        assert isinstance(ast.stmts[1].expr.points, Range)
+        assert ast.stmts[2].expr.points == ("1", "2", "3")
+        assert not isinstance(ast.stmts[3].expr, BatchEvaluation)
+        assert deserialise_ast(serialise_ast(ast)) == ast
+        # 'step' is still a name outside ranges
+        ast = generate_ast("step = 2; f = x; a = f(1..7 step step);")
+        assert ast.stmts[2].expr.points.step == "step"
+
+    @staticmethod
+    def test_points():
+        assert points(1, 3).tolist() == [1, 2, 3]
+        assert points(0, 1, 0.1).tolist()[-1] == 1.0
+        assert points(3, 1, -1).tolist() == [3, 2, 1]
+        assert points(3, 1).tolist() == []
+        with raises(ValueError):
+            points(1, 3, 0)
+
+    @staticmethod
+    def test_evaluation():
+        x = sympy.Symbol("x")
+        get_function.cache_clear()
+        assert evaluate(x ** 2, [1, 2, 3]).tolist() == [1, 4, 9]
+        assert evaluate(x ** 2, points(0, 1, 0.5)).tolist() == [0, 0.25, 1]
+        assert get_function.cache_info().hits == 1
+        assert evaluate(sympy.Integer(5), [1, 2]).tolist() == [5, 5]
+        with raises(ValueError):
+            evaluate(x * sympy.Symbol("y"), [1])
+
+    @staticmethod
+    def test_execution(capsys):
+        execute("f = x^2 + 1; PRINT f(1..3); PRINT f(1, 2, 2*3);")
+        output = capsys.readouterr().out.split("\n")
+        assert numpy.fromstring(output[0].strip("[]"), sep=" ").tolist() == [2, 5, 10]
+        assert numpy.fromstring(output[1].strip("[]"), sep=" ").tolist() == [2, 5, 37]
@@ -1 +1,47 @@
-from .Core.adaptors import *
+from importlib import import_module
+
+# The public API, as 'from .Core.adaptors import *' gave it. The adaptors are loaded on first use, see MathLang.Core.
+_lazy_attributes = {
+    name: "Core.adaptors" for name in (
+        "compile_file_to_file",
+        "compile_source_to_file",
+        "compile_file_to_bytecode",
+        "compile_source_to_bytecode",
+        "compile_files_to_bundle",
+        "compile_sources_to_bundle",
+        "open_bundle",
+        "decompile_file_to_file",
+        "decompile_bytecode_to_file",
+        "decompile_file_to_code",
+        "decompile_bytecode_to_code",
+        "compile_file_to_file_async",
+        "compile_source_to_file_async",
+        "compile_file_to_bytecode_async",
+        "compile_files_to_bundle_async",
+        "decompile_file_to_file_async",
+        "decompile_bytecode_to_file_async",
+        "decompile_file_to_code_async",
+        "AsyncCompiler",
+        "get_async_compiler",
+        "Bundle",
+        "BundleWriter",
+        "CompileCache",
+        "Compiler",
+    )
+}
+
+__all__ = list(_lazy_attributes)
+
+
+def __getattr__(name):
+    try:
+        module = _lazy_attributes[name]
+    except KeyError:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'") from None
+    value = getattr(import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))